@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'EHS Monitoring Areas Link',
-    'version': '18.0.1.0',
+    'version': '18.0.1.1',
     'summary': 'Link EHS permits with Monitoring Areas and QR-based monitoring',
     'description': 'Adds a Monitoring page to EHS permits linking to monitoring areas with QR flow, monitoring lines, time limits, emails, and expirations.',
     'author': 'Akshat Gupta',
@@ -16,6 +16,7 @@
         'data/ir_sequence.xml',
         'data/ir_cron.xml',
         'data/mail_template.xml',
+        'data/permit_monitor_qr_data.xml',
         'views/res_config_settings_views.xml',
         'views/monitoring_line_views.xml',
         'views/inherit_work_heights_permit_views.xml',
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 from odoo import http
 from odoo.http import request
-from odoo.exceptions import AccessError
+from odoo.exceptions import AccessError, ValidationError
+
+from odoo.addons.qr_image.tools import qr_image_response
 
 
 class MonitoringQRController(http.Controller):
+    @http.route('/ehs/monitoring/qr/<int:qr_id>/<string:version>', type='http', auth='user')
+    def monitoring_scan_qr(self, qr_id, version, **kwargs):
+        qr_rec = request.env['permit.monitor.qr'].browse(qr_id).exists()
+        if not qr_rec:
+            return request.not_found()
+        qr_rec.check_access('read')
+        return qr_image_response(qr_rec.sudo()._get_scan_url(), version)
+
     @http.route(['/ehs/monitoring/scan'], type='http', auth='user', website=True, csrf=False)
     def scan(self, qr=None, permit_model=None, permit_id=None, **kwargs):
         if not qr or not permit_model or not permit_id:
@@ -18,25 +28,23 @@ class MonitoringQRController(http.Controller):
 
         area = qr_rec.area_id
 
-        # Check existing open line
+        # Open line lookup is an index probe; the unique index on open lines
+        # rejects the later of two concurrent scans of the same permit and area
         Line_public = request.env['permit.monitoring.line']
-        existing = Line_public.search([
-            ('permit_model', '=', permit_model),
-            ('permit_res_id', '=', int(permit_id)),
-            ('monitoring_area_id', '=', area.id),
-            ('state', '=', 'open')
-        ], limit=1)
-        if existing:
-            return request.redirect('/web#id=%s&view_type=form&model=permit.monitoring.line' % existing.id)
-
-        # Create new line for this user
-        try:
-            new_line = Line_public.create({
-                'permit_model': permit_model,
-                'permit_res_id': int(permit_id),
-                'monitoring_area_id': area.id,
-            })
-        except AccessError:
-            return request.render('ehs_monitoring_areas_link.template_qr_error', {'message': 'You do not have access to create monitoring lines'})
-
-        return request.redirect('/web#id=%s&view_type=form&model=permit.monitoring.line' % new_line.id)
+        line = Line_public._get_open_line(permit_model, int(permit_id), area.id)
+        if not line:
+            # Create new line for this user
+            try:
+                line = Line_public.create({
+                    'permit_model': permit_model,
+                    'permit_res_id': int(permit_id),
+                    'monitoring_area_id': area.id,
+                })
+            except AccessError:
+                return request.render('ehs_monitoring_areas_link.template_qr_error', {'message': 'You do not have access to create monitoring lines'})
+            except ValidationError:
+                # A concurrent scan opened the line first; this transaction's
+                # snapshot cannot see it, so ask to scan again
+                return request.render('ehs_monitoring_areas_link.template_qr_error', {'message': 'A monitoring line is already open for this permit and area, please scan again'})
+
+        return request.redirect('/web#id=%s&view_type=form&model=permit.monitoring.line' % line.id)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+PERMIT_TABLES = {
+    'work.heights.permit': ('work_heights_permit_id', 'work_heights_permit'),
+    'daily.permit.work': ('daily_permit_work_id', 'daily_permit_work'),
+    'hot.work.permit': ('hot_work_permit_id', 'hot_work_permit'),
+    'energized.work.permit': ('energized_work_permit_id', 'energized_work_permit'),
+}
+
+
+def migrate(cr, version):
+    """Fill the new stored permit links with SQL joins so that the upgrade
+    does not recompute them line by line."""
+    for model, (column, table) in PERMIT_TABLES.items():
+        cr.execute(f"ALTER TABLE permit_monitoring_line ADD COLUMN IF NOT EXISTS {column} int4")
+        cr.execute(f"""
+            UPDATE permit_monitoring_line line
+               SET {column} = permit.id
+              FROM {table} permit
+             WHERE line.permit_model = %s
+               AND permit.id = line.permit_res_id
+        """, [model])
+        _logger.info("Linked %s monitoring lines to %s", cr.rowcount, model)
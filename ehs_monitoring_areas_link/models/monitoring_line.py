@@ -1,7 +1,30 @@
 # -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from psycopg2 import errors as pg_errors
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
-from datetime import timedelta
+from odoo.tools import mute_logger
+
+_logger = logging.getLogger(__name__)
+
+# Lines handled per transaction by the expiry cron
+CRON_BATCH_SIZE = 200
+
+# Partial unique index allowing a single open line per permit and area
+OPEN_LINE_UNIQUE_INDEX = 'permit_monitoring_line_open_unique'
+
+# Stored many2one mirroring permit_model/permit_res_id for each permit model
+PERMIT_MODEL_FIELDS = {
+    'work.heights.permit': 'work_heights_permit_id',
+    'daily.permit.work': 'daily_permit_work_id',
+    'hot.work.permit': 'hot_work_permit_id',
+    'energized.work.permit': 'energized_work_permit_id',
+}
 
 
 class PermitMonitoringLine(models.Model):
@@ -21,11 +44,11 @@ class PermitMonitoringLine(models.Model):
     permit_res_id = fields.Integer(string='Permit Record ID', required=True, index=True)
     permit_ref = fields.Reference(selection='_get_permit_models', string='Permit', compute='_compute_permit_ref', store=False)
 
-    # Convenience direct links (computed) to the concrete permit record
-    work_heights_permit_id = fields.Many2one('work.heights.permit', string='Work at Heights Permit', compute='_compute_permit_m2os', store=False, readonly=True)
-    daily_permit_work_id = fields.Many2one('daily.permit.work', string='Daily Permit Work', compute='_compute_permit_m2os', store=False, readonly=True)
-    hot_work_permit_id = fields.Many2one('hot.work.permit', string='Hot Work Permit', compute='_compute_permit_m2os', store=False, readonly=True)
-    energized_work_permit_id = fields.Many2one('energized.work.permit', string='Energized Work Permit', compute='_compute_permit_m2os', store=False, readonly=True)
+    # Direct links to the concrete permit record, stored for joins and grouping
+    work_heights_permit_id = fields.Many2one('work.heights.permit', string='Work at Heights Permit', compute='_compute_permit_m2os', store=True, index='btree_not_null', readonly=True)
+    daily_permit_work_id = fields.Many2one('daily.permit.work', string='Daily Permit Work', compute='_compute_permit_m2os', store=True, index='btree_not_null', readonly=True)
+    hot_work_permit_id = fields.Many2one('hot.work.permit', string='Hot Work Permit', compute='_compute_permit_m2os', store=True, index='btree_not_null', readonly=True)
+    energized_work_permit_id = fields.Many2one('energized.work.permit', string='Energized Work Permit', compute='_compute_permit_m2os', store=True, index='btree_not_null', readonly=True)
 
     monitoring_area_id = fields.Many2one('monitoring.areas', string='Monitoring Record', required=True, ondelete='restrict', index=True, check_company=True)
     company_id = fields.Many2one(
@@ -70,6 +93,59 @@ class PermitMonitoringLine(models.Model):
         ('serial_unique_per_group', 'unique(permit_model, monitoring_area_id, name)', 'Serial number must be unique per permit type and monitoring area.'),
     ]
 
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS permit_monitoring_line_permit_area_state_index
+                ON permit_monitoring_line (permit_model, permit_res_id, monitoring_area_id, state)
+        """)
+        cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [OPEN_LINE_UNIQUE_INDEX])
+        if cr.fetchone():
+            return
+        # Older open lines of a permit and area predate the index: keep the
+        # latest one open and expire the others, so the index can be built
+        cr.execute("""
+            UPDATE permit_monitoring_line AS line
+               SET state = 'expired'
+              FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                               PARTITION BY permit_model, permit_res_id, monitoring_area_id
+                               ORDER BY id DESC) AS rank
+                      FROM permit_monitoring_line
+                     WHERE state = 'open' AND permit_res_id IS NOT NULL AND monitoring_area_id IS NOT NULL
+                   ) AS duplicate
+             WHERE line.id = duplicate.id AND duplicate.rank > 1
+        """)
+        if cr.rowcount:
+            _logger.warning("Expired %s duplicate open monitoring lines before creating index %s",
+                            cr.rowcount, OPEN_LINE_UNIQUE_INDEX)
+        cr.execute(f"""
+            CREATE UNIQUE INDEX {OPEN_LINE_UNIQUE_INDEX}
+                ON permit_monitoring_line (permit_model, permit_res_id, monitoring_area_id)
+             WHERE state = 'open'
+        """)
+
+    @contextmanager
+    def _open_line_guard(self):
+        """Turn a violation of the open line unique index into a user error."""
+        try:
+            with mute_logger('odoo.sql_db'), self.env.cr.savepoint():
+                yield
+        except pg_errors.UniqueViolation as e:
+            if e.diag.constraint_name != OPEN_LINE_UNIQUE_INDEX:
+                raise
+            raise ValidationError(_('You cannot create a new monitoring line until the previous one is done or expired.')) from None
+
+    @api.model
+    def _get_open_line(self, permit_model, permit_res_id, area_id):
+        return self.search([
+            ('permit_model', '=', permit_model),
+            ('permit_res_id', '=', permit_res_id),
+            ('monitoring_area_id', '=', area_id),
+            ('state', '=', 'open'),
+        ], limit=1)
+
     def _get_permit_models(self):
         return [
             ('work.heights.permit', 'Work at Heights'),
@@ -104,7 +180,8 @@ class PermitMonitoringLine(models.Model):
             # Set expiry if not provided
             if not vals.get('expiry_datetime'):
                 vals['expiry_datetime'] = fields.Datetime.now() + timedelta(minutes=limit_min)
-        recs = super().create(vals_list)
+        with self._open_line_guard():
+            recs = super().create(vals_list)
         # Do NOT auto trigger emails on create; emails are triggered when user explicitly sets both
         # compliance_status='not_standard' and call_meeting=True (handled in write())
         return recs
@@ -113,7 +190,12 @@ class PermitMonitoringLine(models.Model):
         if {'monitoring_area_id', 'permit_model', 'permit_res_id', 'company_id'} & set(vals.keys()):
             vals = dict(vals)
             vals.setdefault('company_id', self._resolve_company(vals))
-        res = super().write(vals)
+        if {'state', 'monitoring_area_id', 'permit_model', 'permit_res_id'} & set(vals):
+            with self._open_line_guard():
+                res = super().write(vals)
+                self.flush_recordset()
+        else:
+            res = super().write(vals)
         # After write, check if non-compliance and call_meeting True to trigger mail once
         for rec in self:
             if (rec.compliance_status == 'not_standard' and rec.call_meeting and not rec.meeting_mail_sent):
@@ -199,45 +281,28 @@ class PermitMonitoringLine(models.Model):
 
     @api.depends('permit_model', 'permit_res_id')
     def _compute_permit_m2os(self):
+        # One existence check per permit model for the whole batch
+        res_ids_by_model = defaultdict(set)
         for rec in self:
-            rec.work_heights_permit_id = False
-            rec.daily_permit_work_id = False
-            rec.hot_work_permit_id = False
-            rec.energized_work_permit_id = False
-
-            if not rec.permit_model or not rec.permit_res_id:
-                continue
-
-            if rec.permit_model == 'work.heights.permit':
-                rec.work_heights_permit_id = self.env['work.heights.permit'].browse(rec.permit_res_id).exists()
-            elif rec.permit_model == 'daily.permit.work':
-                rec.daily_permit_work_id = self.env['daily.permit.work'].browse(rec.permit_res_id).exists()
-            elif rec.permit_model == 'hot.work.permit':
-                rec.hot_work_permit_id = self.env['hot.work.permit'].browse(rec.permit_res_id).exists()
-            elif rec.permit_model == 'energized.work.permit':
-                rec.energized_work_permit_id = self.env['energized.work.permit'].browse(rec.permit_res_id).exists()
-
-    @api.constrains('permit_model', 'permit_res_id', 'monitoring_area_id', 'state')
-    def _check_no_parallel_open_line(self):
+            if rec.permit_model and rec.permit_res_id:
+                res_ids_by_model[rec.permit_model].add(rec.permit_res_id)
+        existing = {
+            model: set(self.env[model].sudo().browse(res_ids).exists().ids)
+            for model, res_ids in res_ids_by_model.items()
+        }
         for rec in self:
-            if rec.state in ('open',):
-                domain = [
-                    ('id', '!=', rec.id),
-                    ('permit_model', '=', rec.permit_model),
-                    ('permit_res_id', '=', rec.permit_res_id),
-                    ('monitoring_area_id', '=', rec.monitoring_area_id.id),
-                    ('state', 'in', ['open'])
-                ]
-                if self.search_count(domain):
-                    raise ValidationError(_('You cannot create a new monitoring line until the previous one is done or expired.'))
+            for model, field_name in PERMIT_MODEL_FIELDS.items():
+                found = rec.permit_model == model and rec.permit_res_id in existing.get(model, ())
+                rec[field_name] = rec.permit_res_id if found else False
 
     @api.model
-    def _cron_expire_overdue_lines(self):
+    def _cron_expire_overdue_lines(self, batch_size=CRON_BATCH_SIZE, auto_commit=True):
         now = fields.Datetime.now()
         Param = self.env['ir.config_parameter'].sudo()
         warn_minutes = int(Param.get_param('ehs_monitoring.expiry_warning_minutes', 10))
+        email_to = ','.join(self._get_admin_emails())
 
-        # 1) Send near-expiry warnings
+        # 1) Send near-expiry warnings, the mail flag is the watermark
         warn_deadline = now + timedelta(minutes=warn_minutes)
         warn_domain = [
             ('state', '=', 'open'),
@@ -245,35 +310,57 @@ class PermitMonitoringLine(models.Model):
             ('expiry_datetime', '<=', warn_deadline),
             ('expiry_warn_mail_sent', '=', False),
         ]
-        to_warn = self.search(warn_domain)
-        for rec in to_warn:
-            if rec._send_admin_mail('ehs_monitoring_areas_link.mail_template_monitoring_expiry_warning'):
-                rec.expiry_warn_mail_sent = True
-                rec.message_post(body=_('Near-expiry warning email sent to admins.'))
-
-        # 2) Expire overdue lines and notify
+        if email_to:
+            last_id = 0
+            while True:
+                to_warn = self.search(warn_domain + [('id', '>', last_id)], order='id', limit=batch_size)
+                if not to_warn:
+                    break
+                if to_warn._queue_admin_mails('ehs_monitoring_areas_link.mail_template_monitoring_expiry_warning', email_to):
+                    to_warn.write({'expiry_warn_mail_sent': True})
+                    to_warn._message_log_batch(bodies={rec.id: _('Near-expiry warning email sent to admins.') for rec in to_warn})
+                last_id = to_warn[-1].id
+                if auto_commit:
+                    self.env.cr.commit()
+
+        # 2) Expire overdue lines and notify; expired lines leave the domain
         expire_domain = [('state', '=', 'open'), ('expiry_datetime', '<', now)]
-        to_expire = self.search(expire_domain)
-        if to_expire:
+        while True:
+            to_expire = self.search(expire_domain, order='id', limit=batch_size)
+            if not to_expire:
+                break
             to_expire.write({'state': 'expired'})
-            for rec in to_expire:
-                if not rec.expired_mail_sent:
-                    if rec._send_admin_mail('ehs_monitoring_areas_link.mail_template_monitoring_expired'):
-                        rec.expired_mail_sent = True
-                        rec.message_post(body=_('Expired email sent to admins.'))
+            to_notify = to_expire.filtered(lambda rec: not rec.expired_mail_sent)
+            if email_to and to_notify \
+                    and to_notify._queue_admin_mails('ehs_monitoring_areas_link.mail_template_monitoring_expired', email_to):
+                to_notify.write({'expired_mail_sent': True})
+                to_notify._message_log_batch(bodies={rec.id: _('Expired email sent to admins.') for rec in to_notify})
             self._rotate_qr_for_lines(to_expire)
+            if auto_commit:
+                self.env.cr.commit()
+
+    def _queue_admin_mails(self, template_xmlid, email_to):
+        """Queue one admin mail per line in self; the mail queue sends them."""
+        template = self.env.ref(template_xmlid, raise_if_not_found=False)
+        if not template or not isinstance(template, type(self.env['mail.template'])):
+            return False
+        template = template.sudo().with_context(lang=self.env.user.lang)
+        template.send_mail_batch(self.ids, force_send=False, email_values={'email_to': email_to})
+        return True
 
     def _rotate_qr_for_lines(self, lines):
-        QR = self.env['permit.monitor.qr'].sudo()
-        for rec in lines:
-            qr_rec = QR.search([
-                ('permit_model', '=', rec.permit_model),
-                ('permit_res_id', '=', rec.permit_res_id),
-                ('area_id', '=', rec.monitoring_area_id.id),
-                ('company_id', '=', rec.company_id.id),
-            ], limit=1)
-            if qr_rec:
-                qr_rec.rotate_code()
+        """Rotate the scan codes of the permit/area QR records of lines at once."""
+        if not lines:
+            return
+        keys = {(line.permit_model, line.permit_res_id, line.monitoring_area_id.id, line.company_id.id) for line in lines}
+        candidates = self.env['permit.monitor.qr'].sudo().search([
+            ('permit_model', 'in', list({key[0] for key in keys})),
+            ('permit_res_id', 'in', list({key[1] for key in keys})),
+            ('area_id', 'in', list({key[2] for key in keys})),
+        ])
+        candidates.filtered(
+            lambda qr: (qr.permit_model, qr.permit_res_id, qr.area_id.id, qr.company_id.id) in keys
+        ).rotate_code()
 
     @api.constrains('monitoring_area_id', 'company_id')
     def _check_monitoring_area_company(self):
@@ -283,8 +370,20 @@ class PermitMonitoringLine(models.Model):
 
     @api.constrains('permit_model', 'permit_res_id', 'company_id')
     def _check_permit_company(self):
-        for rec in self:
-            if rec.permit_model and rec.permit_res_id:
-                permit = self.env[rec.permit_model].browse(rec.permit_res_id)
-                if permit and hasattr(permit, 'company_id') and permit.company_id and permit.company_id != rec.company_id:
-                    raise ValidationError(_('Monitoring line company must match the permit company.'))
+        self.flush_recordset(['company_id', *PERMIT_MODEL_FIELDS.values()])
+        for model, field_name in PERMIT_MODEL_FIELDS.items():
+            Permit = self.env[model]
+            if not Permit._fields.get('company_id') or not Permit._fields['company_id'].store:
+                continue
+            Permit.flush_model(['company_id'])
+            self.env.cr.execute(f"""
+                SELECT 1
+                  FROM permit_monitoring_line line
+                  JOIN {Permit._table} permit ON permit.id = line.{field_name}
+                 WHERE line.id = ANY(%s)
+                   AND permit.company_id IS NOT NULL
+                   AND permit.company_id != line.company_id
+                 LIMIT 1
+            """, [self.ids])
+            if self.env.cr.fetchone():
+                raise ValidationError(_('Monitoring line company must match the permit company.'))
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models
 
 
-class WorkHeightsPermit(models.Model):
-    _inherit = 'work.heights.permit'
+class PermitMonitoringMixin(models.AbstractModel):
+    """Monitoring page shared by the EHS permit models. Lines and scan QR
+    records are resolved for the whole recordset with one query per model,
+    so permit list and kanban renders stay flat."""
+    _name = 'permit.monitoring.mixin'
+    _description = 'Permit Monitoring Mixin'
 
     monitoring_area_id = fields.Many2one(
         'monitoring.areas',
@@ -13,10 +19,10 @@ class WorkHeightsPermit(models.Model):
         check_company=True,
     )
     monitoring_area_qr_value = fields.Char(string='QR Code', related='monitoring_area_id.qr_value', readonly=True)
-    monitoring_area_qr_image = fields.Binary(string='Area QR Code', related='monitoring_area_id.qr_image', readonly=True)
+    monitoring_area_qr_image_url = fields.Char(string='Area QR Code', related='monitoring_area_id.qr_image_url', readonly=True)
     monitoring_scan_url = fields.Char(string='Monitoring Scan URL', compute='_compute_monitoring_scan_url')
     monitor_qr_id = fields.Many2one('permit.monitor.qr', string='Permit Scan QR', compute='_compute_monitor_qr', store=False)
-    monitoring_scan_qr = fields.Binary(string='Scan QR', related='monitor_qr_id.qr_image', readonly=True)
+    monitoring_scan_qr_url = fields.Char(string='Scan QR', related='monitor_qr_id.qr_image_url', readonly=True)
     monitoring_line_ids = fields.One2many(
         'permit.monitoring.line',
         compute='_compute_monitoring_lines',
@@ -24,49 +30,76 @@ class WorkHeightsPermit(models.Model):
         compute_sudo=True,
         help='Computed for performance and avoid inverse recursion')
 
+    def _get_stored_ids(self):
+        return [rec_id for rec_id in self._ids if isinstance(rec_id, int)]
+
     def _compute_monitoring_lines(self):
-        Line = self.env['permit.monitoring.line']
+        lines = self.env['permit.monitoring.line'].search([
+            ('permit_model', '=', self._name),
+            ('permit_res_id', 'in', self._get_stored_ids()),
+        ])
+        line_ids_by_permit = defaultdict(list)
+        for line in lines:
+            line_ids_by_permit[line.permit_res_id].append(line.id)
         for rec in self:
-            rec.monitoring_line_ids = Line.search([
-                ('permit_model', '=', 'work.heights.permit'),
-                ('permit_res_id', '=', rec.id)
-            ])
+            rec.monitoring_line_ids = lines.browse(line_ids_by_permit[rec.id])
 
     def _compute_monitoring_scan_url(self):
         base = '/ehs/monitoring/scan'
         for rec in self:
             qr = rec.monitor_qr_id.qr_code if rec.monitor_qr_id else ''
-            rec.monitoring_scan_url = f"{base}?qr={qr}&permit_model=work.heights.permit&permit_id={rec.id}" if qr and rec.id else False
+            rec.monitoring_scan_url = f"{base}?qr={qr}&permit_model={rec._name}&permit_id={rec.id}" if qr and rec.id else False
 
     def _compute_monitor_qr(self):
-        QR = self.env['permit.monitor.qr'].sudo()
+        # Read only: missing QR records are created by _ensure_monitor_qr
+        qr_records = self.env['permit.monitor.qr'].sudo().search([
+            ('permit_model', '=', self._name),
+            ('permit_res_id', 'in', self._get_stored_ids()),
+        ])
+        qr_by_key = {(qr.permit_res_id, qr.area_id.id): qr for qr in qr_records}
         for rec in self:
-            if rec.monitoring_area_id and rec.id:
-                qr_rec = QR.search([
-                    ('permit_model', '=', 'work.heights.permit'),
-                    ('permit_res_id', '=', rec.id),
-                    ('area_id', '=', rec.monitoring_area_id.id)
-                ], limit=1)
-                if not qr_rec:
-                    qr_rec = QR.create({
-                        'permit_model': 'work.heights.permit',
-                        'permit_res_id': rec.id,
-                        'area_id': rec.monitoring_area_id.id,
-                    })
-                rec.monitor_qr_id = qr_rec
-            else:
-                rec.monitor_qr_id = False
+            rec.monitor_qr_id = qr_by_key.get((rec.id, rec.monitoring_area_id.id), False)
+
+    def _ensure_monitor_qr(self):
+        """Create, in one batch, the scan QR records missing for the permits
+        linked to a monitoring area."""
+        permits = self.filtered(lambda rec: rec.monitoring_area_id and isinstance(rec.id, int))
+        if not permits:
+            return
+        QR = self.env['permit.monitor.qr'].sudo()
+        existing = {
+            (row['permit_res_id'], row['area_id'])
+            for row in QR.search_read([
+                ('permit_model', '=', self._name),
+                ('permit_res_id', 'in', permits.ids),
+            ], ['permit_res_id', 'area_id'], load=None)
+        }
+        vals_list = [{
+            'permit_model': self._name,
+            'permit_res_id': rec.id,
+            'area_id': rec.monitoring_area_id.id,
+        } for rec in permits if (rec.id, rec.monitoring_area_id.id) not in existing]
+        if vals_list:
+            QR.create(vals_list)
+            self.invalidate_recordset(['monitor_qr_id'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._ensure_monitor_qr()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.get('monitoring_area_id'):
+            self._ensure_monitor_qr()
+        return res
 
     def action_open_monitoring_scan(self):
         self.ensure_one()
         # If there is an open line for this permit & area, open it instead of scanning/creating
         if self.monitoring_area_id:
-            line = self.env['permit.monitoring.line'].search([
-                ('permit_model', '=', 'work.heights.permit'),
-                ('permit_res_id', '=', self.id),
-                ('monitoring_area_id', '=', self.monitoring_area_id.id),
-                ('state', '=', 'open')
-            ], limit=1)
+            line = self.env['permit.monitoring.line']._get_open_line(self._name, self.id, self.monitoring_area_id.id)
             if line:
                 return {
                     'type': 'ir.actions.act_window',
@@ -75,6 +108,7 @@ class WorkHeightsPermit(models.Model):
                     'view_mode': 'form',
                     'target': 'current',
                 }
+            self._ensure_monitor_qr()
         return {
             'type': 'ir.actions.act_url',
             'url': self.monitoring_scan_url,
@@ -89,292 +123,33 @@ class WorkHeightsPermit(models.Model):
             'res_model': 'permit.monitoring.line',
             'view_mode': 'list,form',
             'domain': [
-                ('permit_model', '=', 'work.heights.permit'),
+                ('permit_model', '=', self._name),
                 ('permit_res_id', '=', self.id),
             ],
             'context': {
-                'default_permit_model': 'work.heights.permit',
+                'default_permit_model': self._name,
                 'default_permit_res_id': self.id,
-                'search_default_permit_model': 'work.heights.permit',
+                'search_default_permit_model': self._name,
             },
             'target': 'current'
         }
 
 
-class DailyPermitWork(models.Model):
-    _inherit = 'daily.permit.work'
-
-    monitoring_area_id = fields.Many2one(
-        'monitoring.areas',
-        string='Monitoring Area',
-        ondelete='restrict',
-        domain="[('company_id', 'in', allowed_company_ids)]",
-        check_company=True,
-    )
-    monitoring_area_qr_value = fields.Char(string='QR Code', related='monitoring_area_id.qr_value', readonly=True)
-    monitoring_area_qr_image = fields.Binary(string='Area QR Code', related='monitoring_area_id.qr_image', readonly=True)
-    monitoring_scan_url = fields.Char(string='Monitoring Scan URL', compute='_compute_monitoring_scan_url')
-    monitor_qr_id = fields.Many2one('permit.monitor.qr', string='Permit Scan QR', compute='_compute_monitor_qr', store=False)
-    monitoring_scan_qr = fields.Binary(string='Scan QR', related='monitor_qr_id.qr_image', readonly=True)
-    monitoring_line_ids = fields.One2many('permit.monitoring.line', compute='_compute_monitoring_lines', string='Monitoring Lines', compute_sudo=True)
-
-    def _compute_monitoring_lines(self):
-        Line = self.env['permit.monitoring.line']
-        for rec in self:
-            rec.monitoring_line_ids = Line.search([
-                ('permit_model', '=', 'daily.permit.work'),
-                ('permit_res_id', '=', rec.id)
-            ])
-
-    def _compute_monitoring_scan_url(self):
-        base = '/ehs/monitoring/scan'
-        for rec in self:
-            qr = rec.monitor_qr_id.qr_code if rec.monitor_qr_id else ''
-            rec.monitoring_scan_url = f"{base}?qr={qr}&permit_model=daily.permit.work&permit_id={rec.id}" if qr and rec.id else False
-
-    def _compute_monitor_qr(self):
-        QR = self.env['permit.monitor.qr'].sudo()
-        for rec in self:
-            if rec.monitoring_area_id and rec.id:
-                qr_rec = QR.search([
-                    ('permit_model', '=', 'daily.permit.work'),
-                    ('permit_res_id', '=', rec.id),
-                    ('area_id', '=', rec.monitoring_area_id.id)
-                ], limit=1)
-                if not qr_rec:
-                    qr_rec = QR.create({
-                        'permit_model': 'daily.permit.work',
-                        'permit_res_id': rec.id,
-                        'area_id': rec.monitoring_area_id.id,
-                    })
-                rec.monitor_qr_id = qr_rec
-            else:
-                rec.monitor_qr_id = False
+class WorkHeightsPermit(models.Model):
+    _name = 'work.heights.permit'
+    _inherit = ['work.heights.permit', 'permit.monitoring.mixin']
 
-    def action_open_monitoring_scan(self):
-        self.ensure_one()
-        if self.monitoring_area_id:
-            line = self.env['permit.monitoring.line'].search([
-                ('permit_model', '=', 'daily.permit.work'),
-                ('permit_res_id', '=', self.id),
-                ('monitoring_area_id', '=', self.monitoring_area_id.id),
-                ('state', '=', 'open')
-            ], limit=1)
-            if line:
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'permit.monitoring.line',
-                    'res_id': line.id,
-                    'view_mode': 'form',
-                    'target': 'current',
-                }
-        return {
-            'type': 'ir.actions.act_url',
-            'url': self.monitoring_scan_url,
-            'target': 'new',
-        }
 
-    def action_open_monitoring_lines(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': 'Monitoring Lines',
-            'res_model': 'permit.monitoring.line',
-            'view_mode': 'list,form',
-            'domain': [
-                ('permit_model', '=', 'daily.permit.work'),
-                ('permit_res_id', '=', self.id),
-            ],
-            'context': {
-                'default_permit_model': 'daily.permit.work',
-                'default_permit_res_id': self.id,
-                'search_default_permit_model': 'daily.permit.work',
-            },
-            'target': 'current'
-        }
+class DailyPermitWork(models.Model):
+    _name = 'daily.permit.work'
+    _inherit = ['daily.permit.work', 'permit.monitoring.mixin']
 
 
 class HotWorkPermit(models.Model):
-    _inherit = 'hot.work.permit'
-
-    monitoring_area_id = fields.Many2one(
-        'monitoring.areas',
-        string='Monitoring Area',
-        ondelete='restrict',
-        domain="[('company_id', 'in', allowed_company_ids)]",
-        check_company=True,
-    )
-    monitoring_area_qr_value = fields.Char(string='QR Code', related='monitoring_area_id.qr_value', readonly=True)
-    monitoring_area_qr_image = fields.Binary(string='Area QR Code', related='monitoring_area_id.qr_image', readonly=True)
-    monitoring_scan_url = fields.Char(string='Monitoring Scan URL', compute='_compute_monitoring_scan_url')
-    monitor_qr_id = fields.Many2one('permit.monitor.qr', string='Permit Scan QR', compute='_compute_monitor_qr', store=False)
-    monitoring_scan_qr = fields.Binary(string='Scan QR', related='monitor_qr_id.qr_image', readonly=True)
-    monitoring_line_ids = fields.One2many('permit.monitoring.line', compute='_compute_monitoring_lines', string='Monitoring Lines', compute_sudo=True)
-
-    def _compute_monitoring_lines(self):
-        Line = self.env['permit.monitoring.line']
-        for rec in self:
-            rec.monitoring_line_ids = Line.search([
-                ('permit_model', '=', 'hot.work.permit'),
-                ('permit_res_id', '=', rec.id)
-            ])
-
-    def _compute_monitoring_scan_url(self):
-        base = '/ehs/monitoring/scan'
-        for rec in self:
-            qr = rec.monitor_qr_id.qr_code if rec.monitor_qr_id else ''
-            rec.monitoring_scan_url = f"{base}?qr={qr}&permit_model=hot.work.permit&permit_id={rec.id}" if qr and rec.id else False
-
-    def _compute_monitor_qr(self):
-        QR = self.env['permit.monitor.qr'].sudo()
-        for rec in self:
-            if rec.monitoring_area_id and rec.id:
-                qr_rec = QR.search([
-                    ('permit_model', '=', 'hot.work.permit'),
-                    ('permit_res_id', '=', rec.id),
-                    ('area_id', '=', rec.monitoring_area_id.id)
-                ], limit=1)
-                if not qr_rec:
-                    qr_rec = QR.create({
-                        'permit_model': 'hot.work.permit',
-                        'permit_res_id': rec.id,
-                        'area_id': rec.monitoring_area_id.id,
-                    })
-                rec.monitor_qr_id = qr_rec
-            else:
-                rec.monitor_qr_id = False
-
-    def action_open_monitoring_scan(self):
-        self.ensure_one()
-        if self.monitoring_area_id:
-            line = self.env['permit.monitoring.line'].search([
-                ('permit_model', '=', 'hot.work.permit'),
-                ('permit_res_id', '=', self.id),
-                ('monitoring_area_id', '=', self.monitoring_area_id.id),
-                ('state', '=', 'open')
-            ], limit=1)
-            if line:
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'permit.monitoring.line',
-                    'res_id': line.id,
-                    'view_mode': 'form',
-                    'target': 'current',
-                }
-        return {
-            'type': 'ir.actions.act_url',
-            'url': self.monitoring_scan_url,
-            'target': 'new',
-        }
-
-    def action_open_monitoring_lines(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': 'Monitoring Lines',
-            'res_model': 'permit.monitoring.line',
-            'view_mode': 'list,form',
-            'domain': [
-                ('permit_model', '=', 'hot.work.permit'),
-                ('permit_res_id', '=', self.id),
-            ],
-            'context': {
-                'default_permit_model': 'hot.work.permit',
-                'default_permit_res_id': self.id,
-                'search_default_permit_model': 'hot.work.permit',
-            },
-            'target': 'current'
-        }
+    _name = 'hot.work.permit'
+    _inherit = ['hot.work.permit', 'permit.monitoring.mixin']
 
 
 class EnergizedWorkPermit(models.Model):
-    _inherit = 'energized.work.permit'
-
-    monitoring_area_id = fields.Many2one(
-        'monitoring.areas',
-        string='Monitoring Area',
-        ondelete='restrict',
-        domain="[('company_id', 'in', allowed_company_ids)]",
-        check_company=True,
-    )
-    monitoring_area_qr_value = fields.Char(string='QR Code', related='monitoring_area_id.qr_value', readonly=True)
-    monitoring_area_qr_image = fields.Binary(string='Area QR Code', related='monitoring_area_id.qr_image', readonly=True)
-    monitoring_scan_url = fields.Char(string='Monitoring Scan URL', compute='_compute_monitoring_scan_url')
-    monitor_qr_id = fields.Many2one('permit.monitor.qr', string='Permit Scan QR', compute='_compute_monitor_qr', store=False)
-    monitoring_scan_qr = fields.Binary(string='Scan QR', related='monitor_qr_id.qr_image', readonly=True)
-    monitoring_line_ids = fields.One2many('permit.monitoring.line', compute='_compute_monitoring_lines', string='Monitoring Lines', compute_sudo=True)
-
-    def _compute_monitoring_lines(self):
-        Line = self.env['permit.monitoring.line']
-        for rec in self:
-            rec.monitoring_line_ids = Line.search([
-                ('permit_model', '=', 'energized.work.permit'),
-                ('permit_res_id', '=', rec.id)
-            ])
-
-    def _compute_monitoring_scan_url(self):
-        base = '/ehs/monitoring/scan'
-        for rec in self:
-            qr = rec.monitor_qr_id.qr_code if rec.monitor_qr_id else ''
-            rec.monitoring_scan_url = f"{base}?qr={qr}&permit_model=energized.work.permit&permit_id={rec.id}" if qr and rec.id else False
-
-    def _compute_monitor_qr(self):
-        QR = self.env['permit.monitor.qr'].sudo()
-        for rec in self:
-            if rec.monitoring_area_id and rec.id:
-                qr_rec = QR.search([
-                    ('permit_model', '=', 'energized.work.permit'),
-                    ('permit_res_id', '=', rec.id),
-                    ('area_id', '=', rec.monitoring_area_id.id)
-                ], limit=1)
-                if not qr_rec:
-                    qr_rec = QR.create({
-                        'permit_model': 'energized.work.permit',
-                        'permit_res_id': rec.id,
-                        'area_id': rec.monitoring_area_id.id,
-                    })
-                rec.monitor_qr_id = qr_rec
-            else:
-                rec.monitor_qr_id = False
-
-    def action_open_monitoring_scan(self):
-        self.ensure_one()
-        if self.monitoring_area_id:
-            line = self.env['permit.monitoring.line'].search([
-                ('permit_model', '=', 'energized.work.permit'),
-                ('permit_res_id', '=', self.id),
-                ('monitoring_area_id', '=', self.monitoring_area_id.id),
-                ('state', '=', 'open')
-            ], limit=1)
-            if line:
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'permit.monitoring.line',
-                    'res_id': line.id,
-                    'view_mode': 'form',
-                    'target': 'current',
-                }
-        return {
-            'type': 'ir.actions.act_url',
-            'url': self.monitoring_scan_url,
-            'target': 'new',
-        }
-
-    def action_open_monitoring_lines(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': 'Monitoring Lines',
-            'res_model': 'permit.monitoring.line',
-            'view_mode': 'list,form',
-            'domain': [
-                ('permit_model', '=', 'energized.work.permit'),
-                ('permit_res_id', '=', self.id),
-            ],
-            'context': {
-                'default_permit_model': 'energized.work.permit',
-                'default_permit_res_id': self.id,
-                'search_default_permit_model': 'energized.work.permit',
-            },
-            'target': 'current'
-        }
+    _name = 'energized.work.permit'
+    _inherit = ['energized.work.permit', 'permit.monitoring.mixin']
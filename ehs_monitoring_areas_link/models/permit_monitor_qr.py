@@ -1,22 +1,20 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
-import random
-import string
 import base64
-from io import BytesIO
 
-try:
-    import qrcode
-except Exception:
-    qrcode = None
+from odoo.addons.qr_image.tools import render_qr_png, qr_version
 
 
 class PermitMonitorQR(models.Model):
     _name = 'permit.monitor.qr'
     _description = 'Permit Monitoring QR'
+    _inherit = ['monitoring.qr.code.mixin']
     _rec_name = 'display_name'
     _check_company_auto = True
+    _qr_code_field = 'qr_code'
+    _qr_code_constraint = 'code_unique'
+    _qr_code_length = 10
     _sql_constraints = [
         ('code_unique', 'unique(qr_code)', 'QR Code must be unique.'),
         ('permit_area_unique', 'unique(permit_model,permit_res_id,area_id)', 'Only one QR record per permit and area.'),
@@ -40,20 +38,13 @@ class PermitMonitorQR(models.Model):
 
     qr_code = fields.Char(string='Scan Code', readonly=True, index=True, copy=False)
     qr_image = fields.Binary(string='Scan QR Code', compute='_compute_qr_image', store=False)
+    qr_image_url = fields.Char(string='Scan QR Code URL', compute='_compute_qr_image_url')
     display_name = fields.Char(compute='_compute_display_name', store=False)
 
     def _compute_display_name(self):
         for rec in self:
             rec.display_name = f"{rec.permit_model}-{rec.permit_res_id} / {rec.area_id.name or ''}"
 
-    def _generate_code(self, length=10):
-        alphabet = string.ascii_uppercase + string.digits
-        for _ in range(10):
-            code = ''.join(random.choices(alphabet, k=length))
-            if not self.search_count([('qr_code', '=', code)]):
-                return code
-        return ''.join(random.choices(alphabet, k=length))
-
     @api.model_create_multi
     def create(self, vals_list):
         Area = self.env['monitoring.areas']
@@ -64,28 +55,37 @@ class PermitMonitorQR(models.Model):
                     vals['company_id'] = area.company_id.id
             else:
                 vals.setdefault('company_id', self.env.company.id)
-            if not vals.get('qr_code'):
-                vals['qr_code'] = self._generate_code()
         return super().create(vals_list)
 
+    @api.model
+    def _init_missing_permit_qr(self):
+        """Create the scan QR records of permits linked to an area before
+        QR records were created on permit write."""
+        for model_name, _label in self._fields['permit_model'].selection:
+            permits = self.env[model_name].sudo().search([('monitoring_area_id', '!=', False)])
+            permits._ensure_monitor_qr()
+
     def rotate_code(self):
-        for rec in self:
-            rec.write({'qr_code': self._generate_code()})
+        self._regenerate_qr_codes()
 
-    def _compute_qr_image(self):
+    def _get_scan_url(self):
+        self.ensure_one()
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url', '')
+        if not (self.qr_code and base_url):
+            return False
+        return f"{base_url}/ehs/monitoring/scan?qr={self.qr_code}&permit_model={self.permit_model}&permit_id={self.permit_res_id}"
+
+    def _compute_qr_image(self):
+        for rec in self:
+            png = render_qr_png(rec._get_scan_url())
+            rec.qr_image = base64.b64encode(png) if png else False
+
+    @api.depends('qr_code', 'permit_model', 'permit_res_id')
+    def _compute_qr_image_url(self):
+        # Rendered on demand by /ehs/monitoring/qr, the URL changes with the code
         for rec in self:
-            if not (qrcode and rec.qr_code and base_url):
-                rec.qr_image = False
-                continue
-            url = f"{base_url}/ehs/monitoring/scan?qr={rec.qr_code}&permit_model={rec.permit_model}&permit_id={rec.permit_res_id}"
-            buf = BytesIO()
-            qr = qrcode.QRCode(version=1, box_size=4, border=2)
-            qr.add_data(url)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            img.save(buf, 'PNG')
-            rec.qr_image = base64.b64encode(buf.getvalue())
+            url = rec._get_scan_url() if rec.id else False
+            rec.qr_image_url = f"/ehs/monitoring/qr/{rec.id}/{qr_version(url)}" if url else False
 
     @api.constrains('area_id', 'company_id')
     def _check_area_company(self):
@@ -68,29 +68,39 @@ class AttendancemasterWizard(models.TransientModel):
 
     def _get_leave_type_code(self, leave_type_name):
         """Map leave type name to a short code for the detailed sheet."""
-        name_lower = (leave_type_name or '').lower()
-        
-        # Define mapping for common leave types
-        if 'casual' in name_lower or name_lower == 'cl':
-            return 'CL'
-        elif 'earned' in name_lower or 'annual' in name_lower or name_lower == 'el':
-            return 'EL'
-        elif 'sick' in name_lower or name_lower == 'sl':
-            return 'SL'
-        elif 'unpaid' in name_lower or 'lwp' in name_lower or 'loss of pay' in name_lower:
-            return 'UL'
-        elif 'management' in name_lower or 'mgmt' in name_lower:
-            return 'ML'
-        elif 'on duty' in name_lower or name_lower == 'od' or 'onduty' in name_lower:
-            return 'OD'
-        elif 'half' in name_lower:
-            return 'HD'
-        else:
-            # Return first 2-3 letters as code
-            return leave_type_name[:3].upper() if leave_type_name else 'L'
+        return self.env['hr.leave.type']._get_leave_type_code(leave_type_name)
+
+    def _get_daily_status(self, employee, start_date, end_date, summary_rows=None):
+        """Return daily attendance status for an employee from the daily summary,
+        computed on the fly when hr_attendance_gantt_enhanced is not installed."""
+        if 'hr.attendance.daily.summary' not in self.env:
+            return self._compute_daily_status(employee, start_date, end_date)
+        if summary_rows is None:
+            summary_rows = self.env['hr.attendance.daily.summary']._read_daily_rows(
+                employee, start_date, end_date).get(employee.id, {})
+
+        daily_status = {}
+        daily_status_detailed = {}  # For detailed sheet with leave types
+        today = fields.Date.today()
+        for day, row in summary_rows.items():
+            detailed_info = {'status': '', 'leave_type': '', 'is_half_day': False}
+            status = row['status_code'] or ''
+            if row['leave_type_id'] and status != 'H':
+                detailed_info['status'] = 'HD' if row['is_half_day'] else row['leave_code']
+                detailed_info['is_half_day'] = row['is_half_day']
+                detailed_info['leave_type'] = row['leave_code']
+            elif status == 'A' and day > today:
+                status = ''  # Future date - leave blank
+            else:
+                detailed_info['status'] = status
+            daily_status[day] = status
+            daily_status_detailed[day] = detailed_info
+
+        return daily_status, daily_status_detailed
 
-    def _get_daily_status(self, employee, start_date, end_date):
-        """Calculate daily attendance status for an employee."""
+    def _compute_daily_status(self, employee, start_date, end_date):
+        """Calculate daily attendance status for an employee from attendances,
+        leaves and the working calendar (used without the daily summary)."""
         calendar = employee.resource_calendar_id or employee.company_id.resource_calendar_id
         if not calendar:
             return {}, {}
@@ -249,8 +259,13 @@ class AttendancemasterWizard(models.TransientModel):
             })
 
         # Process each employee
+        summary_rows = {}
+        if 'hr.attendance.daily.summary' in self.env:
+            summary_rows = self.env['hr.attendance.daily.summary']._read_daily_rows(
+                employees, self.start_date, self.end_date)
         for idx, employee in enumerate(employees, start=1):
-            daily_status, daily_status_detailed = self._get_daily_status(employee, self.start_date, self.end_date)
+            daily_status, daily_status_detailed = self._get_daily_status(
+                employee, self.start_date, self.end_date, summary_rows.get(employee.id, {}))
             
             # Safely get employee_code (may be from hr_employee_entended module)
             emp_code = ''
@@ -16,6 +16,7 @@
                 ],
     'data': [
         'security/ir.model.access.csv',
+        'data/attendance_summary_data.xml',
         'views/attendance_report_wizard_views.xml',
         'reports/attendance_report.xml',
     ],
@@ -1,4 +1,7 @@
 from . import hr_attendance
+from . import hr_attendance_daily_summary
 from . import hr_employee
+from . import hr_employee_rollup
+from . import hr_leave
+from . import resource_calendar_leaves
 from . import attendance_report_wizard
-
@@ -1,6 +1,9 @@
 from odoo import models, fields, api
 import datetime
-from odoo.tools import date_utils
+from odoo.tools import date_utils, split_every
+
+# Number of employees whose metrics are computed together
+REPORT_BATCH_SIZE = 200
 
 
 class AttendanceReportWizard(models.TransientModel):
@@ -30,69 +33,93 @@ class AttendanceReportWizard(models.TransientModel):
     def _prepare_report_payload(self):
         """Build the dataset expected by the XLSX report."""
         self.ensure_one()
-        employees = self.employee_ids or self.env['hr.employee'].search([])
-        data = []
+        return {'data': list(self._iter_report_rows())}
+
+    def _get_report_employees(self):
+        self.ensure_one()
+        return self.employee_ids or self.env['hr.employee'].search([])
+
+    def _iter_report_rows(self):
+        """Yield the report rows employee by employee.
+
+        Employees are processed in batches: attendance rollups, shift presence
+        and calendar expansions are computed once per batch, and the employee
+        counters (leaves, allocations, contracts, worked hours) are computed
+        by the ORM for the whole batch at once.
+        """
+        self.ensure_one()
         date_range = [self.start_date + datetime.timedelta(days=x) for x in range((self.end_date - self.start_date).days + 1)]
-        for employee in employees:
-            metrics = employee._get_attendance_metrics(self.start_date, self.end_date)
-            row = {
-                'employee_code': employee.employee_code or '',
-                'full_name': employee.name or '',
-                'employment_status': employee.contract_id.state if employee.contract_id else '',
-                'company': employee.company_id.name or '',
-                'business_unit': employee.company_id.city if employee.company_id else '',
-                'department': employee.department_id.name if employee.department_id else '',
-                'designation': employee.job_id.name if employee.job_id else '',
-                'card_no': employee.barcode or '',
-                'father_name': employee.father_name if employee.father_name else '',
-                'age': '',
-                'gender': employee.gender if employee.gender else None,
-                'date_of_joining': employee.joining_date or '',
-                'days_p|p': metrics.get('days_p|p', 0),
-                'days_p|a': metrics.get('days_p|a', 0),
-                'days_a|p': metrics.get('days_a|p', 0),
-                'days_a|a': metrics.get('days_a|a', 0),
-                'expected_work_days': metrics.get('expected_work_days', 0),
-                'present': metrics.get('present', 0),
-                'weekoff': metrics.get('weekoff', 0),
-                'holiday': metrics.get('holiday', 0),
-                'cl': metrics.get('CL', 0),
-                'co': metrics.get('CO', 0),
-                'comp-off': metrics.get('Comp-off', 0),
-                'el': metrics.get('EL', 0),
-                'sl': metrics.get('SL', 0),
-                'no_of_leaves_paid': metrics.get('no_of_leaves_paid', 0),
-                'no_of_leaves_unpaid': metrics.get('no_of_leaves_unpaid', 0),
-                'absent': metrics.get('absent', 0),
-                'pay_days': metrics.get('pay_days', 0),
-                'total': metrics.get('total', 0),
-                'expected_working_hours': metrics.get('expected_working_hours', 0),
-                'actual_working_hours': metrics.get('actual_working_hours', 0),
-                'count_of_ar': metrics.get('count_of_ar', 0),
-                'count_of_od': metrics.get('count_of_od', 0),
-                'count_of_short_leave': metrics.get('count_of_short_leave', 0),
-                'count_of_early_late': metrics.get('count_of_early_late', 0),
-                'last_attendance_worked_hours': metrics.get('last_attendance_worked_hours', 0),
-                'attendance_state': metrics.get('attendance_state', ''),
-                'total_overtime': metrics.get('total_overtime', 0),
-                'remaining_leaves': metrics.get('remaining_leaves', 0),
-                'leaves_count': metrics.get('leaves_count', 0),
-                'hours_previously_today': metrics.get('hours_previously_today', 0),
-                'hours_last_month': metrics.get('hours_last_month', 0),
-                'allocation_count': metrics.get('allocation_count', 0),
-                'allocations_count': metrics.get('allocations_count', 0),
-                'contracts_count': metrics.get('contracts_count', 0),
-                'resource_calendar_id': metrics.get('resource_calendar_id', ''),
-                'expense_manager_id': metrics.get('expense_manager_id', ''),
-                'leave_manager_id': metrics.get('leave_manager_id', ''),
-            }
-            # Add daily statuses
-            for date in date_range:
-                row[str(date)] = metrics['daily_status'].get(str(date), '')
-            data.append(row)
-        return {'data': data}
+        employee_ids = self._get_report_employees().ids
+        for batch_ids in split_every(REPORT_BATCH_SIZE, employee_ids):
+            employees = self.env['hr.employee'].browse(batch_ids)
+            rollups = employees._get_attendance_rollups(self.start_date, self.end_date)
+            presence = employees._get_shift_presence(self.start_date, self.end_date)
+            for employee in employees:
+                yield self._prepare_report_row(employee, rollups[employee.id], presence[employee.id], date_range)
+            # Keep the cache bounded on whole-company reports
+            self.env.invalidate_all()
+
+    def _prepare_report_row(self, employee, rollup, presence, date_range):
+        leave_days = rollup['leave_days_by_type']
+        transitions = employee._get_shift_transition_counts(presence)
+        daily_status = employee._get_daily_status_labels(self.start_date, self.end_date, rollup, presence)
+        row = {
+            'employee_code': employee.employee_code or '',
+            'full_name': employee.name or '',
+            'employment_status': employee.contract_id.state if employee.contract_id else '',
+            'company': employee.company_id.name or '',
+            'business_unit': employee.company_id.city if employee.company_id else '',
+            'department': employee.department_id.name if employee.department_id else '',
+            'designation': employee.job_id.name if employee.job_id else '',
+            'card_no': employee.barcode or '',
+            'father_name': employee.father_name if employee.father_name else '',
+            'age': '',
+            'gender': employee.gender if employee.gender else None,
+            'date_of_joining': employee.joining_date or '',
+            'days_p|p': transitions['days_p|p'],
+            'days_p|a': transitions['days_p|a'],
+            'days_a|p': transitions['days_a|p'],
+            'days_a|a': transitions['days_a|a'],
+            'expected_work_days': rollup['expected_work_days'],
+            'present': rollup['present'],
+            'weekoff': rollup['weekoff'],
+            'holiday': rollup['holiday'],
+            'cl': leave_days.get('CL', 0),
+            'co': leave_days.get('CO', 0),
+            'comp-off': leave_days.get('Comp-off', 0),
+            'el': leave_days.get('EL', 0),
+            'sl': leave_days.get('SL', 0),
+            'no_of_leaves_paid': rollup['no_of_leaves_paid'],
+            'no_of_leaves_unpaid': rollup['no_of_leaves_unpaid'],
+            'absent': rollup['absent'],
+            'pay_days': rollup['pay_days'],
+            'total': rollup['total'],
+            'expected_working_hours': rollup['expected_working_hours'],
+            'actual_working_hours': rollup['actual_working_hours'],
+            'count_of_ar': rollup['count_of_ar'],
+            'count_of_od': rollup['count_of_od'],
+            'count_of_short_leave': rollup['count_of_short_leave'],
+            'count_of_early_late': presence['early_late'],
+            'last_attendance_worked_hours': employee.last_attendance_worked_hours if employee.last_attendance_id else 0,
+            'attendance_state': employee.attendance_state or '',
+            'total_overtime': rollup['total_overtime'],
+            'remaining_leaves': employee.remaining_leaves,
+            'leaves_count': employee.leaves_count,
+            'hours_previously_today': employee.hours_previously_today,
+            'hours_last_month': employee.hours_last_month,
+            'allocation_count': employee.allocation_count,
+            'allocations_count': employee.allocations_count,
+            'contracts_count': employee.contracts_count,
+            'resource_calendar_id': employee.resource_calendar_id.name if employee.resource_calendar_id else '',
+            'expense_manager_id': employee.expense_manager_id.name if employee.expense_manager_id else '',
+            'leave_manager_id': employee.leave_manager_id.name if employee.leave_manager_id else '',
+        }
+        # Add daily statuses
+        for date in date_range:
+            row[str(date)] = daily_status.get(str(date), '')
+        return row
 
     def action_generate_report(self):
         self.ensure_one()
-        report_data = self._prepare_report_payload()
-        return self.env.ref('hr_attendance_gantt_enhanced.attendance_report_xlsx').report_action(self, data=report_data)
\ No newline at end of file
+        # Rows are streamed to the XLSX writer instead of being sent through the action
+        return self.env.ref('hr_attendance_gantt_enhanced.attendance_report_xlsx').report_action(self)
@@ -1,45 +1,142 @@
 from odoo import models, api, fields
-from odoo.addons.resource.models.utils import Intervals
 from pytz import UTC
+import datetime
+from collections import defaultdict
+
+# Reason shown on a gantt unavailability when several intervals overlap it
+GANTT_REASON_PRIORITY = {
+    'half_day_leave': 1,
+    'leave': 2,
+    'holiday': 3,
+}
 
 class HrAttendance(models.Model):
     _inherit = 'hr.attendance'
 
+    def _get_summary_dates(self):
+        """Return {employee_id: dates} of the daily summary lines these attendances touch."""
+        dates_by_employee = defaultdict(set)
+        for attendance in self:
+            if not attendance.check_in:
+                continue
+            # One extra day on each side covers the UTC to local date shift
+            current = attendance.check_in.date() - datetime.timedelta(days=1)
+            stop = (attendance.check_out or attendance.check_in).date() + datetime.timedelta(days=1)
+            while current <= stop:
+                dates_by_employee[attendance.employee_id.id].add(current)
+                current += datetime.timedelta(days=1)
+        return dates_by_employee
+
+    def _refresh_daily_summary(self, dates_by_employee=None):
+        if self.env.context.get('skip_attendance_summary'):
+            return
+        dates_by_employee = dates_by_employee if dates_by_employee is not None else self._get_summary_dates()
+        self.env['hr.attendance.daily.summary']._refresh_keys(dates_by_employee)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        attendances = super().create(vals_list)
+        attendances._refresh_daily_summary()
+        return attendances
+
+    def write(self, vals):
+        tracked = {'employee_id', 'check_in', 'check_out', 'worked_hours'} & set(vals)
+        old_dates = self._get_summary_dates() if tracked else {}
+        res = super().write(vals)
+        if tracked:
+            dates_by_employee = self._get_summary_dates()
+            for employee_id, dates in old_dates.items():
+                dates_by_employee[employee_id] |= dates
+            self._refresh_daily_summary(dates_by_employee)
+        return res
+
+    def unlink(self):
+        dates_by_employee = self._get_summary_dates()
+        res = super().unlink()
+        self.env['hr.attendance']._refresh_daily_summary(dates_by_employee)
+        return res
+
     def _gantt_unavailability(self, field, res_ids, start, stop, scale):
         result = super()._gantt_unavailability(field, res_ids, start, stop, scale)
         if field != "employee_id":
             return result
 
-        employees = self.env['hr.employee'].browse(res_ids)
-        leaves = self.env['hr.leave'].search([
-            ('employee_id', 'in', res_ids),
+        intervals_by_employee = self._get_gantt_reason_intervals(
+            [employee_id for employee_id in res_ids if employee_id in result], start, stop)
+        for employee_id, unavailabilities in result.items():
+            if employee_id in intervals_by_employee:
+                self._set_unavailability_reasons(unavailabilities, intervals_by_employee[employee_id])
+        return result
+
+    @api.model
+    def _get_gantt_reason_intervals(self, employee_ids, start, stop):
+        """Return {employee_id: [(start, stop, priority, reason, name)]} sorted by
+        start, covering validated leaves, half-day leaves and public holidays."""
+        employees = self.env['hr.employee'].browse(employee_ids)
+        intervals_by_employee = {employee.id: [] for employee in employees}
+        if not employees:
+            return intervals_by_employee
+
+        for leave in self.env['hr.leave'].search_read([
+            ('employee_id', 'in', employees.ids),
             ('state', '=', 'validate'),
             ('date_from', '<', stop),
             ('date_to', '>', start),
-        ])
-
-        leave_intervals_by_employee = {}
-        for leave in leaves:
-            employee_id = leave.employee_id.id
-            leave_start = leave.date_from.astimezone(UTC)
-            leave_stop = leave.date_to.astimezone(UTC)
-            if employee_id not in leave_intervals_by_employee:
-                leave_intervals_by_employee[employee_id] = []
-            leave_intervals_by_employee[employee_id].append((leave_start, leave_stop))
-
-        for employee_id in res_ids:
-            if employee_id not in result:
-                continue
-            unavailabilities = result[employee_id]
-            leave_intervals = leave_intervals_by_employee.get(employee_id, [])
-            for unavail in unavailabilities:
-                unavail_start = unavail['start']
-                unavail_stop = unavail['stop']
-                for leave_start, leave_stop in leave_intervals:
-                    if max(unavail_start, leave_start) < min(unavail_stop, leave_stop):
-                        unavail['reason'] = 'leave'
-                        break
-                else:
-                    unavail['reason'] = 'non-working'
-
-        return result
\ No newline at end of file
+        ], ['employee_id', 'date_from', 'date_to', 'request_unit_half', 'holiday_status_id']):
+            reason = 'half_day_leave' if leave['request_unit_half'] else 'leave'
+            intervals_by_employee[leave['employee_id'][0]].append((
+                UTC.localize(leave['date_from']), UTC.localize(leave['date_to']),
+                GANTT_REASON_PRIORITY[reason], reason, leave['holiday_status_id'][1],
+            ))
+
+        # Public holidays apply to every employee of the company on that calendar
+        calendar_by_employee = {
+            employee.id: employee.resource_calendar_id or employee.company_id.resource_calendar_id
+            for employee in employees
+        }
+        calendars = self.env['resource.calendar'].union(*calendar_by_employee.values())
+        holidays = self.env['resource.calendar.leaves'].search_read([
+            ('resource_id', '=', False),
+            ('company_id', 'in', [False] + employees.company_id.ids),
+            ('calendar_id', 'in', [False] + calendars.ids),
+            ('date_from', '<', stop),
+            ('date_to', '>', start),
+        ], ['company_id', 'calendar_id', 'date_from', 'date_to', 'name'], load=None)
+        for employee in employees:
+            calendar = calendar_by_employee[employee.id]
+            for holiday in holidays:
+                if holiday['company_id'] not in (False, employee.company_id.id):
+                    continue
+                if holiday['calendar_id'] not in (False, calendar.id):
+                    continue
+                intervals_by_employee[employee.id].append((
+                    UTC.localize(holiday['date_from']), UTC.localize(holiday['date_to']),
+                    GANTT_REASON_PRIORITY['holiday'], 'holiday', holiday['name'],
+                ))
+
+        for intervals in intervals_by_employee.values():
+            intervals.sort(key=lambda interval: interval[0])
+        return intervals_by_employee
+
+    @api.model
+    def _set_unavailability_reasons(self, unavailabilities, intervals):
+        """Tag each unavailability with the most relevant overlapping interval.
+
+        Unavailabilities and intervals are both walked in start order: the
+        next pointer only moves forward and the active list only keeps the
+        intervals still open at the current slot.
+        """
+        active = []
+        next_index = 0
+        for unavail in sorted(unavailabilities, key=lambda slot: slot['start']):
+            while next_index < len(intervals) and intervals[next_index][0] < unavail['stop']:
+                active.append(intervals[next_index])
+                next_index += 1
+            active = [interval for interval in active if interval[1] > unavail['start']]
+            overlapping = [interval for interval in active if interval[0] < unavail['stop']]
+            if overlapping:
+                dummy, dummy, dummy, reason, name = max(overlapping, key=lambda interval: interval[2])
+                unavail['reason'] = reason
+                unavail['reason_name'] = name
+            else:
+                unavail['reason'] = 'non-working'
@@ -0,0 +1,204 @@
+from odoo import models, fields, api
+from odoo.tools import split_every
+import datetime
+from collections import defaultdict
+
+# Number of employees refreshed together
+SUMMARY_BATCH_SIZE = 200
+
+SUMMARY_READ_FIELDS = [
+    'employee_id', 'date', 'first_check_in', 'last_check_out', 'attendance_count', 'worked_hours',
+    'overtime_hours', 'last_worked_hours', 'expected_hours', 'is_work_day', 'is_holiday',
+    'leave_type_id', 'leave_code', 'is_half_day', 'status_code',
+]
+
+
+class HrAttendanceDailySummary(models.Model):
+    _name = 'hr.attendance.daily.summary'
+    _description = 'Daily Attendance Summary'
+    _order = 'date desc, employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, ondelete='cascade', index=True)
+    date = fields.Date(string='Date', required=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', index=True)
+    first_check_in = fields.Datetime(string='First Check In')
+    last_check_out = fields.Datetime(string='Last Check Out')
+    attendance_count = fields.Integer(string='Attendances')
+    worked_hours = fields.Float(string='Worked Hours')
+    overtime_hours = fields.Float(string='Overtime Hours')
+    last_worked_hours = fields.Float(string='Last Attendance Hours')
+    expected_hours = fields.Float(string='Expected Hours')
+    is_work_day = fields.Boolean(string='Working Day')
+    is_holiday = fields.Boolean(string='Public Holiday')
+    leave_type_id = fields.Many2one('hr.leave.type', string='Time Off Type')
+    leave_code = fields.Char(string='Leave Code')
+    is_half_day = fields.Boolean(string='Half Day Leave')
+    status_code = fields.Selection([
+        ('P', 'Present'),
+        ('A', 'Absent'),
+        ('W', 'Week Off'),
+        ('H', 'Holiday'),
+        ('L', 'Leave'),
+    ], string='Status')
+
+    _sql_constraints = [
+        ('employee_date_uniq', 'unique(employee_id, date)', 'Only one summary line per employee and day is allowed.'),
+    ]
+
+    @api.model
+    def _prepare_summary_vals(self, employees, date_from, date_to):
+        """Build the summary lines of employees over [date_from, date_to] from
+        raw attendances, approved leaves, calendars and public holidays."""
+        daily_by_employee = employees._get_attendance_daily_rollup(date_from, date_to)
+        leaves_by_employee = employees._get_leave_rollup(date_from, date_to)
+        calendar_by_employee = employees._get_calendar_rollup(date_from, date_to)
+        date_range = [date_from + datetime.timedelta(days=x) for x in range((date_to - date_from).days + 1)]
+        LeaveType = self.env['hr.leave.type']
+
+        vals_list = []
+        for employee in employees:
+            daily = daily_by_employee.get(employee.id, {})
+            leave_by_date = leaves_by_employee.get(employee.id, {}).get('by_date', {})
+            calendar_data = calendar_by_employee.get(employee.id, {})
+            hours_by_date = calendar_data.get('hours_by_date', {})
+            holiday_dates = calendar_data.get('holiday_dates', set())
+            for day in date_range:
+                attendance = daily.get(day)
+                leave = leave_by_date.get(day)
+                vals = {
+                    'employee_id': employee.id,
+                    'date': day,
+                    'company_id': employee.company_id.id,
+                    'is_work_day': day in hours_by_date,
+                    'expected_hours': hours_by_date.get(day, 0.0),
+                    'is_holiday': day in holiday_dates,
+                    'attendance_count': 0,
+                    'worked_hours': 0.0,
+                    'overtime_hours': 0.0,
+                    'last_worked_hours': 0.0,
+                }
+                if attendance:
+                    vals.update({
+                        'first_check_in': attendance['first_check_in'],
+                        'last_check_out': attendance['last_check_out'],
+                        'attendance_count': attendance['attendance_count'],
+                        'worked_hours': attendance['worked_hours'],
+                        'overtime_hours': attendance['overtime_hours'],
+                        'last_worked_hours': attendance['last_worked_hours'],
+                    })
+                if leave:
+                    vals.update({
+                        'leave_type_id': leave['leave_type_id'],
+                        'leave_code': LeaveType._get_leave_type_code(leave['type_name']),
+                        'is_half_day': leave['is_half_day'],
+                    })
+
+                if vals['is_holiday']:
+                    status = 'H'
+                elif leave:
+                    # Half day leave with attendance counts as present
+                    status = 'P' if leave['is_half_day'] and attendance else 'L'
+                elif not vals['is_work_day']:
+                    status = 'W'
+                elif attendance:
+                    status = 'P'
+                else:
+                    status = 'A'
+                vals['status_code'] = status
+                vals_list.append(vals)
+        return vals_list
+
+    @api.model
+    def _refresh(self, employees, date_from, date_to):
+        """Recompute the summary lines of employees over [date_from, date_to].
+        Only days up to today are stored, later ones are computed on read."""
+        employees = employees.sudo().exists()
+        date_to = min(date_to, fields.Date.context_today(self))
+        if not employees or date_from > date_to:
+            return
+        summary = self.sudo()
+        for employee_ids in split_every(SUMMARY_BATCH_SIZE, employees.ids):
+            batch = employees.browse(employee_ids)
+            vals_list = summary._prepare_summary_vals(batch, date_from, date_to)
+            self.env.cr.execute("""
+                DELETE FROM hr_attendance_daily_summary
+                 WHERE employee_id = ANY(%s) AND date BETWEEN %s AND %s
+            """, (list(employee_ids), date_from, date_to))
+            summary.invalidate_model()
+            summary.create(vals_list)
+
+    @api.model
+    def _refresh_keys(self, dates_by_employee):
+        """Refresh {employee_id: set(dates)}, one span per group of employees
+        sharing the same date bounds."""
+        employees_by_span = defaultdict(list)
+        for employee_id, dates in dates_by_employee.items():
+            if employee_id and dates:
+                employees_by_span[(min(dates), max(dates))].append(employee_id)
+        for (date_from, date_to), employee_ids in employees_by_span.items():
+            self._refresh(self.env['hr.employee'].browse(employee_ids), date_from, date_to)
+
+    @api.model
+    def _read_daily_rows(self, employees, date_from, date_to):
+        """Return {employee_id: {date: summary values}} from the stored lines.
+
+        Only the days without a line are computed, in memory and without
+        persisting them: days after today, which are never stored, and past
+        days the hooks and the cron have not built. Reads never write.
+        """
+        domain = [('employee_id', 'in', employees.ids), ('date', '>=', date_from), ('date', '<=', date_to)]
+        rows = self.sudo().search_read(domain, SUMMARY_READ_FIELDS, load=None)
+        result = defaultdict(dict)
+        for row in rows:
+            result[row['employee_id']][row['date']] = row
+
+        date_range = [date_from + datetime.timedelta(days=x) for x in range((date_to - date_from).days + 1)]
+        missing_by_employee = {}
+        for employee in employees:
+            missing = {day for day in date_range if day not in result[employee.id]}
+            if missing:
+                missing_by_employee[employee.id] = missing
+        self._fill_missing_rows(result, missing_by_employee)
+        return result
+
+    @api.model
+    def _fill_missing_rows(self, result, missing_by_employee):
+        """Compute the {employee_id: set(dates)} missing from result, one span
+        per group of employees sharing the same missing date bounds."""
+        employees_by_span = defaultdict(list)
+        for employee_id, dates in missing_by_employee.items():
+            employees_by_span[(min(dates), max(dates))].append(employee_id)
+        summary = self.sudo()
+        for (date_from, date_to), span_employee_ids in employees_by_span.items():
+            for employee_ids in split_every(SUMMARY_BATCH_SIZE, span_employee_ids):
+                batch = self.env['hr.employee'].sudo().browse(employee_ids)
+                for vals in summary._prepare_summary_vals(batch, date_from, date_to):
+                    if vals['date'] in missing_by_employee[vals['employee_id']]:
+                        result[vals['employee_id']][vals['date']] = {
+                            field: vals.get(field, False) for field in SUMMARY_READ_FIELDS}
+
+    @api.model
+    def _rebuild(self, employees=None, date_from=None, date_to=None):
+        """Rebuild the summary history month by month.
+
+        Defaults to all active employees over the last
+        ``hr_attendance_gantt_enhanced.summary_history_days`` days (365).
+        """
+        employees = employees or self.env['hr.employee'].sudo().search([])
+        date_to = date_to or fields.Date.context_today(self)
+        if not date_from:
+            history_days = int(self.env['ir.config_parameter'].sudo().get_param(
+                'hr_attendance_gantt_enhanced.summary_history_days', 365))
+            date_from = date_to - datetime.timedelta(days=history_days)
+        month_start = date_from
+        while month_start <= date_to:
+            month_end = min((month_start.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+                            - datetime.timedelta(days=1), date_to)
+            self._refresh(employees, month_start, month_end)
+            month_start = month_end + datetime.timedelta(days=1)
+
+    @api.model
+    def _cron_refresh_recent(self):
+        """Catch up on calendar changes not covered by the write hooks."""
+        today = fields.Date.context_today(self)
+        self._rebuild(date_from=today - datetime.timedelta(days=7), date_to=today)
@@ -0,0 +1,333 @@
+from odoo import models, fields
+from pytz import timezone, UTC
+import datetime
+from collections import defaultdict
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def _get_attendance_rollups(self, start_date, end_date):
+        """Compute the attendance dashboard metrics of every employee in self.
+
+        Per-day facts are read from the precomputed daily summary (built on
+        the fly for missing days) and approved leaves are totalled with one
+        more query.
+
+        :return: {employee_id: metrics dict}
+        """
+        date_from = fields.Date.to_date(start_date)
+        date_to = fields.Date.to_date(end_date)
+        today = fields.Date.context_today(self)
+        rows_by_employee = self.env['hr.attendance.daily.summary']._read_daily_rows(self, date_from, date_to)
+        leaves_by_employee = self._get_leave_rollup(date_from, date_to)
+
+        rollups = {}
+        total_days = (date_to - date_from).days + 1
+        for employee in self:
+            rows = rows_by_employee.get(employee.id, {})
+            leave_data = leaves_by_employee.get(employee.id, {})
+            daily = {day: row for day, row in rows.items() if row['attendance_count']}
+            work_dates = {day for day, row in rows.items() if row['is_work_day']}
+            leave_dates = {day for day, row in rows.items() if row['leave_type_id']}
+            present_dates = set(daily)
+
+            last_day = max(daily) if daily else None
+            expected_days = len(work_dates)
+            leave_days = sum(leave_data.get('days_by_type', {}).values())
+            present_to_date = {day for day in present_dates if day <= today}
+            leave_to_date = {day for day in leave_dates & work_dates if day <= today} - present_dates
+            expected_to_date = len([day for day in work_dates if day <= today])
+            metrics = {
+                'expected_work_days': expected_days,
+                'expected_working_hours': sum(row['expected_hours'] for row in rows.values()),
+                'weekoff': total_days - expected_days,
+                'holiday': len([row for row in rows.values() if row['is_holiday']]),
+                'present': len(present_dates),
+                'actual_working_hours': sum(row['worked_hours'] for row in daily.values()),
+                'count_of_ar': sum(row['attendance_count'] for row in daily.values()),
+                'count_of_od': len([row for row in daily.values() if row['overtime_hours'] > 0]),
+                'total_overtime': sum(row['overtime_hours'] for row in daily.values()),
+                'last_attendance_worked_hours': daily[last_day]['last_worked_hours'] if last_day else 0.0,
+                'hours_previously_today': daily[today]['worked_hours'] if today in daily else 0.0,
+                'no_of_leaves_paid': leave_data.get('paid', 0.0),
+                'no_of_leaves_unpaid': leave_data.get('unpaid', 0.0),
+                'count_of_short_leave': leave_data.get('short', 0),
+                'time_off_days': leave_days,
+                'absent': max(expected_days - len(present_dates) - leave_days, 0),
+                'absent_to_date': max(expected_to_date - len(present_to_date) - len(leave_to_date), 0),
+                'pay_days': len(present_dates) + leave_data.get('paid', 0.0),
+                'total': total_days,
+                'leave_days_by_type': leave_data.get('days_by_type', {}),
+                'daily': daily,
+                'leave_dates': leave_dates,
+                'holiday_dates': {day for day, row in rows.items() if row['is_holiday']},
+                'work_dates': work_dates,
+            }
+            rollups[employee.id] = metrics
+        return rollups
+
+    def _get_attendance_daily_rollup(self, date_from, date_to):
+        """Aggregate attendances per employee and local check-in date.
+
+        :return: {employee_id: {date: {attendance_count, worked_hours,
+                 overtime_hours, first_check_in, last_check_out,
+                 last_worked_hours}}}
+        """
+        if not self:
+            return {}
+        self.env['hr.attendance'].flush_model(['employee_id', 'check_in', 'check_out', 'worked_hours'])
+        # Widen the UTC window by a day on each side, the local date filter is exact
+        self.env.cr.execute("""
+            WITH emp AS (
+                SELECT e.id AS employee_id,
+                       COALESCE(cal.tz, ccal.tz, 'UTC') AS tz,
+                       COALESCE(cal.hours_per_day, ccal.hours_per_day, 0) AS hours_per_day
+                  FROM hr_employee e
+             LEFT JOIN resource_calendar cal ON cal.id = e.resource_calendar_id
+             LEFT JOIN res_company c ON c.id = e.company_id
+             LEFT JOIN resource_calendar ccal ON ccal.id = c.resource_calendar_id
+                 WHERE e.id = ANY(%(employee_ids)s)
+            ), att AS (
+                SELECT a.employee_id,
+                       (a.check_in AT TIME ZONE 'UTC' AT TIME ZONE emp.tz)::date AS day,
+                       a.check_in, a.check_out, a.worked_hours, emp.hours_per_day
+                  FROM hr_attendance a
+                  JOIN emp ON emp.employee_id = a.employee_id
+                 WHERE a.check_in >= %(utc_from)s
+                   AND a.check_in < %(utc_to)s
+            )
+            SELECT employee_id,
+                   day,
+                   COUNT(*) AS attendance_count,
+                   SUM(worked_hours) AS worked_hours,
+                   SUM(GREATEST(worked_hours - hours_per_day, 0)) AS overtime_hours,
+                   MIN(check_in) AS first_check_in,
+                   MAX(check_out) AS last_check_out,
+                   (ARRAY_AGG(worked_hours ORDER BY check_out DESC NULLS LAST))[1] AS last_worked_hours
+              FROM att
+             WHERE day BETWEEN %(date_from)s AND %(date_to)s
+          GROUP BY employee_id, day
+        """, {
+            'employee_ids': self.ids,
+            'utc_from': datetime.datetime.combine(date_from - datetime.timedelta(days=1), datetime.time.min),
+            'utc_to': datetime.datetime.combine(date_to + datetime.timedelta(days=2), datetime.time.min),
+            'date_from': date_from,
+            'date_to': date_to,
+        })
+        result = defaultdict(dict)
+        for row in self.env.cr.dictfetchall():
+            employee_id = row.pop('employee_id')
+            day = row.pop('day')
+            for key in ('worked_hours', 'overtime_hours', 'last_worked_hours'):
+                row[key] = row[key] or 0.0
+            result[employee_id][day] = row
+        return result
+
+    def _get_leave_rollup(self, date_from, date_to):
+        """Summarize approved leaves touching the period, per employee.
+
+        :return: {employee_id: {days_by_type, paid, unpaid, short, dates,
+                 by_date: {date: {leave_type_id, type_name, is_half_day}}}}
+        """
+        if not self:
+            return {}
+        leaves = self.env['hr.leave'].sudo().search_read([
+            ('employee_id', 'in', self.ids),
+            ('state', '=', 'validate'),
+            ('date_from', '<', datetime.datetime.combine(date_to + datetime.timedelta(days=2), datetime.time.min)),
+            ('date_to', '>', datetime.datetime.combine(date_from - datetime.timedelta(days=1), datetime.time.min)),
+        ], ['employee_id', 'date_from', 'date_to', 'number_of_days', 'holiday_status_id', 'request_unit_half'])
+        if not leaves:
+            return {}
+        leave_types = {
+            leave_type['id']: leave_type
+            for leave_type in self.env['hr.leave.type'].sudo().browse(
+                list({leave['holiday_status_id'][0] for leave in leaves})).read(['name', 'unpaid'])
+        }
+        tz_by_employee = {employee.id: employee._get_calendar_tz() for employee in self}
+
+        result = {}
+        for leave in leaves:
+            employee_id = leave['employee_id'][0]
+            tz = tz_by_employee[employee_id]
+            leave_start = UTC.localize(leave['date_from']).astimezone(tz).date()
+            leave_end = UTC.localize(leave['date_to']).astimezone(tz).date()
+            if leave_start > date_to or leave_end < date_from:
+                continue
+            data = result.setdefault(employee_id, {
+                'days_by_type': defaultdict(float), 'paid': 0.0, 'unpaid': 0.0, 'short': 0, 'dates': set(),
+                'by_date': {},
+            })
+            leave_type = leave_types[leave['holiday_status_id'][0]]
+            days = leave['number_of_days']
+            data['days_by_type'][leave_type['name']] += days
+            data['unpaid' if leave_type['unpaid'] else 'paid'] += days
+            if days < 1:
+                data['short'] += 1
+            current = max(leave_start, date_from)
+            while current <= min(leave_end, date_to):
+                data['dates'].add(current)
+                data['by_date'][current] = {
+                    'leave_type_id': leave_type['id'],
+                    'type_name': leave_type['name'],
+                    'is_half_day': leave['request_unit_half'],
+                }
+                current += datetime.timedelta(days=1)
+        return result
+
+    def _get_calendar_rollup(self, date_from, date_to):
+        """Expand each working calendar once for all its employees.
+
+        Public holidays of the employees' companies are read once and kept for
+        the calendars they apply to.
+
+        :return: {employee_id: {calendar, tz, intervals, work_dates, hours,
+                 hours_by_date, weekoff, holiday_dates}}
+        """
+        employees_by_calendar = defaultdict(lambda: self.env['hr.employee'])
+        for employee in self:
+            calendar = employee.resource_calendar_id or employee.company_id.resource_calendar_id
+            if calendar and employee.resource_id:
+                employees_by_calendar[calendar] |= employee
+
+        total_days = (date_to - date_from).days + 1
+        holidays = self.env['resource.calendar.leaves'].sudo().search([
+            ('resource_id', '=', False),
+            ('calendar_id', 'in', [False] + [calendar.id for calendar in employees_by_calendar]),
+            ('company_id', 'in', [False] + self.company_id.ids),
+            ('date_from', '<', datetime.datetime.combine(date_to + datetime.timedelta(days=2), datetime.time.min)),
+            ('date_to', '>', datetime.datetime.combine(date_from - datetime.timedelta(days=1), datetime.time.min)),
+        ]) if employees_by_calendar else []
+        result = {}
+        for calendar, employees in employees_by_calendar.items():
+            tz = timezone(calendar.tz) if calendar.tz else UTC
+            start = tz.localize(datetime.datetime.combine(date_from, datetime.time.min))
+            stop = tz.localize(datetime.datetime.combine(date_to, datetime.time.max))
+            intervals_by_resource = calendar._attendance_intervals_batch(start, stop, resources=employees.resource_id)
+            holiday_dates = set()
+            for holiday in holidays:
+                if holiday.calendar_id and holiday.calendar_id != calendar:
+                    continue
+                if holiday.company_id and calendar.company_id and holiday.company_id != calendar.company_id:
+                    continue
+                current = max(UTC.localize(holiday.date_from).astimezone(tz), start).date()
+                while current <= min(UTC.localize(holiday.date_to).astimezone(tz), stop).date():
+                    holiday_dates.add(current)
+                    current += datetime.timedelta(days=1)
+            for employee in employees:
+                intervals = list(intervals_by_resource[employee.resource_id.id])
+                hours_by_date = defaultdict(float)
+                for interval in intervals:
+                    hours_by_date[interval[0].date()] += (interval[1] - interval[0]).total_seconds() / 3600
+                result[employee.id] = {
+                    'calendar': calendar,
+                    'tz': tz,
+                    'intervals': intervals,
+                    'work_dates': set(hours_by_date),
+                    'hours': sum(hours_by_date.values()),
+                    'hours_by_date': hours_by_date,
+                    'weekoff': total_days - len(hours_by_date),
+                    'holiday_dates': holiday_dates,
+                }
+        return result
+
+    def _get_calendar_tz(self):
+        self.ensure_one()
+        calendar = self.resource_calendar_id or self.company_id.resource_calendar_id
+        return timezone(calendar.tz) if calendar.tz else UTC
+
+    def _get_shift_presence(self, date_from, date_to):
+        """Classify morning/afternoon presence of every employee in self.
+
+        Each calendar is expanded once for the whole range (work and leave
+        intervals), completed attendances are read once, and every shift
+        interval is matched against the attendances with a sorted sweep.
+
+        :return: {employee_id: {
+            'days': {date: {'morning': bool|None, 'afternoon': bool|None, 'on_leave': bool}},
+            'early_late': int,
+            'today': date in the calendar timezone}}
+            A shift half is None when the calendar has no interval for it;
+            days without any work interval are left out.
+        """
+        calendar_by_employee = self._get_calendar_rollup(date_from, date_to)
+        leave_dates_by_employee = self._get_calendar_leave_dates(calendar_by_employee, date_from, date_to)
+
+        attendances_by_employee = defaultdict(list)
+        for attendance in self.env['hr.attendance'].sudo().search_read([
+            ('employee_id', 'in', self.ids),
+            ('check_in', '<', datetime.datetime.combine(date_to + datetime.timedelta(days=2), datetime.time.min)),
+            ('check_out', '>', datetime.datetime.combine(date_from - datetime.timedelta(days=1), datetime.time.min)),
+            ('check_out', '!=', False),
+        ], ['employee_id', 'check_in', 'check_out'], order='check_in'):
+            attendances_by_employee[attendance['employee_id'][0]].append(
+                (UTC.localize(attendance['check_in']), UTC.localize(attendance['check_out'])))
+
+        result = {}
+        for employee in self:
+            calendar_data = calendar_by_employee.get(employee.id)
+            tz = calendar_data['tz'] if calendar_data else employee._get_calendar_tz()
+            result[employee.id] = {'days': {}, 'early_late': 0, 'today': datetime.datetime.now(tz).date()}
+            if not calendar_data:
+                continue
+            attendances = attendances_by_employee.get(employee.id, [])
+            leave_dates = leave_dates_by_employee.get(employee.id, set())
+            days = result[employee.id]['days']
+            bounds = {}
+
+            # Sweep: intervals come sorted by start, attendances by check-in
+            first = 0
+            for start, stop, attendance in sorted(calendar_data['intervals'], key=lambda interval: interval[0]):
+                day = start.date()
+                while first < len(attendances) and attendances[first][1] <= start:
+                    first += 1
+                present = False
+                index = first
+                while index < len(attendances) and attendances[index][0] < stop:
+                    if attendances[index][1] > start:
+                        present = True
+                        break
+                    index += 1
+
+                shifts = days.setdefault(day, {'morning': None, 'afternoon': None, 'on_leave': day in leave_dates})
+                if attendance.day_period in ('morning', 'afternoon'):
+                    shifts[attendance.day_period] = bool(shifts[attendance.day_period]) or present
+                day_start, day_stop = bounds.get(day, (start, stop))
+                bounds[day] = (min(day_start, start), max(day_stop, stop))
+
+            # Early arrival or late departure against the day's working bounds
+            for check_in, check_out in attendances:
+                check_in = check_in.astimezone(tz)
+                day = check_in.date()
+                if day < date_from or day > date_to or day not in bounds:
+                    continue
+                expected_start, expected_end = bounds[day]
+                if check_in < expected_start or check_out.astimezone(tz) > expected_end:
+                    result[employee.id]['early_late'] += 1
+        return result
+
+    def _get_calendar_leave_dates(self, calendar_by_employee, date_from, date_to):
+        """Return {employee_id: local dates touched by a calendar leave interval}
+        with one leave expansion per calendar."""
+        employees_by_calendar = defaultdict(lambda: self.env['hr.employee'])
+        for employee in self:
+            if employee.id in calendar_by_employee:
+                employees_by_calendar[calendar_by_employee[employee.id]['calendar']] |= employee
+
+        result = {}
+        for calendar, employees in employees_by_calendar.items():
+            tz = timezone(calendar.tz) if calendar.tz else UTC
+            start = tz.localize(datetime.datetime.combine(date_from, datetime.time.min))
+            stop = tz.localize(datetime.datetime.combine(date_to, datetime.time.max))
+            leave_intervals = calendar._leave_intervals_batch(start, stop, resources=employees.resource_id)
+            for employee in employees:
+                dates = set()
+                for leave_start, leave_stop, dummy in leave_intervals[employee.resource_id.id]:
+                    current = leave_start.date()
+                    # An interval ending at midnight does not touch the next day
+                    while current <= (leave_stop - datetime.timedelta(microseconds=1)).date():
+                        dates.add(current)
+                        current += datetime.timedelta(days=1)
+                result[employee.id] = dates
+        return result
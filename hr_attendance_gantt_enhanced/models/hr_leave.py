@@ -0,0 +1,47 @@
+from odoo import models, api
+import datetime
+from collections import defaultdict
+
+
+class HrLeave(models.Model):
+    _inherit = 'hr.leave'
+
+    def _get_summary_dates(self):
+        """Return {employee_id: dates} of the daily summary lines these leaves touch."""
+        dates_by_employee = defaultdict(set)
+        for leave in self:
+            if not leave.employee_id or not leave.date_from or not leave.date_to:
+                continue
+            # One extra day on each side covers the UTC to local date shift
+            current = leave.date_from.date() - datetime.timedelta(days=1)
+            while current <= leave.date_to.date() + datetime.timedelta(days=1):
+                dates_by_employee[leave.employee_id.id].add(current)
+                current += datetime.timedelta(days=1)
+        return dates_by_employee
+
+    def _refresh_daily_summary(self, dates_by_employee):
+        if not self.env.context.get('skip_attendance_summary'):
+            self.env['hr.attendance.daily.summary']._refresh_keys(dates_by_employee)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        leaves = super().create(vals_list)
+        leaves._refresh_daily_summary(leaves.filtered(lambda leave: leave.state == 'validate')._get_summary_dates())
+        return leaves
+
+    def write(self, vals):
+        tracked = {'state', 'employee_id', 'date_from', 'date_to', 'holiday_status_id', 'request_unit_half'} & set(vals)
+        old_dates = self._get_summary_dates() if tracked else {}
+        res = super().write(vals)
+        if tracked:
+            dates_by_employee = self._get_summary_dates()
+            for employee_id, dates in old_dates.items():
+                dates_by_employee[employee_id] |= dates
+            self._refresh_daily_summary(dates_by_employee)
+        return res
+
+    def unlink(self):
+        dates_by_employee = self._get_summary_dates()
+        res = super().unlink()
+        self.env['hr.leave']._refresh_daily_summary(dates_by_employee)
+        return res
@@ -0,0 +1,58 @@
+from odoo import models, api
+import datetime
+from collections import defaultdict
+
+
+class ResourceCalendarLeaves(models.Model):
+    _inherit = 'resource.calendar.leaves'
+
+    def _get_summary_dates(self):
+        """Return {employee_id: dates} of the daily summary lines these public
+        holidays touch. Time off is left to the hr.leave hooks."""
+        holidays = self.filtered(lambda leave: not leave.resource_id and leave.date_from and leave.date_to)
+        if not holidays:
+            return {}
+        domain = [('company_id', 'in', holidays.company_id.ids)] if all(holidays.mapped('company_id')) else []
+        employees = self.env['hr.employee'].sudo().search(domain)
+        dates_by_employee = defaultdict(set)
+        for holiday in holidays:
+            dates = set()
+            current = holiday.date_from.date() - datetime.timedelta(days=1)
+            while current <= holiday.date_to.date() + datetime.timedelta(days=1):
+                dates.add(current)
+                current += datetime.timedelta(days=1)
+            for employee in employees:
+                if holiday.company_id and employee.company_id != holiday.company_id:
+                    continue
+                calendar = employee.resource_calendar_id or employee.company_id.resource_calendar_id
+                if holiday.calendar_id and calendar != holiday.calendar_id:
+                    continue
+                dates_by_employee[employee.id] |= dates
+        return dates_by_employee
+
+    def _refresh_daily_summary(self, dates_by_employee):
+        if not self.env.context.get('skip_attendance_summary'):
+            self.env['hr.attendance.daily.summary']._refresh_keys(dates_by_employee)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        leaves = super().create(vals_list)
+        leaves._refresh_daily_summary(leaves._get_summary_dates())
+        return leaves
+
+    def write(self, vals):
+        tracked = {'resource_id', 'calendar_id', 'company_id', 'date_from', 'date_to'} & set(vals)
+        old_dates = self._get_summary_dates() if tracked else {}
+        res = super().write(vals)
+        if tracked:
+            dates_by_employee = self._get_summary_dates()
+            for employee_id, dates in old_dates.items():
+                dates_by_employee[employee_id] = dates_by_employee.get(employee_id, set()) | dates
+            self._refresh_daily_summary(dates_by_employee)
+        return res
+
+    def unlink(self):
+        dates_by_employee = self._get_summary_dates()
+        res = super().unlink()
+        self.env['resource.calendar.leaves']._refresh_daily_summary(dates_by_employee)
+        return res
@@ -1,6 +1,34 @@
 from odoo import models
 import datetime
 
+# (header, row key) of the columns shown before the daily statuses
+STATIC_COLUMNS = [
+    ('Employee Code', 'employee_code'), ('Full Name', 'full_name'), ('Employment Status', 'employment_status'),
+    ('Company', 'company'), ('Business Unit', 'business_unit'), ('Department', 'department'),
+    ('Designation', 'designation'), ('Branch', 'branch'), ('Sub Branch', 'sub_branch'), ('Card No', 'card_no'),
+    ('Father Name', 'father_name'), ('Age', 'age'), ('Gender', 'gender'), ('Date of Joining', 'date_of_joining'),
+]
+
+# (header, row key) of the summary columns shown after the daily statuses
+SUMMARY_COLUMNS = [
+    ('Days P|P', 'days_p|p'), ('Days P|A', 'days_p|a'), ('Days A|P', 'days_a|p'), ('Days A|A', 'days_a|a'),
+    ('Expected Work Days', 'expected_work_days'), ('Present', 'present'), ('Weekoff', 'weekoff'),
+    ('Holiday', 'holiday'), ('CL', 'cl'), ('CO', 'co'), ('Comp-off', 'comp-off'), ('EL', 'el'), ('SL', 'sl'),
+    ('No of Leaves (Paid)', 'no_of_leaves_paid'), ('No of Leaves (Unpaid)', 'no_of_leaves_unpaid'),
+    ('Absent', 'absent'), ('Pay Days', 'pay_days'), ('Total', 'total'),
+    ('Expected Working Hours', 'expected_working_hours'), ('Actual Working Hours', 'actual_working_hours'),
+    ('Count of AR', 'count_of_ar'), ('Count of OD', 'count_of_od'),
+    ('Count of Short Leave', 'count_of_short_leave'), ('Count of Early Late', 'count_of_early_late'),
+    ('Last Attendance Worked Hours', 'last_attendance_worked_hours'), ('Attendance State', 'attendance_state'),
+    ('Total Overtime', 'total_overtime'), ('Remaining Leaves', 'remaining_leaves'),
+    ('Leaves Count', 'leaves_count'), ('Hours Previously Today', 'hours_previously_today'),
+    ('Hours Last Month', 'hours_last_month'), ('Allocation Count', 'allocation_count'),
+    ('Allocations Count', 'allocations_count'), ('Contracts Count', 'contracts_count'),
+    ('Resource Calendar', 'resource_calendar_id'), ('Expense Manager', 'expense_manager_id'),
+    ('Leave Manager', 'leave_manager_id'),
+]
+
+
 class AttendanceReportXlsx(models.AbstractModel):
     _name = 'report.hr_attendance_gantt_enhanced.attendance_report_xlsx'
     _inherit = 'report.report_xlsx.abstract'
@@ -9,38 +37,19 @@ class AttendanceReportXlsx(models.AbstractModel):
         wizard = wizard.ensure_one()
         records = data.get('data') if isinstance(data, dict) else None
         if not records:
-            # Fallback for direct report calls where the data payload is missing.
-            records = wizard._prepare_report_payload().get('data', [])
+            # Rows are built lazily, batch by batch, while the sheet is written
+            records = wizard._iter_report_rows()
 
         sheet = workbook.add_worksheet('Attendance Report')
         bold = workbook.add_format({'bold': True})
-        
+
         # Define header sections
-        static_headers = [
-            'Employee Code', 'Full Name', 'Employment Status', 'Company', 'Business Unit',
-            'Department', 'Designation', 'Branch', 'Sub Branch', 'Card No', 'Father Name',
-            'Age', 'Gender', 'Date of Joining'
-        ]
         date_headers = [str(wizard.start_date + datetime.timedelta(days=x)) for x in range((wizard.end_date - wizard.start_date).days + 1)]
-        summary_headers = [
-            'Days P|P', 'Days P|A', 'Days A|P', 'Days A|A',
-            'Expected Work Days', 'Present', 'Weekoff', 'Holiday', 'CL', 'CO', 'Comp-off', 'EL', 'SL',
-            'No of Leaves (Paid)', 'No of Leaves (Unpaid)', 'Absent', 'Pay Days', 'Total',
-            'Expected Working Hours', 'Actual Working Hours', 'Count of AR', 'Count of OD',
-            'Count of Short Leave', 'Count of Early Late', 'Last Attendance Worked Hours',
-            'Attendance State', 'Total Overtime', 'Remaining Leaves', 'Leaves Count',
-            'Hours Previously Today', 'Hours Last Month', 'Allocation Count', 'Allocations Count',
-            'Contracts Count', 'Resource Calendar', 'Expense Manager', 'Leave Manager'
-        ]
-        headers = static_headers + date_headers + summary_headers
+        columns = STATIC_COLUMNS + [(date, date) for date in date_headers] + SUMMARY_COLUMNS
 
         # Write headers
-        for col, header in enumerate(headers):
-            sheet.write(0, col, header, bold)
-        
+        sheet.write_row(0, 0, [header for header, key in columns], bold)
+
         # Write data rows
         for row, record in enumerate(records, start=1):
-            for col, field in enumerate(headers):
-                key = field.lower().replace(' ', '_') if field not in date_headers else field
-                value = record.get(key, '')
-                sheet.write(row, col, value)
\ No newline at end of file
+            sheet.write_row(row, 0, [record.get(key, '') for header, key in columns])
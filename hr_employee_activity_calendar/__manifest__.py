@@ -31,6 +31,7 @@
             'hr_employee_activity_calendar/static/src/dashboard/time_off_card_patch.xml',
         ],
     },
+    'uninstall_hook': 'uninstall_hook',
     'installable': True,
     'application': True,
 }
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+def uninstall_hook(env):
+    """Drop the triggers feeding hr_employee_activity from core tables."""
+    env.cr.execute("""
+        DROP TRIGGER IF EXISTS hr_employee_activity_attendance_sync ON hr_attendance;
+        DROP TRIGGER IF EXISTS hr_employee_activity_leave_sync ON hr_leave;
+        DROP TRIGGER IF EXISTS hr_employee_activity_leave_type_sync ON hr_leave_type;
+        DROP FUNCTION IF EXISTS hr_employee_activity_sync_attendance();
+        DROP FUNCTION IF EXISTS hr_employee_activity_sync_leave();
+        DROP FUNCTION IF EXISTS hr_employee_activity_sync_leave_type();
+    """)
@@ -2,15 +2,29 @@
 from odoo import api, fields, models, tools
 
 
+ACTIVITY_COLUMNS = """
+    id, base_name, name, activity_type, employee_id, start_datetime, end_datetime,
+    duration_hours, check_in, check_out, leave_type_id, leave_id, state,
+    attendance_id, is_hatched, is_striked
+"""
+
+
 class HrEmployeeActivity(models.Model):
+    """Unified attendance and time off lines.
+
+    Backed by a plain table kept in sync by PostgreSQL triggers on
+    ``hr_attendance``, ``hr_leave`` and ``hr_leave_type``, so calendar range
+    queries hit the (employee_id, start_datetime) index instead of scanning
+    both source tables.
+    """
     _name = 'hr.employee.activity'
     _description = 'Employee Attendance & Time Off Unified'
-    _auto = False  # SQL view
+    _auto = False  # Trigger-maintained table
     _order = 'start_datetime desc'
 
-    # keep SQL-provided label in base_name; compute name for UI
+    # keep SQL-provided label in base_name; name appends the time off duration
     base_name = fields.Char(string='Base Description')
-    name = fields.Char(string='Description', compute='_compute_name', store=False)
+    name = fields.Char(string='Description', readonly=True)
     activity_type = fields.Selection([
         ('attendance', 'Attendance'),
         ('time_off', 'Time Off'),
@@ -36,33 +50,6 @@ class HrEmployeeActivity(models.Model):
     is_hatched = fields.Boolean('Hatched', readonly=True)
     is_striked = fields.Boolean('Striked', readonly=True)
 
-    # @api.depends('base_name', 'activity_type', 'leave_id')
-    # def _compute_name(self):
-    #     for rec in self:
-    #         label = rec.base_name or ''
-    #         if rec.activity_type == 'time_off' and rec.leave_id:
-    #             # Append base-like friendly duration to label
-    #             duration_txt = rec.leave_id.sudo().duration_display or ''
-    #             if duration_txt:
-    #                 label = f"{label}: {duration_txt}"
-    #         rec.name = label
-
-    @api.depends('base_name', 'activity_type', 'leave_id')
-    def _compute_name(self):
-        """Compute a clean display name for calendar items.
-        - Attendance: use the SQL-provided base_name (e.g., "Attendance: 2025-09-19 09:00 - 17:00").
-        - Time Off: use base_name (private_name or type label) and append duration if available.
-        Never include employee name and never render falsy values like "False: False".
-        """
-        for rec in self:
-            label = rec.base_name or ''
-            if rec.activity_type == 'time_off' and rec.leave_id:
-                # Append friendly duration only when available
-                duration_txt = rec.leave_id.sudo().duration_display or ''
-                if duration_txt:
-                    label = f"{label}: {duration_txt}"
-            rec.name = label
-            
     @api.model
     def get_unusual_days(self, date_from, date_to=None):
         """Expose unusual days for the dashboard calendar.
@@ -70,15 +57,18 @@ class HrEmployeeActivity(models.Model):
         """
         return self.env['hr.leave'].get_unusual_days(date_from, date_to)
 
-    def _select(self):
+    def _attendance_select(self, where):
         return """
-            -- Attendance lines
             SELECT
                 a.id AS id,
                 (
                     'Attendance: ' || to_char(a.check_in, 'YYYY-MM-DD HH24:MI') ||
                     COALESCE(' - ' || to_char(a.check_out, 'YYYY-MM-DD HH24:MI'), ' - ...')
                 ) AS base_name,
+                (
+                    'Attendance: ' || to_char(a.check_in, 'YYYY-MM-DD HH24:MI') ||
+                    COALESCE(' - ' || to_char(a.check_out, 'YYYY-MM-DD HH24:MI'), ' - ...')
+                ) AS name,
                 'attendance' AS activity_type,
                 a.employee_id AS employee_id,
                 a.check_in AS start_datetime,
@@ -93,15 +83,21 @@ class HrEmployeeActivity(models.Model):
                 FALSE AS is_hatched,
                 FALSE AS is_striked
             FROM hr_attendance a
-            WHERE a.check_in IS NOT NULL
-            UNION ALL
-            -- Time off leaves (ALL statuses)
+            WHERE a.check_in IS NOT NULL AND %s
+        """ % where
+
+    def _leave_select(self, where):
+        # name mirrors hr.leave duration_display ("2 days", "3.5 hours")
+        return """
             SELECT
                 -l.id AS id,
-                COALESCE(
-                    NULLIF(l.private_name, ''),
-                    'Time Off: ' || COALESCE(t.name->> 'en_US', t.name->> 'en', t.name::text)
-                ) AS base_name,
+                base.label AS base_name,
+                base.label || ': ' || (
+                    CASE WHEN t.request_unit = 'hour'
+                         THEN trim(trailing '.' FROM trim(trailing '0' FROM round(l.number_of_hours::numeric, 2)::text)) || ' hours'
+                         ELSE trim(trailing '.' FROM trim(trailing '0' FROM round(l.number_of_days::numeric, 2)::text)) || ' days'
+                    END
+                ) AS name,
                 'time_off' AS activity_type,
                 l.employee_id AS employee_id,
                 l.date_from AS start_datetime,
@@ -117,22 +113,106 @@ class HrEmployeeActivity(models.Model):
                 CASE WHEN l.state IN ('refuse', 'cancel') THEN TRUE ELSE FALSE END AS is_striked
             FROM hr_leave l
             LEFT JOIN hr_leave_type t ON t.id = l.holiday_status_id
-            WHERE l.date_from IS NOT NULL AND l.date_to IS NOT NULL
-        """
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(
+                    NULLIF(l.private_name, ''),
+                    'Time Off: ' || COALESCE(t.name->> 'en_US', t.name->> 'en', t.name::text)
+                ) AS label
+            ) base
+            WHERE l.date_from IS NOT NULL AND l.date_to IS NOT NULL AND %s
+        """ % where
+
+    def _create_sync_triggers(self):
+        cr = self.env.cr
+        cr.execute("""
+            CREATE OR REPLACE FUNCTION hr_employee_activity_sync_attendance() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM hr_employee_activity WHERE id = OLD.id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO hr_employee_activity (%(columns)s) %(attendance)s;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION hr_employee_activity_sync_leave() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM hr_employee_activity WHERE id = -OLD.id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO hr_employee_activity (%(columns)s) %(leave)s;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION hr_employee_activity_sync_leave_type() RETURNS trigger AS $$
+            BEGIN
+                DELETE FROM hr_employee_activity WHERE leave_type_id = NEW.id;
+                INSERT INTO hr_employee_activity (%(columns)s) %(leave_type)s;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS hr_employee_activity_attendance_sync ON hr_attendance;
+            CREATE TRIGGER hr_employee_activity_attendance_sync
+                AFTER INSERT OR DELETE OR UPDATE OF employee_id, check_in, check_out ON hr_attendance
+                FOR EACH ROW EXECUTE FUNCTION hr_employee_activity_sync_attendance();
 
-    def _from(self):
-        return """( %s ) AS x""" % self._select()
+            DROP TRIGGER IF EXISTS hr_employee_activity_leave_sync ON hr_leave;
+            CREATE TRIGGER hr_employee_activity_leave_sync
+                AFTER INSERT OR DELETE OR UPDATE OF employee_id, date_from, date_to, state, private_name,
+                    holiday_status_id, number_of_days, number_of_hours ON hr_leave
+                FOR EACH ROW EXECUTE FUNCTION hr_employee_activity_sync_leave();
 
-    def _where(self):
-        return """TRUE"""
+            DROP TRIGGER IF EXISTS hr_employee_activity_leave_type_sync ON hr_leave_type;
+            CREATE TRIGGER hr_employee_activity_leave_type_sync
+                AFTER UPDATE OF name, request_unit ON hr_leave_type
+                FOR EACH ROW EXECUTE FUNCTION hr_employee_activity_sync_leave_type();
+        """ % {
+            'columns': ACTIVITY_COLUMNS,
+            'attendance': self._attendance_select("a.id = NEW.id"),
+            'leave': self._leave_select("l.id = NEW.id"),
+            'leave_type': self._leave_select("l.holiday_status_id = NEW.id"),
+        })
 
     @api.model
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute(
-            "CREATE OR REPLACE VIEW %s AS (SELECT * FROM %s WHERE %s)" % (
-                self._table,
-                self._from(),
-                self._where(),
-            )
-        )
+        cr = self.env.cr
+        # Former versions exposed this model as a SQL view
+        tools.drop_view_if_exists(cr, self._table)
+        cr.execute("""
+            CREATE TABLE IF NOT EXISTS hr_employee_activity (
+                id integer PRIMARY KEY,
+                base_name varchar,
+                name varchar,
+                activity_type varchar,
+                employee_id integer,
+                start_datetime timestamp,
+                end_datetime timestamp,
+                duration_hours double precision,
+                check_in timestamp,
+                check_out timestamp,
+                leave_type_id integer,
+                leave_id integer,
+                state varchar,
+                attendance_id integer,
+                is_hatched boolean,
+                is_striked boolean
+            );
+            CREATE INDEX IF NOT EXISTS hr_employee_activity_employee_start_idx
+                ON hr_employee_activity (employee_id, start_datetime);
+            CREATE INDEX IF NOT EXISTS hr_employee_activity_start_end_idx
+                ON hr_employee_activity (start_datetime, end_datetime);
+            CREATE INDEX IF NOT EXISTS hr_employee_activity_leave_type_idx
+                ON hr_employee_activity (leave_type_id) WHERE leave_type_id IS NOT NULL;
+        """)
+        self._create_sync_triggers()
+        # Full resync on install/update, the triggers keep it current afterwards
+        cr.execute("TRUNCATE hr_employee_activity")
+        cr.execute("INSERT INTO hr_employee_activity (%s) %s UNION ALL %s" % (
+            ACTIVITY_COLUMNS, self._attendance_select("TRUE"), self._leave_select("TRUE"),
+        ))
@@ -2,5 +2,6 @@
 from . import hr_employee
 from . import hr_payslip
 from . import hr_attendance
+from . import hr_leave_type
 #rom . import hr_contract
 
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class HrLeaveType(models.Model):
+    _inherit = 'hr.leave.type'
+
+    @api.model
+    def _get_leave_type_code(self, leave_type_name):
+        """Map leave type name to a short code for attendance sheets."""
+        name_lower = (leave_type_name or '').lower()
+
+        # Define mapping for common leave types
+        if 'casual' in name_lower or name_lower == 'cl':
+            return 'CL'
+        elif 'earned' in name_lower or 'annual' in name_lower or name_lower == 'el':
+            return 'EL'
+        elif 'sick' in name_lower or name_lower == 'sl':
+            return 'SL'
+        elif 'unpaid' in name_lower or 'lwp' in name_lower or 'loss of pay' in name_lower:
+            return 'UL'
+        elif 'management' in name_lower or 'mgmt' in name_lower:
+            return 'ML'
+        elif 'on duty' in name_lower or name_lower == 'od' or 'onduty' in name_lower:
+            return 'OD'
+        elif 'half' in name_lower:
+            return 'HD'
+        else:
+            # Return first 2-3 letters as code
+            return leave_type_name[:3].upper() if leave_type_name else 'L'
@@ -10,13 +10,13 @@
         - Integrations: HR, Inventory, Fleet
         - Audit logs and dashboards
     """,
-    'version': '18.0.1.0',
+    'version': '18.0.1.1',
     'author': 'Akshat Gupta',
     'website': '',
     'category': 'Human Resources',
     'license': 'LGPL-3',
     'sequence': -1,
-    'depends': ['base', 'mail', 'hr', 'stock', 'product', 'web'],
+    'depends': ['base', 'mail', 'hr', 'stock', 'product', 'web', 'qr_image'],
     'data': [
         'security/hr_gate_pass_groups.xml',
         'security/ir.model.access.csv',
@@ -25,10 +25,12 @@
         'data/sequence_data.xml',
         'data/mail_templates.xml',
         'data/cron_data.xml',
+        'data/gate_location_data.xml',
         'report/gate_pass_reports.xml',
         'views/gate_pass_views.xml',
         'views/approval_profile_views.xml',
         'views/gate_views.xml',
+        'views/gate_location_views.xml',
         'views/incident_views.xml',
         'views/security_views.xml',
     'views/gate_log_views.xml',
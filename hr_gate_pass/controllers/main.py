@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo import http
+from odoo import http, exceptions
 from odoo.http import request
-import hmac
-import hashlib
-import base64
+
+from odoo.addons.qr_image.tools import qr_image_response
+
+from ..models.gate_scan import SCAN_BATCH_LIMIT
+
 
 class GatePassController(http.Controller):
     @http.route(['/gatepass/scan', '/gatepass/scan/<string:token>'], type='json', auth='public', methods=['POST','GET'], csrf=False)
@@ -13,23 +15,103 @@ class GatePassController(http.Controller):
             token = kwargs.get('token')
         if not token:
             return {'ok': False, 'error': 'missing_token'}
+        gate_id = self._get_scan_gate_id(kwargs)
+        if kwargs.get('direction') and not self._may_record_scans(gate_id, kwargs.get('gate_key')):
+            return {'ok': False, 'error': 'access_denied'}
         # token format: id.signature
-        try:
-            rec_id_str, signature = token.split('.')
-            rec_id = int(rec_id_str)
-        except Exception:
-            return {'ok': False, 'error': 'invalid_token'}
-        rec = env['hr.gate.pass'].sudo().browse(rec_id)
-        if not rec.exists():
-            return {'ok': False, 'error': 'not_found'}
-        if not rec._verify_qr_token(token):
-            return {'ok': False, 'error': 'invalid_signature'}
+        result = env['hr.gate.pass']._scan_tokens(
+            [token], gate_id=gate_id, direction=kwargs.get('direction'))[0]
         # Simple state transition suggestion without committing yet
-        result = {
-            'ok': True,
-            'id': rec.id,
-            'name': rec.name,
-            'state': rec.state,
-            'pass_type': rec.pass_type,
-        }
+        result.pop('token')
         return result
+
+    @http.route('/gatepass/scan/batch', type='json', auth='public', methods=['POST'], csrf=False)
+    def gatepass_scan_batch(self, tokens=None, **kwargs):
+        """Validate many tokens in one call; results follow the order of tokens."""
+        if not isinstance(tokens, list) or not tokens:
+            return {'ok': False, 'error': 'missing_tokens'}
+        if len(tokens) > SCAN_BATCH_LIMIT:
+            return {'ok': False, 'error': 'too_many_tokens', 'limit': SCAN_BATCH_LIMIT}
+        gate_id = self._get_scan_gate_id(kwargs)
+        if kwargs.get('direction') and not self._may_record_scans(gate_id, kwargs.get('gate_key')):
+            return {'ok': False, 'error': 'access_denied'}
+        results = request.env['hr.gate.pass']._scan_tokens(
+            tokens, gate_id=gate_id, direction=kwargs.get('direction'))
+        return {'ok': True, 'results': results}
+
+    @http.route('/gatepass/qr/<int:pass_id>/<string:version>', type='http', auth='user')
+    def gatepass_qr_image(self, pass_id, version, **kwargs):
+        """QR image of a pass; the version in the URL changes with the token,
+        so browsers may cache it for good."""
+        rec = request.env['hr.gate.pass'].browse(pass_id).exists()
+        if not rec:
+            return request.not_found()
+        rec.check_access('read')
+        return qr_image_response(rec.sudo().qr_token, version)
+
+    def _get_scan_gate_id(self, kwargs):
+        try:
+            return int(kwargs.get('gate_id') or 0) or None
+        except (TypeError, ValueError):
+            return None
+
+    def _may_record_scans(self, gate_id, gate_key=None):
+        """Scans are read-only unless made by gate security, or by a scanner
+        presenting the offline key of its gate."""
+        gate = request.env['hr.gate'].sudo().browse(gate_id or []).exists()
+        if gate and gate_key:
+            return gate._check_scan_key(gate_key)
+        user = request.env.user
+        return not user._is_public() and (user.has_group('hr_gate_pass.group_gatepass_security')
+                                          or user.has_group('hr_gate_pass.group_gatepass_admin'))
+
+    # Offline scanners
+    def _get_offline_gate(self, gate_id):
+        gate = request.env['hr.gate'].browse(self._get_scan_gate_id({'gate_id': gate_id}) or []).exists()
+        if not gate:
+            return None
+        gate._check_offline_access()
+        return gate.sudo()
+
+    @http.route('/gatepass/offline/manifest', type='json', auth='user', methods=['POST'])
+    def gatepass_offline_manifest(self, gate_id=None, **kwargs):
+        """Full signed manifest of the passes the gate may accept offline."""
+        try:
+            gate = self._get_offline_gate(gate_id)
+        except exceptions.AccessError:
+            return {'ok': False, 'error': 'access_denied'}
+        if not gate:
+            return {'ok': False, 'error': 'gate_not_found'}
+        return dict(request.env['hr.gate.pass']._get_offline_manifest(gate), ok=True)
+
+    @http.route('/gatepass/offline/delta', type='json', auth='user', methods=['POST'])
+    def gatepass_offline_delta(self, gate_id=None, cursor=None, **kwargs):
+        """Passes changed since cursor, as returned by the previous sync."""
+        try:
+            gate = self._get_offline_gate(gate_id)
+        except exceptions.AccessError:
+            return {'ok': False, 'error': 'access_denied'}
+        if not gate:
+            return {'ok': False, 'error': 'gate_not_found'}
+        try:
+            cursor = int(cursor)
+        except (TypeError, ValueError):
+            return {'ok': False, 'error': 'invalid_cursor'}
+        return dict(request.env['hr.gate.pass']._get_offline_manifest(gate, cursor=cursor), ok=True)
+
+    @http.route('/gatepass/offline/logs', type='json', auth='user', methods=['POST'])
+    def gatepass_offline_logs(self, gate_id=None, events=None, **kwargs):
+        """Upload offline scans: [{uid, pass_id, action, timestamp, remarks}].
+
+        action is scanned_in or scanned_out, timestamp is UTC
+        'YYYY-MM-DD HH:MM:SS'. Resending events is safe.
+        """
+        try:
+            gate = self._get_offline_gate(gate_id)
+        except exceptions.AccessError:
+            return {'ok': False, 'error': 'access_denied'}
+        if not gate:
+            return {'ok': False, 'error': 'gate_not_found'}
+        if not isinstance(events, list):
+            return {'ok': False, 'error': 'missing_events'}
+        return dict(gate._ingest_offline_logs(events), ok=True)
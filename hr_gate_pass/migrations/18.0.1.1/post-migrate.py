@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """QR images are rendered on demand now, drop the stored ones."""
+    cr.execute("""
+        DELETE FROM ir_attachment
+         WHERE res_model = 'hr.gate.pass' AND res_field = 'qr_image'
+    """)
+    _logger.info("Removed %s stored gate pass QR images", cr.rowcount)
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 from . import gate_pass
+from . import gate_pass_dashboard
+from . import gate_scan
+from . import gate_sync
 from . import approval_profile
 from . import gate
+from . import gate_location
 from . import incident
 from . import gate_log
 from . import idno
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+# Pass states during which the pass holder is inside the plant; checking
+# out means the holder left it
+ON_SITE_STATES = ('issued',)
+
+
+class HrGateLocation(models.Model):
+    _name = 'hr.gate.location'
+    _description = 'Plant Area'
+    _order = 'sequence, name'
+
+    name = fields.Char(string='Name', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    category = fields.Selection([
+        ('entry', 'Entry'),
+        ('production', 'Production'),
+        ('storage', 'Storage'),
+        ('quality', 'Quality'),
+        ('maintenance', 'Maintenance'),
+        ('utility', 'Utility'),
+        ('facility', 'Facility'),
+        ('security', 'Security'),
+        ('safety', 'Safety'),
+    ], string='Category', default='production')
+    x = fields.Integer(string='Map X (%)', default=50)
+    y = fields.Integer(string='Map Y (%)', default=50)
+    # Maintained incrementally by hr.gate.pass._update_occupancy
+    occupancy = fields.Integer(string='Current Headcount', default=0, readonly=True)
+
+    @api.model
+    def _apply_occupancy_deltas(self, deltas):
+        """Add {location_id: delta} to the headcounts in place, so concurrent
+        gate events never overwrite each other."""
+        deltas = {location_id: delta for location_id, delta in deltas.items() if location_id and delta}
+        if not deltas:
+            return
+        self.env.cr.execute("""
+            UPDATE hr_gate_location AS location
+               SET occupancy = GREATEST(location.occupancy + delta.value, 0)
+              FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::int[]) AS value) AS delta
+             WHERE location.id = delta.id
+        """, (list(deltas), list(deltas.values())))
+        self.browse(list(deltas)).invalidate_recordset(['occupancy'])
+
+    def action_recompute_occupancy(self):
+        """Rebuild the headcounts from the passes currently on site."""
+        locations = self or self.with_context(active_test=False).search([])
+        counts = dict(self.env['hr.gate.pass'].sudo()._read_group(
+            [('on_site', '=', True), ('location_id', 'in', locations.ids)],
+            ['location_id'], ['on_site_headcount:sum']))
+        for location in locations:
+            location.occupancy = counts.get(location, 0)
+        return True
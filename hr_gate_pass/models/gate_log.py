@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields
+from odoo import models, fields, api
+
+# Gate scans that move the pass holder in or out of the plant
+LOG_ACTION_ON_SITE = {
+    'scanned_in': True,
+    'checked_in': True,
+    'scanned_out': False,
+}
 
 class HrGateLog(models.Model):
     _name = 'hr.gate.log'
@@ -29,3 +36,22 @@ class HrGateLog(models.Model):
     timestamp = fields.Datetime(string='Time', default=lambda self: fields.Datetime.now())
     gate_id = fields.Many2one('hr.gate', string='Gate')
     remarks = fields.Char(string='Remarks')
+    # Set by offline scanners so re-uploaded events are stored once
+    event_uid = fields.Char(string='Event UID', copy=False, readonly=True)
+
+    _sql_constraints = [
+        ('event_uid_uniq', 'unique(event_uid)', 'This scan event was already recorded.'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        logs = super().create(vals_list)
+        logs._update_pass_occupancy()
+        return logs
+
+    def _update_pass_occupancy(self):
+        """Move the holders of the scanned passes in or out of the plant."""
+        for action, on_site in LOG_ACTION_ON_SITE.items():
+            passes = self.filtered(lambda log: log.action == action).gate_pass_id
+            if passes:
+                passes.sudo()._update_occupancy(on_site=on_site)
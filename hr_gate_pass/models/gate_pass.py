@@ -1,16 +1,17 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, exceptions, _
+from odoo import models, fields, api, exceptions, tools, _
 import hmac
 import hashlib
 import base64
 from datetime import datetime, timedelta
-from io import BytesIO
+from collections import defaultdict
 
-try:
-    import qrcode
-except Exception:
-    qrcode = None
+from odoo.addons.qr_image.tools import render_qr_png, qr_version
 
+from .gate_location import ON_SITE_STATES
+
+# Overdue passes handled per transaction by the overdue cron
+OVERDUE_BATCH_SIZE = 200
 
 class HrGatePassLine(models.Model):
     _name = 'hr.gate.pass.line'
@@ -67,6 +68,8 @@ class HrGatePass(models.Model):
 
     is_returnable = fields.Boolean(string='Returnable', default=False)
     expected_return_datetime = fields.Datetime(string='Expected Return')
+    # Set once the overdue activity is scheduled, cleared when the expected return moves
+    overdue_notified = fields.Boolean(string='Overdue Notified', copy=False, readonly=True, index=True)
 
     line_ids = fields.One2many('hr.gate.pass.line', 'gate_pass_id', string='Items')
 
@@ -102,7 +105,9 @@ class HrGatePass(models.Model):
 
     # QR
     qr_token = fields.Char(string='QR Token', copy=False)
-    qr_image = fields.Binary(string='QR', attachment=True)
+    # Rendered on demand from qr_token, see /gatepass/qr
+    qr_image = fields.Binary(string='QR', compute='_compute_qr_image')
+    qr_image_url = fields.Char(string='QR Image URL', compute='_compute_qr_image_url')
     qr_token_expiry = fields.Datetime(string='QR Expiry')
 
     # Printing
@@ -137,6 +142,10 @@ class HrGatePass(models.Model):
     ], string='Visit Type')
 
     image = fields.Binary(string='Image', attachment=True)
+    # Plant occupancy, see _update_occupancy
+    location_id = fields.Many2one('hr.gate.location', string='Plant Area', index=True)
+    on_site = fields.Boolean(string='On Site', copy=False, readonly=True, index=True)
+    on_site_headcount = fields.Integer(string='On Site Headcount', copy=False, readonly=True)
     log_ids = fields.One2many('hr.gate.log', 'gate_pass_id', string='Logs')
 
     # -----------------------
@@ -210,10 +219,27 @@ class HrGatePass(models.Model):
                     users = (profile.approver_user_ids | profile.approver_group_ids.mapped('users')).sudo().filtered(lambda u: u.active).ids
                     vals['current_approver_ids'] = [(6, 0, users)]
             new_vals_list.append(vals)
-        return super().create(new_vals_list)
+        records = super().create(new_vals_list)
+        records._update_occupancy()
+        self._invalidate_dashboard_cache({rec.company_id.id for rec in records})
+        return records
 
     def write(self, vals):
+        moved = self.filtered('on_site') if 'location_id' in vals else self.browse()
+        moved_deltas = defaultdict(int)
+        for rec in moved:
+            moved_deltas[rec.location_id.id] -= rec.on_site_headcount
         res = super().write(vals)
+        if moved:
+            for rec in moved:
+                moved_deltas[rec.location_id.id] += rec.on_site_headcount
+            self.env['hr.gate.location'].sudo()._apply_occupancy_deltas(moved_deltas)
+        if 'expected_return_datetime' in vals:
+            self.filtered('overdue_notified').write({'overdue_notified': False})
+        if 'state' in vals:
+            self._update_occupancy()
+        if 'state' in vals or 'company_id' in vals:
+            self._invalidate_dashboard_cache({rec.company_id.id for rec in self})
         # Handle pass_type change or profile change to refresh approvers if not explicitly provided
         need_refresh = 'pass_type' in vals or 'approval_profile_id' in vals
         approvers_provided = 'current_approver_ids' in vals
@@ -417,6 +443,46 @@ class HrGatePass(models.Model):
             rec._log_action('reset', remarks='to draft')
         return True
 
+    # Plant occupancy
+    def _get_on_site_headcount(self):
+        self.ensure_one()
+        return len(self.employee_ids) or 1
+
+    def _update_occupancy(self, on_site=None):
+        """Move the pass holders in or out of their plant area headcount.
+
+        Without ``on_site`` the pass is inside while issued, so checking it
+        out takes the holder off site; gate scans force it explicitly.
+        Employee out passes leave the plant and are never counted. Only
+        flips of ``on_site`` touch the headcounts, so repeated events are
+        harmless. Passes are written in one batch per new headcount.
+        """
+        deltas = defaultdict(int)
+        passes_by_vals = defaultdict(lambda: self.browse())
+        for rec in self:
+            target = rec.state in ON_SITE_STATES if on_site is None else on_site
+            target = bool(target) and rec.pass_type != 'employee_out'
+            if target == rec.on_site:
+                continue
+            if target:
+                headcount = rec._get_on_site_headcount()
+                deltas[rec.location_id.id] += headcount
+            else:
+                headcount = 0
+                deltas[rec.location_id.id] -= rec.on_site_headcount
+            passes_by_vals[(target, headcount)] |= rec
+        for (target, headcount), passes in passes_by_vals.items():
+            passes.write({'on_site': target, 'on_site_headcount': headcount})
+        self.env['hr.gate.location'].sudo()._apply_occupancy_deltas(deltas)
+        return True
+
+    @api.model
+    def _init_occupancy(self):
+        """Seed the occupancy index from the pass states, once."""
+        if self.sudo().search_count([('on_site', '=', True)], limit=1):
+            return
+        self.sudo().search([('state', 'in', ON_SITE_STATES)])._update_occupancy()
+
     # QR Generation & validation
     def _qr_secret(self):
         # Use system parameter as secret; fallback to dbuuid.
@@ -424,15 +490,36 @@ class HrGatePass(models.Model):
         secret = IrConfig.get_param('hr_gate_pass.qr_secret') or IrConfig.get_param('database.uuid') or 'odoo-secret'
         return str(secret)
 
+    @api.model
+    @tools.ormcache()
+    def _get_qr_secret(self):
+        """Signing key, cached in the registry; parameter changes clear it."""
+        return (self._qr_secret() or '').encode()
+
+    @api.model
+    def _sign_qr_payload(self, payload):
+        signature = hmac.new(self._get_qr_secret(), payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(signature).decode().rstrip('=')
+
+    @api.model
+    def _check_qr_token_signature(self, token):
+        """Return the pass id signed in the token, or False, without reading
+        the database."""
+        try:
+            rec_id_str, signature_b64 = token.split('.')
+            rec_id = int(rec_id_str)
+        except Exception:
+            return False
+        if not hmac.compare_digest(signature_b64, self._sign_qr_payload(rec_id_str)):
+            return False
+        return rec_id
+
     def _generate_qr_token(self):
         for rec in self:
             payload = str(rec.id)
-            secret = (self._qr_secret() or '').encode()
-            signature = hmac.new(secret, payload.encode(), hashlib.sha256).digest()
-            token = payload + '.' + base64.urlsafe_b64encode(signature).decode().rstrip('=')
+            token = payload + '.' + self._sign_qr_payload(payload)
             rec.qr_token = token
             rec.qr_token_expiry = fields.Datetime.now() + timedelta(days=7)
-            rec._generate_qr_image()
 
     def _verify_qr_token(self, token):
         self.ensure_one()
@@ -441,39 +528,56 @@ class HrGatePass(models.Model):
         if self.qr_token_expiry and fields.Datetime.now() > self.qr_token_expiry:
             return False
         # recompute signature
-        try:
-            rec_id_str, signature_b64 = token.split('.')
-            secret = (self._qr_secret() or '').encode()
-            expected_sig = hmac.new(secret, rec_id_str.encode(), hashlib.sha256).digest()
-            expected_b64 = base64.urlsafe_b64encode(expected_sig).decode().rstrip('=')
-            return hmac.compare_digest(signature_b64, expected_b64)
-        except Exception:
-            return False
+        return self._check_qr_token_signature(token) == self.id
 
-    def _generate_qr_image(self):
-        if qrcode is None:
-            return False
+    @api.depends('qr_token')
+    def _compute_qr_image(self):
         for rec in self:
-            buf = BytesIO()
-            qrdata = rec.qr_token or ''
-            qr = qrcode.QRCode(version=1, box_size=4, border=2)
-            qr.add_data(qrdata)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            img.save(buf, 'PNG')
-            rec.qr_image = base64.b64encode(buf.getvalue())
-        return True
+            png = render_qr_png(rec.qr_token)
+            rec.qr_image = base64.b64encode(png) if png else False
+
+    @api.depends('qr_token')
+    def _compute_qr_image_url(self):
+        for rec in self:
+            rec.qr_image_url = f"/gatepass/qr/{rec.id}/{qr_version(rec.qr_token)}" if rec.id and rec.qr_token else False
 
     # Cron
-    def _cron_check_overdue_returns(self):
+    def _cron_check_overdue_returns(self, batch_size=OVERDUE_BATCH_SIZE, auto_commit=True):
+        """Schedule one overdue activity per pass, batch by batch.
+
+        ``overdue_notified`` is the watermark: passes already handled are
+        skipped by the search, so an interrupted run resumes where it
+        stopped and later runs do not notify again.
+        """
         domain = [
             ('is_returnable', '=', True),
             ('state', 'in', ('issued', 'checked_out')),
             ('expected_return_datetime', '<', fields.Datetime.now()),
+            ('overdue_notified', '=', False),
         ]
-        overdue = self.search(domain)
-        for rec in overdue:
-            rec.activity_schedule('mail.mail_activity_data_todo', summary=_('Overdue Return'), note=_('Please ensure return of items for %s') % rec.name)
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        date_deadline = activity_type._get_date_deadline()
+        user_id = activity_type.default_user_id.id or self.env.uid
+        last_id = 0
+        while True:
+            overdue = self.search(domain + [('id', '>', last_id)], order='id', limit=batch_size)
+            if not overdue:
+                break
+            self.env['mail.activity'].sudo().create([{
+                'res_model_id': res_model_id,
+                'res_id': rec.id,
+                'activity_type_id': activity_type.id,
+                'automated': True,
+                'summary': _('Overdue Return'),
+                'note': _('Please ensure return of items for %s') % rec.name,
+                'user_id': user_id,
+                'date_deadline': date_deadline,
+            } for rec in overdue])
+            overdue.write({'overdue_notified': True})
+            last_id = overdue[-1].id
+            if auto_commit:
+                self.env.cr.commit()
         return True
 
     # UI button helpers
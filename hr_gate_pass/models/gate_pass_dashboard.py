@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+from odoo.tools import date_utils
+
+# Seconds a computed dashboard stays valid; wall displays poll every few seconds
+DASHBOARD_CACHE_TTL = 15
+
+# {(dbname, company_ids, scope): (expiry, data)}, shared by the worker threads
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+
+# Permit models counted on the dashboard when installed
+DASHBOARD_PERMIT_MODELS = {
+    'hot_work_permits': 'hot.work.permit',
+    'energized_work_permits': 'energized.work.permit',
+    'height_work_permits': 'work.heights.permit',
+    'daily_work_permits': 'daily.permit.work',
+}
+
+
+class HrGatePass(models.Model):
+    _inherit = 'hr.gate.pass'
+
+    @api.model
+    def _get_dashboard_cache_key(self):
+        """Passes visible to the user depend on the companies and, outside HR
+        and admins, on the requester/department record rules."""
+        user = self.env.user
+        sees_all = self.env.su or user.has_group('hr_gate_pass.group_gatepass_hr') \
+            or user.has_group('hr_gate_pass.group_gatepass_admin')
+        return (self.env.cr.dbname, tuple(sorted(self.env.companies.ids)), None if sees_all else user.id)
+
+    @api.model
+    def _get_dashboard_data(self):
+        """Return the dashboard KPIs and charts, served from a short-lived
+        per-company cache, with the live plant layout."""
+        key = self._get_dashboard_cache_key()
+        now = time.monotonic()
+        with _dashboard_cache_lock:
+            cached = _dashboard_cache.get(key)
+        if cached and cached[0] > now:
+            data = cached[1]
+        else:
+            data = self._compute_dashboard_data()
+            with _dashboard_cache_lock:
+                # Drop the expired entries, so per-user keys do not pile up
+                for expired_key in [k for k, (expiry, _data) in _dashboard_cache.items() if expiry <= now]:
+                    del _dashboard_cache[expired_key]
+                _dashboard_cache[key] = (now + DASHBOARD_CACHE_TTL, data)
+        # Headcounts are never cached: evacuation counts must be current
+        return dict(data, plant_layout=self._get_plant_layout_data())
+
+    @api.model
+    def _invalidate_dashboard_cache(self, company_ids=None):
+        """Drop the cached dashboards of the given company ids (all when None).
+        Other workers pick the change up when their entry expires."""
+        dbname = self.env.cr.dbname
+        company_ids = set(company_ids) if company_ids is not None else None
+        with _dashboard_cache_lock:
+            for key in list(_dashboard_cache):
+                if key[0] != dbname:
+                    continue
+                # Passes without company are visible from every company
+                if company_ids is None or False in company_ids or company_ids & set(key[1]):
+                    del _dashboard_cache[key]
+
+    @api.model
+    def _get_dashboard_domain(self):
+        return [('company_id', 'in', self.env.companies.ids + [False])]
+
+    @api.model
+    def _compute_dashboard_data(self):
+        domain = self._get_dashboard_domain()
+
+        # Totals and state distribution in one grouped query
+        state_counts = dict(self._read_group(domain, ['state'], ['__count']))
+        total_passes = sum(state_counts.values())
+        active_passes = state_counts.get('approved', 0) + state_counts.get('in_progress', 0)
+
+        # Permit counts from separate models
+        permit_counts = {
+            key: self.env[model].search_count([]) if model in self.env else 0
+            for key, model in DASHBOARD_PERMIT_MODELS.items()
+        }
+
+        # Recent activity - last 7 days, and monthly trend (last 6 months) in one grouped query
+        today = fields.Date.context_today(self)
+        first_month = date_utils.start_of(today, 'month') - relativedelta(months=5)
+        monthly_counts = {
+            month.date(): count
+            for month, count in self._read_group(
+                domain + [('create_date', '>=', fields.Datetime.to_datetime(first_month))],
+                ['create_date:month'], ['__count'])
+        }
+        months = [first_month + relativedelta(months=i) for i in range(6)]
+        recent_passes = self.search_count(domain + [('create_date', '>=', fields.Datetime.now() - relativedelta(days=7))])
+
+        charts = {
+            'state': {
+                'labels': list(state_counts),
+                'data': list(state_counts.values()),
+            },
+            'ehs_permit_type': self._get_dashboard_chart(domain, 'ehs_permit_type', exclude_empty=True),
+            'pass_type': self._get_dashboard_chart(domain, 'pass_type'),
+            'department': self._get_dashboard_chart(domain, 'department_id', exclude_empty=True),
+            'location': self._get_dashboard_chart(domain, 'location_id', exclude_empty=True),
+            'monthly_trend': {
+                'labels': [month.strftime('%b %Y') for month in months],
+                'data': [monthly_counts.get(month, 0) for month in months],
+            },
+        }
+
+        return {
+            'success': True,
+            'kpis': {
+                'total_passes': total_passes,
+                'active_passes': active_passes,
+                'pending_approvals': state_counts.get('pending', 0),
+                'expired_passes': state_counts.get('expired', 0),
+                'recent_passes': recent_passes,
+                'total_permits': sum(permit_counts.values()),
+                **permit_counts,
+            },
+            'charts': charts,
+        }
+
+    @api.model
+    def _get_dashboard_chart(self, domain, field_name, exclude_empty=False):
+        """Distribution of passes over field_name, one grouped query."""
+        if field_name not in self._fields:
+            return {'labels': [], 'data': []}
+        field = self._fields[field_name]
+        if exclude_empty:
+            domain = domain + [(field_name, '!=', False)]
+        groups = self._read_group(domain, [field_name], ['__count'])
+        labels = []
+        for value, dummy in groups:
+            if field.type == 'many2one':
+                labels.append(value.display_name if value else 'Not Set')
+            elif field_name == 'pass_type':
+                labels.append(value.replace('_', ' ').title() if value else 'Not Set')
+            else:
+                labels.append(value)
+        return {'labels': labels, 'data': [count for dummy, count in groups]}
+
+    @api.model
+    def _get_plant_layout_data(self):
+        """Current headcount per plant area, read from the occupancy index."""
+        locations = self.env['hr.gate.location'].sudo().search_read(
+            [('company_id', 'in', self.env.companies.ids + [False])],
+            ['name', 'x', 'y', 'category', 'occupancy'])
+        return [{
+            'id': location['id'],
+            'name': location['name'],
+            'employee_count': location['occupancy'],
+            'x': location['x'],
+            'y': location['y'],
+            'color': self._get_location_color(location['occupancy']),
+            'category': location['category'],
+        } for location in locations]
+
+    @api.model
+    def _get_location_color(self, employee_count):
+        """Return color based on employee count"""
+        if employee_count == 0:
+            return '#9E9E9E'  # Grey - No employees
+        elif employee_count <= 5:
+            return '#4CAF50'  # Green - Low
+        elif employee_count <= 15:
+            return '#FF9800'  # Orange - Medium
+        else:
+            return '#F44336'  # Red - High
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+# Maximum number of tokens accepted by one batch scan
+SCAN_BATCH_LIMIT = 500
+
+SCAN_DIRECTION_ACTIONS = {
+    'in': 'scanned_in',
+    'out': 'scanned_out',
+}
+
+
+class HrGatePass(models.Model):
+    _inherit = 'hr.gate.pass'
+
+    @api.model
+    def _scan_tokens(self, tokens, gate_id=None, direction=None):
+        """Validate many QR tokens at once and return their states, in order.
+
+        Signatures are checked in memory with the cached secret, the passes
+        are read with one query, and when a direction ('in' or 'out') is
+        given the scans are logged with a single create. Callers decide
+        whether the user may record scans.
+        """
+        Pass = self.sudo()
+        rec_ids = {}
+        results = []
+        for token in tokens:
+            if not token or not isinstance(token, str):
+                error = 'missing_token'
+            elif token.count('.') != 1 or not token.split('.')[0].isdigit():
+                error = 'invalid_token'
+            else:
+                error = 'invalid_signature'
+                rec_id = Pass._check_qr_token_signature(token)
+                if rec_id:
+                    rec_ids[token] = rec_id
+            results.append({'token': token, 'ok': False, 'error': error})
+
+        passes = {
+            row['id']: row
+            for row in Pass.search_read(
+                [('id', 'in', list(set(rec_ids.values())))],
+                ['name', 'state', 'pass_type', 'qr_token', 'qr_token_expiry'],
+            )
+        } if rec_ids else {}
+        now = fields.Datetime.now()
+        action = SCAN_DIRECTION_ACTIONS.get(direction)
+        if action and gate_id:
+            gate_id = self.env['hr.gate'].sudo().browse(gate_id).exists().id
+        log_vals = []
+        for result in results:
+            rec_id = rec_ids.get(result['token'])
+            if not rec_id:
+                continue
+            row = passes.get(rec_id)
+            if not row:
+                result['error'] = 'not_found'
+            elif row['qr_token'] != result['token'] or (row['qr_token_expiry'] and now > row['qr_token_expiry']):
+                result['error'] = 'invalid_signature'
+            else:
+                result.pop('error')
+                result.update({
+                    'ok': True,
+                    'id': row['id'],
+                    'name': row['name'],
+                    'state': row['state'],
+                    'pass_type': row['pass_type'],
+                })
+                if action:
+                    log_vals.append({
+                        'gate_pass_id': row['id'],
+                        'gate_id': gate_id or False,
+                        'action': action,
+                        'by_user_id': False if self.env.user._is_public() else self.env.user.id,
+                        'timestamp': now,
+                        'remarks': 'Scanned at gate',
+                    })
+        if log_vals:
+            self.env['hr.gate.log'].sudo().create(log_vals)
+        return results
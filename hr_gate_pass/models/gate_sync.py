@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import hmac
+import json
+
+from odoo import models, fields, api, exceptions, _
+
+# Pass fields that change what a gate scanner must accept
+SYNC_FIELDS = {'state', 'qr_token', 'qr_token_expiry', 'gate_id', 'company_id'}
+
+# Pass states a scanner accepts offline
+OFFLINE_VALID_STATES = ('approved', 'issued', 'checked_out')
+
+# Sync cursors are transaction ids. Each change stores the id of the
+# transaction that made it (sync_xid, a bigint column kept in SQL) and a
+# manifest returns the oldest transaction still running when it was read:
+# every change from an older transaction was committed and served by then,
+# so the next delta reads the changes from that transaction on, whatever
+# order the writers commit in.
+
+
+class HrGatePass(models.Model):
+    _inherit = 'hr.gate.pass'
+
+    def init(self):
+        super().init()
+        self.env.cr.execute("""
+            ALTER TABLE hr_gate_pass ADD COLUMN IF NOT EXISTS sync_xid bigint;
+            CREATE INDEX IF NOT EXISTS hr_gate_pass_sync_xid_index ON hr_gate_pass (sync_xid);
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._bump_sync_xid()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if SYNC_FIELDS & set(vals):
+            self._bump_sync_xid()
+        return res
+
+    def unlink(self):
+        tombstones = [{'pass_id': rec.id} for rec in self]
+        res = super().unlink()
+        self.env['hr.gate.pass.tombstone'].sudo().create(tombstones)
+        return res
+
+    def _bump_sync_xid(self):
+        if not self:
+            return
+        self.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE hr_gate_pass SET sync_xid = txid_current() WHERE id = ANY(%s)
+        """, (self.ids,))
+
+    @api.model
+    def _get_current_sync_cursor(self):
+        """Oldest transaction still running in this transaction's snapshot."""
+        self.env.cr.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_synced_since(self, cursor):
+        """Passes changed, and ids of passes deleted, by the transactions
+        from cursor on."""
+        self.env.cr.execute("SELECT id FROM hr_gate_pass WHERE sync_xid >= %s", (cursor,))
+        changed = self.sudo().browse([row[0] for row in self.env.cr.fetchall()])
+        self.env.cr.execute("SELECT pass_id FROM hr_gate_pass_tombstone WHERE sync_xid >= %s", (cursor,))
+        return changed, [row[0] for row in self.env.cr.fetchall()]
+
+    def _is_valid_offline(self, gate, now):
+        self.ensure_one()
+        return bool(
+            self.qr_token
+            and self.state in OFFLINE_VALID_STATES
+            and (not self.qr_token_expiry or self.qr_token_expiry > now)
+            and self.gate_id in (gate, self.env['hr.gate'])
+            and self.company_id in (gate.company_id, self.env['res.company'])
+        )
+
+    def _get_offline_entry(self):
+        """Compact manifest line; scanners hash the scanned token to match it."""
+        self.ensure_one()
+        return {
+            'id': self.id,
+            'state': self.state,
+            'expiry': fields.Datetime.to_string(self.qr_token_expiry) if self.qr_token_expiry else None,
+            'digest': hashlib.sha256(self.qr_token.encode()).hexdigest(),
+        }
+
+    @api.model
+    def _get_offline_manifest(self, gate, cursor=None):
+        """Signed list of the passes gate may accept offline.
+
+        Without cursor the full manifest is returned; with a cursor from an
+        earlier call only the passes changed since then, split in
+        ``passes`` (to add or replace) and ``removed`` (ids to drop).
+        """
+        now = fields.Datetime.now()
+        new_cursor = self._get_current_sync_cursor()
+        Pass = self.sudo()
+        if cursor is None:
+            passes = Pass.search([
+                ('qr_token', '!=', False),
+                ('state', 'in', OFFLINE_VALID_STATES),
+                ('gate_id', 'in', [gate.id, False]),
+                ('company_id', 'in', [gate.company_id.id, False]),
+                '|', ('qr_token_expiry', '=', False), ('qr_token_expiry', '>', now),
+            ])
+            removed = []
+        else:
+            changed, deleted_ids = Pass._get_synced_since(int(cursor))
+            passes = changed.filtered(lambda rec: rec._is_valid_offline(gate, now))
+            removed = (changed - passes).ids + deleted_ids
+        payload = {
+            'gate_id': gate.id,
+            'cursor': new_cursor,
+            'full': cursor is None,
+            'generated_at': fields.Datetime.to_string(now),
+            'passes': [rec._get_offline_entry() for rec in passes],
+            'removed': removed,
+        }
+        return {'manifest': payload, 'signature': gate._sign_manifest(payload)}
+
+
+class HrGatePassTombstone(models.Model):
+    _name = 'hr.gate.pass.tombstone'
+    _description = 'Deleted Gate Pass'
+    _log_access = False
+
+    pass_id = fields.Integer(string='Gate Pass ID', required=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            ALTER TABLE hr_gate_pass_tombstone ADD COLUMN IF NOT EXISTS sync_xid bigint;
+            CREATE INDEX IF NOT EXISTS hr_gate_pass_tombstone_sync_xid_index ON hr_gate_pass_tombstone (sync_xid);
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE hr_gate_pass_tombstone SET sync_xid = txid_current() WHERE id = ANY(%s)
+        """, (records.ids,))
+        return records
+
+
+class HrGate(models.Model):
+    _inherit = 'hr.gate'
+
+    offline_key = fields.Char(string='Offline Scanner Key', compute='_compute_offline_key',
+                              groups='hr_gate_pass.group_gatepass_admin')
+
+    def _compute_offline_key(self):
+        for gate in self:
+            gate.offline_key = gate._get_offline_key().hex() if gate.id else False
+
+    def _get_offline_key(self):
+        """Per gate key, derived from the QR secret, that scanners use to
+        check manifest signatures."""
+        self.ensure_one()
+        secret = self.env['hr.gate.pass']._get_qr_secret()
+        return hmac.new(secret, ('gate:%s' % self.id).encode(), hashlib.sha256).digest()
+
+    def _sign_manifest(self, payload):
+        self.ensure_one()
+        message = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+        return hmac.new(self._get_offline_key(), message, hashlib.sha256).hexdigest()
+
+    def _ingest_offline_logs(self, events):
+        """Store scans recorded offline by this gate.
+
+        Each event carries a device generated ``uid``; events already
+        stored are skipped, so a device can resend a batch safely.
+        Returns the accepted, duplicate and rejected uids.
+        """
+        self.ensure_one()
+        Log = self.env['hr.gate.log'].sudo()
+        result = {'accepted': [], 'duplicate': [], 'rejected': []}
+        events = [event for event in events if isinstance(event, dict)]
+        uids = [str(event.get('uid') or '') for event in events]
+        existing = set(Log.search([('event_uid', 'in', [uid for uid in uids if uid])]).mapped('event_uid'))
+        # Only passes this gate may scan: same company, any or this gate
+        pass_ids = set(self.env['hr.gate.pass'].sudo().search([
+            ('id', 'in', [event['pass_id'] for event in events if isinstance(event.get('pass_id'), int)]),
+            ('company_id', 'in', [self.company_id.id, False]),
+            ('gate_id', 'in', [self.id, False]),
+        ]).ids)
+
+        rows = []
+        for uid, event in zip(uids, events):
+            action = event.get('action')
+            timestamp = event.get('timestamp')
+            if timestamp in (None, ''):
+                timestamp = fields.Datetime.now()
+            elif isinstance(timestamp, str):
+                try:
+                    timestamp = fields.Datetime.to_datetime(timestamp)
+                except ValueError:
+                    timestamp = None
+            else:
+                timestamp = None
+            remarks = event.get('remarks')
+            if not remarks or not isinstance(remarks, str):
+                remarks = _('Offline scan')
+            if not uid or event.get('pass_id') not in pass_ids or action not in ('scanned_in', 'scanned_out') \
+                    or timestamp is None:
+                result['rejected'].append(uid)
+            elif uid in existing:
+                result['duplicate'].append(uid)
+            else:
+                existing.add(uid)
+                rows.append((uid, event['pass_id'], self.id, action, self.env.user.id, timestamp, remarks))
+        if rows:
+            # Uploads of the same events may commit after this transaction's
+            # snapshot: let the unique event_uid sort them out in the insert
+            now = fields.Datetime.now()
+            user_id = self.env.uid
+            self.env.cr.execute(
+                """
+                INSERT INTO hr_gate_log (event_uid, gate_pass_id, gate_id, action, by_user_id, "timestamp",
+                                         remarks, create_uid, create_date, write_uid, write_date)
+                VALUES %s
+                ON CONFLICT (event_uid) DO NOTHING
+                RETURNING id, event_uid
+                """ % ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows)),
+                [value for row in rows for value in row + (user_id, now, user_id, now)],
+            )
+            inserted = dict(self.env.cr.fetchall())
+            inserted_uids = set(inserted.values())
+            for row in rows:
+                result['accepted' if row[0] in inserted_uids else 'duplicate'].append(row[0])
+            Log.browse(list(inserted))._update_pass_occupancy()
+        return result
+
+    def _check_scan_key(self, key):
+        """Whether key is the offline key of this gate, as presented by its
+        scanners when they record scans without a user session."""
+        self.ensure_one()
+        return isinstance(key, str) and hmac.compare_digest(key, self._get_offline_key().hex())
+
+    def _check_offline_access(self):
+        if not (self.env.user.has_group('hr_gate_pass.group_gatepass_security')
+                or self.env.user.has_group('hr_gate_pass.group_gatepass_admin')):
+            raise exceptions.AccessError(_('Only gate security can synchronise scanners.'))
@@ -8,31 +8,39 @@ EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 class GatePassWebformController(http.Controller):
     """Public website form for creating Gate Pass requests."""
 
-    @http.route(['/gatepass/request'], type='http', auth='public', website=True, sitemap=True)
-    def gatepass_request_form(self, **kwargs):
-        env = request.env
-        # Provide limited lists for selection
-        pass_types = [
+    def _get_pass_type_options(self):
+        return [
             ('visitor', _('Visitor')),
             ('vehicle', _('Vehicle')),
             ('material', _('Material')),
             ('contractor', _('Contractor')),
             ('employee_out', _('Employee Out')),
         ]
-        employees = env['hr.employee'].sudo().search([], limit=50)
-        gates = env['hr.gate'].sudo().search([], limit=50)
-        representing_options = env['hr.gate.representing'].sudo().search([], limit=50)
-        idno_options = env['hr.gate.idno'].sudo().search([], limit=50)
-        departments = env['hr.department'].sudo().search([], limit=100)
-        return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-            'pass_types': pass_types,
-            'employees': employees,
-            'gates': gates,
-            'representing_options': representing_options,
-            'idno_options': idno_options,
-            'departments': departments,
-            'values': {},
-        })
+
+    def _render_gatepass_form(self, values, errors=None):
+        """Render the request form from the cached per-company lookups. Only
+        the employees already picked are rendered, the others are searched
+        through the typeahead endpoints."""
+        GatePass = request.env['hr.gate.pass']
+        company = request.website.company_id
+        employee_ids = [int(x) for x in str(values.get('employee_ids') or '').split(',') if x.isdigit()]
+        if str(values.get('host_employee_id') or '').isdigit():
+            employee_ids.append(int(values['host_employee_id']))
+        selected_employees = request.env['hr.employee'].sudo().browse(employee_ids).exists()
+        return request.render('hr_gate_pass_webform.template_gate_pass_form', dict(
+            GatePass._get_webform_lookups(company),
+            pass_types=self._get_pass_type_options(),
+            selected_employees=[{'id': emp.id, 'name': emp.name} for emp in selected_employees],
+            values=values,
+            errors=errors,
+        ))
+
+    def _lookup_response(self, rows):
+        return request.make_json_response(rows, headers=[('Cache-Control', 'no-store')])
+
+    @http.route(['/gatepass/request'], type='http', auth='public', website=True, sitemap=True)
+    def gatepass_request_form(self, **kwargs):
+        return self._render_gatepass_form({})
 
     @http.route(['/gatepass/employee/<int:emp_id>/department'], type='http', auth='public', methods=['GET'], csrf=False)
     def gatepass_employee_department(self, emp_id, **kwargs):
@@ -43,6 +51,14 @@ class GatePassWebformController(http.Controller):
         name = dept.name or ''
         return request.make_response('{"department": "%s", "department_id": %s}' % (name.replace('"','\"'), dept.id or 'false'), headers=[('Content-Type', 'application/json')])
 
+    @http.route(['/gatepass/lookup/employees'], type='http', auth='public', methods=['GET'], website=True, sitemap=False)
+    def gatepass_lookup_employees(self, q='', **kwargs):
+        return self._lookup_response(request.env['hr.gate.pass']._search_webform_employees(request.website.company_id, q))
+
+    @http.route(['/gatepass/lookup/departments'], type='http', auth='public', methods=['GET'], website=True, sitemap=False)
+    def gatepass_lookup_departments(self, q='', **kwargs):
+        return self._lookup_response(request.env['hr.gate.pass']._search_webform_departments(request.website.company_id, q))
+
     @http.route(['/gatepass/request/submit'], type='http', auth='public', methods=['POST'], website=True, csrf=True)
     def gatepass_request_submit(self, **post):
         env = request.env
@@ -171,16 +187,7 @@ class GatePassWebformController(http.Controller):
             # keep record id in values so user can continue training later without duplication
             if record_id:
                 post['record_id'] = str(record_id)
-            return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-                'errors': errors,
-                'values': post,
-                'pass_types': [('visitor','Visitor'),('vehicle','Vehicle'),('material','Material'),('contractor','Contractor'),('employee_out','Employee Out')],
-                'employees': env['hr.employee'].sudo().search([], limit=50),
-                'gates': env['hr.gate'].sudo().search([], limit=50),
-                'representing_options': env['hr.gate.representing'].sudo().search([], limit=50),
-                'idno_options': env['hr.gate.idno'].sudo().search([], limit=50),
-                'departments': env['hr.department'].sudo().search([], limit=100),
-            })
+            return self._render_gatepass_form(post, errors)
 
         # Extra optional/advanced fields parsing
         contractor_visit_type = _get('contractor_visit_type')
@@ -254,16 +261,7 @@ class GatePassWebformController(http.Controller):
         if errors:
             if record_id:
                 post['record_id'] = str(record_id)
-            return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-                'errors': errors,
-                'values': post,
-                'pass_types': [('visitor','Visitor'),('vehicle','Vehicle'),('material','Material'),('contractor','Contractor'),('employee_out','Employee Out')],
-                'employees': env['hr.employee'].sudo().search([], limit=50),
-                'gates': env['hr.gate'].sudo().search([], limit=50),
-                'representing_options': env['hr.gate.representing'].sudo().search([], limit=50),
-                'idno_options': env['hr.gate.idno'].sudo().search([], limit=50),
-                'departments': env['hr.department'].sudo().search([], limit=100),
-            })
+            return self._render_gatepass_form(post, errors)
 
         # Create or update the record (stay in draft)
         if record_id:
@@ -308,15 +306,7 @@ class GatePassWebformController(http.Controller):
             # Show error (e.g., training not completed) and keep record id to continue
             post['record_id'] = str(rec.id)
             errors = [getattr(e, 'name', str(e)) or _('Please complete the safety training before submitting the gate pass.')]
-            return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-                'errors': errors,
-                'values': post,
-                'pass_types': [('visitor','Visitor'),('vehicle','Vehicle'),('material','Material'),('contractor','Contractor'),('employee_out','Employee Out')],
-                'employees': env['hr.employee'].sudo().search([], limit=50),
-                'gates': env['hr.gate'].sudo().search([], limit=50),
-                'representing_options': env['hr.gate.representing'].sudo().search([], limit=50),
-                'idno_options': env['hr.gate.idno'].sudo().search([], limit=50),
-            })
+            return self._render_gatepass_form(post, errors)
 
         # Send acknowledgment email if visitor_name and maybe contact
         template = env.ref('hr_gate_pass_webform.mail_template_gate_pass_public_submit', raise_if_not_found=False)
@@ -358,24 +348,9 @@ class GatePassWebformController(http.Controller):
             # Render form with error and preserve record id
             errors = [getattr(e, 'name', str(e))]
             values = {'record_id': str(rec.id), 'pass_type': rec.pass_type}
-            return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-                'errors': errors,
-                'values': values,
-                'pass_types': [('visitor','Visitor'),('vehicle','Vehicle'),('material','Material'),('contractor','Contractor'),('employee_out','Employee Out')],
-                'employees': request.env['hr.employee'].sudo().search([], limit=50),
-                'gates': request.env['hr.gate'].sudo().search([], limit=50),
-                'representing_options': request.env['hr.gate.representing'].sudo().search([], limit=50),
-                'idno_options': request.env['hr.gate.idno'].sudo().search([], limit=50),
-                'departments': request.env['hr.department'].sudo().search([], limit=100),
-            })
+            return self._render_gatepass_form(values, errors)
         # Fallback: go back to form with default error
-        return request.render('hr_gate_pass_webform.template_gate_pass_form', {
-            'errors': [_('Unable to start training. Please contact administrator.')],
-            'values': {'record_id': str(rec.id), 'pass_type': rec.pass_type},
-            'pass_types': [('visitor','Visitor'),('vehicle','Vehicle'),('material','Material'),('contractor','Contractor'),('employee_out','Employee Out')],
-            'employees': request.env['hr.employee'].sudo().search([], limit=50),
-            'gates': request.env['hr.gate'].sudo().search([], limit=50),
-            'representing_options': request.env['hr.gate.representing'].sudo().search([], limit=50),
-            'idno_options': request.env['hr.gate.idno'].sudo().search([], limit=50),
-            'departments': request.env['hr.department'].sudo().search([], limit=100),
-        })
+        return self._render_gatepass_form(
+            {'record_id': str(rec.id), 'pass_type': rec.pass_type},
+            [_('Unable to start training. Please contact administrator.')],
+        )
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import hr_employee
+from . import gate_pass_webform
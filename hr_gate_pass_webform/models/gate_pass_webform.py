@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from odoo import models, api
+
+# Maximum number of rows returned by one typeahead request
+LOOKUP_LIMIT = 20
+
+# Tables whose rows feed the cached select options of the public form
+LOOKUP_TABLES = ('hr_gate', 'hr_gate_representing', 'hr_gate_idno', 'hr_department')
+
+# {(dbname, company_id, lang): (version, lookups)}, shared by the worker threads
+_lookup_cache = {}
+_lookup_cache_lock = threading.Lock()
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class HrGatePass(models.Model):
+    _inherit = 'hr.gate.pass'
+
+    @api.model
+    def _get_webform_lookup_version(self):
+        """Row count and last write of every lookup table, in one query.
+        Any create, write or unlink changes it, in every worker."""
+        self.env.cr.execute(" UNION ALL ".join(
+            "(SELECT %%s, COUNT(*), MAX(write_date) FROM %s)" % table for table in LOOKUP_TABLES
+        ), LOOKUP_TABLES)
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _get_webform_lookups(self, company):
+        """Return the select options of the public form for company as plain
+        ``{'id', 'name'}`` lists, rebuilt only when a lookup table changed."""
+        key = (self.env.cr.dbname, company.id, self.env.lang)
+        version = self._get_webform_lookup_version()
+        with _lookup_cache_lock:
+            cached = _lookup_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        company_domain = [('company_id', 'in', [company.id, False])]
+        lookups = {
+            'gates': self.env['hr.gate'].sudo().search_read(company_domain, ['name']),
+            'representing_options': self.env['hr.gate.representing'].sudo().search_read([], ['name']),
+            'idno_options': self.env['hr.gate.idno'].sudo().search_read([], ['name']),
+            'departments': self.env['hr.department'].sudo().search_read(company_domain, ['name'], order='name'),
+        }
+        with _lookup_cache_lock:
+            _lookup_cache[key] = (version, lookups)
+        return lookups
+
+    @api.model
+    def _search_webform_employees(self, company, query, limit=LOOKUP_LIMIT):
+        """Active employees of company whose name starts with query, served by
+        the ``lower(name)`` prefix index."""
+        query = (query or '').strip().lower()
+        if not query:
+            return []
+        self.env.cr.execute("""
+            SELECT id, name
+              FROM hr_employee
+             WHERE active
+               AND company_id = %s
+               AND lower(name) LIKE %s
+          ORDER BY lower(name)
+             LIMIT %s
+        """, (company.id, _escape_like(query) + '%', limit))
+        return [{'id': emp_id, 'name': name} for emp_id, name in self.env.cr.fetchall()]
+
+    @api.model
+    def _search_webform_departments(self, company, query, limit=LOOKUP_LIMIT):
+        """Departments of company whose name starts with query, filtered from
+        the cached lookups (names are translated, so not indexable in SQL)."""
+        query = (query or '').strip().lower()
+        departments = self._get_webform_lookups(company)['departments']
+        return [
+            {'id': dept['id'], 'name': dept['name']}
+            for dept in departments if dept['name'].lower().startswith(query)
+        ][:limit]
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def init(self):
+        super().init()
+        # Serves the "name starts with" typeahead of the public form
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS hr_employee_webform_name_prefix_index
+                ON hr_employee (company_id, lower(name) text_pattern_ops)
+             WHERE active
+        """)
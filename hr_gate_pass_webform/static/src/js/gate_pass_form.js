@@ -114,6 +114,41 @@ odoo.define('hr_gate_pass_webform.gate_pass_form', function (require) {
     hostSelect && hostSelect.addEventListener('change', (e)=> fetchDept(e.target.value));
     if (hostSelect && hostSelect.value) fetchDept(hostSelect.value);
 
+    // Typeahead: replace the unselected options of a lookup select with the
+    // prefix matches returned by its data-lookup-url endpoint
+    form.querySelectorAll('input.o_gatepass_lookup_search').forEach((searchInput) => {
+        const select = form.querySelector(`select[name=${searchInput.dataset.lookupTarget}]`);
+        if (!select || !select.dataset.lookupUrl) return;
+        let timer = null;
+        let lastQuery = null;
+        const refreshOptions = (rows) => {
+            const kept = new Set();
+            Array.from(select.options).forEach((opt) => {
+                if (opt.selected || !opt.value) {
+                    kept.add(opt.value);
+                } else {
+                    opt.remove();
+                }
+            });
+            rows.forEach((row) => {
+                if (kept.has(String(row.id))) return;
+                select.add(new Option(row.name, row.id));
+            });
+        };
+        searchInput.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                const query = searchInput.value.trim();
+                if (!query || query === lastQuery) return;
+                lastQuery = query;
+                fetch(`${select.dataset.lookupUrl}?q=${encodeURIComponent(query)}`)
+                    .then(r => r.json())
+                    .then(rows => { if (query === lastQuery) refreshOptions(rows); })
+                    .catch(()=>{});
+            }, 250);
+        });
+    });
+
     toggleFields();
     const passTypeField = form.querySelector('[name=pass_type]');
     passTypeField && passTypeField.addEventListener('change', toggleFields);
@@ -12,6 +12,7 @@
         'security/ir.model.access.csv',
         'wizards/upload_attendance_wizard_views.xml',
         'views/hr_leave_views.xml',
+        'views/hr_leave_import_job_views.xml',
     ],
     'installable': True,
     'application': True,
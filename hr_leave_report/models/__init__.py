@@ -0,0 +1 @@
+from . import hr_leave_import_job
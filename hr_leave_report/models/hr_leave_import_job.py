@@ -0,0 +1,37 @@
+from odoo import models, fields
+
+
+class HrLeaveImportJob(models.Model):
+    _name = 'hr.leave.import.job'
+    _description = 'Attendance Import Job'
+    _order = 'create_date desc'
+
+    name = fields.Char(string="Filename")
+    file_hash = fields.Char(string="File Hash", required=True, index=True, readonly=True)
+    user_id = fields.Many2one('res.users', string="Uploaded By", default=lambda self: self.env.user, readonly=True)
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+        ('done', 'Done'),
+    ], string="Status", default='running', required=True, readonly=True)
+    report_year = fields.Integer(string="Year", readonly=True)
+    report_month = fields.Integer(string="Month", readonly=True)
+    total_rows = fields.Integer(string="Employee Rows", readonly=True)
+    processed_rows = fields.Integer(string="Processed Rows", readonly=True,
+                                    help="Employee rows committed so far; a re-upload of the same file resumes after them.")
+    created_count = fields.Integer(string="Created", readonly=True)
+    skipped_count = fields.Integer(string="Duplicates Skipped", readonly=True)
+    error_count = fields.Integer(string="Errors", readonly=True)
+    last_error = fields.Text(string="Last Error", readonly=True)
+
+    def _add_chunk_result(self, processed_rows, stats):
+        """Record a committed chunk of ``processed_rows`` employee rows."""
+        self.ensure_one()
+        self.write({
+            'processed_rows': self.processed_rows + processed_rows,
+            'created_count': self.created_count + stats['created'],
+            'skipped_count': self.skipped_count + stats['skipped'],
+            'error_count': self.error_count + stats['errors'],
+            'state': 'done' if self.processed_rows + processed_rows >= self.total_rows else 'running',
+            'last_error': False,
+        })
@@ -1,8 +1,9 @@
 import base64
+import hashlib
 import io
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
@@ -13,6 +14,26 @@ try:
 except ImportError:
     _logger.error('Cannot import openpyxl - please install it: pip install openpyxl')
 
+# Keywords identifying the employee code column of the header row
+EMP_CODE_KEYWORDS = ['employee code', 'emp code', 'code', 'employee id', 'emp id', 'emp no', 'employee no']
+
+# Statuses that describe attendance, not time off
+ATTENDANCE_STATUSES = {'P', 'W', 'H', 'A', 'WO', 'PRESENT', 'WEEKOFF', 'HOLIDAY', 'ABSENT'}
+
+# Leave type mapping
+LEAVE_TYPE_MAPPING = {
+    'CL': 'Casual Leave',
+    'EL': 'Earned Leave',
+    'SL': 'Sick Leave',
+    'ML': 'Management Leave',
+    'OD': 'On Duty',
+    'UL': 'Unpaid',
+    'L': 'Legal Leaves 2024',
+}
+
+# Number of employee rows checked, created and committed together
+IMPORT_BATCH_SIZE = 200
+
 
 class UploadAttendanceWizard(models.TransientModel):
     _name = 'hr.leave.upload.attendance.wizard'
@@ -20,201 +41,220 @@ class UploadAttendanceWizard(models.TransientModel):
 
     file = fields.Binary(string="Attendance File", required=True)
     filename = fields.Char(string="Filename")
+    dry_run = fields.Boolean(string="Dry Run", help="Only report what would be imported, without creating leaves.")
 
     def action_upload(self):
-        """Process the uploaded Excel file and create leave records"""
+        """Process the uploaded Excel file and create leave records.
+
+        Employee rows are imported in chunks that are committed one by one and
+        tracked on an ``hr.leave.import.job``; re-uploading the same file
+        resumes after the last committed chunk. In dry-run mode nothing is
+        written and the notification reports what would be created.
+        """
         self.ensure_one()
 
         if not self.file:
             raise UserError(_("Please upload a file."))
 
-        _logger.info("=" * 80)
-        _logger.info("STARTING ATTENDANCE UPLOAD PROCESS")
-        _logger.info("=" * 80)
+        file_data = base64.b64decode(self.file)
+        rows = self._read_sheet_rows(file_data)
+        report_year, report_month = self._parse_report_period(rows)
+        header_idx, emp_code_col, day_columns = self._locate_header(rows)
+
+        employee_rows = self._parse_employee_rows(rows[header_idx + 1:], emp_code_col, day_columns)
+        employee_map = self._build_employee_map([code for code, dummy in employee_rows])
+        leave_type_map = self._build_leave_type_map()
+
+        if self.dry_run:
+            stats = self._new_stats()
+            for start in range(0, len(employee_rows), IMPORT_BATCH_SIZE):
+                self._import_chunk(employee_rows[start:start + IMPORT_BATCH_SIZE], employee_map,
+                                   leave_type_map, report_year, report_month, stats, dry_run=True)
+            return self._notify(
+                _("Dry Run"),
+                _("Would create: %s leaves\nWould skip: %s duplicates\nErrors: %s")
+                % (stats['created'], stats['skipped'], stats['errors']),
+                stats['errors'],
+            )
+
+        job = self._get_import_job(hashlib.sha256(file_data).hexdigest(), len(employee_rows),
+                                   report_year, report_month)
+        resumed_from = job.processed_rows
+        self.env.cr.commit()
+
+        while job.processed_rows < len(employee_rows):
+            chunk = employee_rows[job.processed_rows:job.processed_rows + IMPORT_BATCH_SIZE]
+            stats = self._new_stats()
+            try:
+                self._import_chunk(chunk, employee_map, leave_type_map, report_year, report_month, stats)
+                job._add_chunk_result(len(chunk), stats)
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                self.env.invalidate_all()
+                _logger.exception("Attendance upload %s failed after %s rows", job.name or '', job.processed_rows)
+                job.write({'state': 'failed', 'last_error': str(e)})
+                self.env.cr.commit()
+                raise UserError(_(
+                    "The import stopped after %(done)s of %(total)s employee rows: %(error)s\n"
+                    "Already imported rows are kept; upload the same file again to resume.",
+                    done=job.processed_rows, total=job.total_rows, error=e,
+                ))
+        if job.state != 'done':
+            job.write({'state': 'done'})
+
+        _logger.info(
+            "Attendance upload %s for %s/%s: %s created, %s duplicates skipped, %s errors",
+            job.name or '', report_month, report_year,
+            job.created_count, job.skipped_count, job.error_count)
+
+        message = _(
+            "Created: %s leaves\n"
+            "Skipped: %s duplicates\n"
+            # "Errors: %s\n\n"
+            # "Check server logs for details."
+        ) % (job.created_count, job.skipped_count)
+        if resumed_from:
+            message += _("\nResumed after %s already imported rows") % resumed_from
+        return self._notify(_("Upload Complete"), message, job.error_count)
+
+    @api.model
+    def _new_stats(self):
+        return {'created': 0, 'skipped': 0, 'errors': 0}
+
+    @api.model
+    def _notify(self, title, message, error_count):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'type': 'success' if error_count == 0 else 'warning',
+                'sticky': True,
+            }
+        }
+
+    def _get_import_job(self, file_hash, total_rows, report_year, report_month):
+        """Return the unfinished job of this file to resume, or a new one."""
+        Job = self.env['hr.leave.import.job'].sudo()
+        job = Job.search([
+            ('file_hash', '=', file_hash),
+            ('state', '!=', 'done'),
+            ('total_rows', '=', total_rows),
+        ], order='id desc', limit=1)
+        if job:
+            job.write({'state': 'running', 'name': self.filename or job.name})
+            return job
+        return Job.create({
+            'name': self.filename,
+            'file_hash': file_hash,
+            'total_rows': total_rows,
+            'report_year': report_year,
+            'report_month': report_month,
+        })
+
+    def _import_chunk(self, employee_rows, employee_map, leave_type_map,
+                      report_year, report_month, stats, dry_run=False):
+        """Build and import the leaves of a chunk of employee rows."""
+        pending = []  # [(employee_id, [leave groups])]
+        for emp_code, statuses in employee_rows:
+            employee_id = employee_map.get(emp_code)
+            if not employee_id:
+                _logger.warning("Employee '%s' not found in system", emp_code)
+                stats['errors'] += 1
+                continue
+            leave_days = self._collect_leave_days(
+                statuses, report_year, report_month, leave_type_map, stats)
+            if leave_days:
+                pending.append((employee_id, self._consolidate_leave_days(leave_days)))
+        if pending:
+            self._import_batch(pending, stats, dry_run=dry_run)
+
+    # ------------------------------------------------------------------
+    # Sheet parsing
+    # ------------------------------------------------------------------
 
-        # Decode and load the Excel file
+    def _read_sheet_rows(self, file_data):
+        """Stream the first worksheet once and return its rows as value tuples."""
         try:
-            file_data = base64.b64decode(self.file)
-            workbook = openpyxl.load_workbook(filename=io.BytesIO(file_data), data_only=True)
-            _logger.info(f"Excel file loaded successfully. Available sheets: {workbook.sheetnames}")
+            workbook = openpyxl.load_workbook(filename=io.BytesIO(file_data), read_only=True, data_only=True)
         except Exception as e:
-            _logger.error(f"Failed to load Excel file: {str(e)}")
+            _logger.error("Failed to load Excel file: %s", e)
             raise UserError(_("Invalid file! Please upload a valid Excel file.\nError: %s") % str(e))
 
-        # Use the first worksheet in the workbook
-        sheet = workbook.active
-        sheet_name = workbook.sheetnames[0] if workbook.sheetnames else 'Unknown'
-        _logger.info(f"Using worksheet: '{sheet_name}'")
-
-        # Parse report month and year
-        report_month = None
-        report_year = None
-
-        _logger.info("\n--- Searching for Date Range in first 10 rows ---")
-        for r in range(1, 11):
-            row_vals = []
-            for cell in sheet[r]:
-                if cell.value:
-                    row_vals.append(str(cell.value))
-
-            full_text = " ".join(row_vals)
-            _logger.info(f"Row {r}: {full_text[:100]}")
-
-            if "From Date" in full_text or "from date" in full_text.lower():
-                _logger.info(f"Found 'From Date' in row {r}: {full_text}")
+        try:
+            # Use the first worksheet in the workbook
+            rows = list(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+        return rows
+
+    def _parse_report_period(self, rows):
+        """Return (year, month) from the 'From Date' line of the first 10 rows."""
+        for row in rows[:10]:
+            full_text = " ".join(str(value) for value in row if value)
+            if "from date" in full_text.lower():
                 # Extract dates in format YYYY-MM-DD
                 date_matches = re.findall(r'(\d{4}-\d{2}-\d{2})', full_text)
                 if date_matches:
                     try:
                         first_date = datetime.strptime(date_matches[0], '%Y-%m-%d')
-                        report_month = first_date.month
-                        report_year = first_date.year
-                        _logger.info(f"Extracted Report Month: {report_month}, Year: {report_year}")
+                        return first_date.year, first_date.month
                     except ValueError as e:
-                        _logger.warning(f"Failed to parse date: {e}")
+                        _logger.warning("Failed to parse date: %s", e)
                 break
 
-        if not report_month or not report_year:
-            # Fallback to current month/year
-            now = datetime.now()
-            report_month = now.month
-            report_year = now.year
-            _logger.warning(f"Could not find date range. Using current month: {report_month}/{report_year}")
-
-        # Find header row and day columns
-        header_row_idx = None
-        emp_code_col = None
-        day_columns = {}  # {day_number: column_index}
-
-        _logger.info("\n" + "=" * 80)
-        _logger.info("DETAILED SHEET ANALYSIS - FIRST 20 ROWS")
-        _logger.info("=" * 80)
-
-        # Print ALL content of first 20 rows for debugging
-        for row_idx in range(1, 21):
-            row = list(sheet.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))[0]
-            _logger.info(f"\nRow {row_idx}:")
-            for col_idx, cell in enumerate(row[:20]):  # First 20 columns
-                if cell is not None and str(cell).strip():
-                    _logger.info(f"  Column {col_idx}: '{cell}' (type: {type(cell).__name__})")
-
-        _logger.info("\n" + "=" * 80)
-        _logger.info("SEARCHING FOR HEADER ROW")
-        _logger.info("=" * 80)
-
-        for row_idx in range(1, 31):  # Search first 30 rows
-            row = list(sheet.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))[0]
-
-            # Check if this row contains "Employee Code" or similar
-            found_emp_code = False
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    cell_str = str(cell).strip().lower()
-                    if any(keyword in cell_str for keyword in
-                           ['employee code', 'emp code', 'code', 'employee id', 'emp id', 'emp no', 'employee no']):
-                        header_row_idx = row_idx
-                        emp_code_col = col_idx
-                        found_emp_code = True
-                        _logger.info(f"*** FOUND HEADER ROW at row {row_idx}, column {col_idx} ***")
-                        _logger.info(f"Header cell value: '{cell}'")
-                        break
-
-            if found_emp_code:
-                _logger.info(f"Full header row {row_idx}: {[str(c) for c in row if c][:15]}")
-
-                # Find Employee Code column
-                for col_idx, cell in enumerate(row):
-                    if cell and ("Employee Code" in str(cell) or str(cell).strip() == "Code"):
-                        emp_code_col = col_idx
-                        _logger.info(f"Employee Code column index: {col_idx}")
-                        break
-
-                # Check rows ABOVE and BELOW for day numbers
-                _logger.info(f"\n--- Checking surrounding rows for day numbers ---")
-
-                # Check 3 rows above
-                for offset in range(-3, 0):
-                    day_row_idx = row_idx + offset
-                    if day_row_idx < 1:
-                        continue
-                    day_row = list(sheet.iter_rows(min_row=day_row_idx, max_row=day_row_idx, values_only=True))[0]
-                    _logger.info(f"Row {day_row_idx} (offset {offset}): {[str(c) for c in day_row[:15] if c]}")
-
-                    for col_idx_day, cell_value in enumerate(day_row):
-                        if cell_value:
-                            if isinstance(cell_value, int) and 1 <= cell_value <= 31:
-                                day_columns[cell_value] = col_idx_day
-                            elif isinstance(cell_value, str) and cell_value.strip().isdigit():
-                                day_num = int(cell_value.strip())
-                                if 1 <= day_num <= 31:
-                                    day_columns[day_num] = col_idx_day
-
-                if day_columns:
-                    _logger.info(f"Found {len(day_columns)} day columns from rows above header")
-                    _logger.info(f"Day columns: {sorted(day_columns.items())[:10]}")
-
-                # If no day columns found, check the row 1-2 rows above
-                if not day_columns:
-                    day_row_idx = row_idx - 1
-                    day_row = list(sheet.iter_rows(min_row=day_row_idx, max_row=day_row_idx, values_only=True))[0]
-
-                    _logger.info(f"\n--- Parsing Day Numbers from row {day_row_idx} ---")
-                    _logger.info(f"Full row content: {day_row[:20]}")
-
-                    for col_idx_day, cell_value in enumerate(day_row):
-                        if cell_value:
-                            _logger.info(
-                                f"  Column {col_idx_day}: value='{cell_value}', type={type(cell_value).__name__}")
-                            # Check if it's a number (day of month)
-                            if isinstance(cell_value, int) and 1 <= cell_value <= 31:
-                                day_columns[cell_value] = col_idx_day
-                                _logger.info(f"    -> Mapped as Day {cell_value}")
-                            elif isinstance(cell_value, str) and cell_value.strip().isdigit():
-                                day_num = int(cell_value.strip())
-                                if 1 <= day_num <= 31:
-                                    day_columns[day_num] = col_idx_day
-                                    _logger.info(f"    -> Mapped as Day {day_num}")
-
-                _logger.info(f"Total days found: {len(day_columns)}")
-                break
-
-        if not header_row_idx or emp_code_col is None:
-            _logger.error("Could not find 'Employee Code' column in header")
-            raise UserError(_("Could not find 'Employee Code' header. Please check the file format."))
-
-        if not day_columns:
-            _logger.error("Could not find day number columns")
-            raise UserError(_("Could not find day columns in the attendance report."))
-
-        # Initialize models
-        employee_obj = self.env['hr.employee']
-        leave_obj = self.env['hr.leave']
-        leave_type_obj = self.env['hr.leave.type']
-
-        # Leave type mapping
-        type_mapping = {
-            'CL': 'Casual Leave',
-            'EL': 'Earned Leave',
-            'SL': 'Sick Leave',
-            'ML': 'Management Leave',
-            'OD': 'On Duty',
-            'UL': 'Unpaid',
-            'L': 'Legal Leaves 2024',
-        }
-
-        created_count = 0
-        skipped_count = 0
-        error_count = 0
+        # Fallback to current month/year
+        now = datetime.now()
+        _logger.warning("Could not find date range. Using current month: %s/%s", now.month, now.year)
+        return now.year, now.month
+
+    def _locate_header(self, rows):
+        """Return (header row index, employee code column, {day: column}).
+
+        The header is the first of the first 30 rows holding an employee code
+        keyword; day numbers are read from the (up to) 3 rows above it.
+        """
+        for row_idx, row in enumerate(rows[:30]):
+            emp_code_col = next((
+                col_idx for col_idx, cell in enumerate(row)
+                if cell and any(keyword in str(cell).strip().lower() for keyword in EMP_CODE_KEYWORDS)
+            ), None)
+            if emp_code_col is None:
+                continue
 
-        _logger.info("\n" + "=" * 80)
-        _logger.info("PROCESSING EMPLOYEE RECORDS")
-        _logger.info("=" * 80)
+            # Prefer an exact "Employee Code" / "Code" column
+            emp_code_col = next((
+                col_idx for col_idx, cell in enumerate(row)
+                if cell and ("Employee Code" in str(cell) or str(cell).strip() == "Code")
+            ), emp_code_col)
 
-        # Process data rows
-        for row_idx in range(header_row_idx + 1, sheet.max_row + 1):
-            row = list(sheet.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))[0]
+            day_columns = {}
+            for day_row in rows[max(row_idx - 3, 0):row_idx]:
+                for col_idx, cell_value in enumerate(day_row):
+                    day_num = self._parse_day_number(cell_value)
+                    if day_num:
+                        day_columns[day_num] = col_idx
 
-            # Get employee code
+            if not day_columns:
+                raise UserError(_("Could not find day columns in the attendance report."))
+            return row_idx, emp_code_col, day_columns
+
+        raise UserError(_("Could not find 'Employee Code' header. Please check the file format."))
+
+    @api.model
+    def _parse_day_number(self, value):
+        if isinstance(value, int) and 1 <= value <= 31:
+            return value
+        if isinstance(value, str) and value.strip().isdigit() and 1 <= int(value.strip()) <= 31:
+            return int(value.strip())
+        return None
+
+    def _parse_employee_rows(self, data_rows, emp_code_col, day_columns):
+        """Return [(employee code, {day: status})] for every data row of the sheet."""
+        employee_rows = []
+        for row in data_rows:
             emp_code_raw = row[emp_code_col] if emp_code_col < len(row) else None
             if not emp_code_raw:
                 continue
@@ -229,216 +269,202 @@ class UploadAttendanceWizard(models.TransientModel):
             if not emp_code or emp_code == 'None' or '=' in emp_code:
                 continue
 
-            _logger.info(f"\n--- Row {row_idx}: Employee Code '{emp_code}' ---")
-
-            # Find employee
-            employee = employee_obj.search([('employee_code', '=', emp_code)], limit=1)
-            if not employee:
-                employee = employee_obj.search([('barcode', '=', emp_code)], limit=1)
-
-            if not employee:
-                _logger.warning(f"Employee '{emp_code}' not found in system")
-                error_count += 1
+            statuses = {}
+            for day_num, col_idx in day_columns.items():
+                if col_idx < len(row) and row[col_idx]:
+                    statuses[day_num] = str(row[col_idx]).strip().upper()
+            employee_rows.append((emp_code, statuses))
+        return employee_rows
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _build_employee_map(self, codes):
+        """Resolve employee codes with one query; employee_code wins over barcode."""
+        codes = list(set(codes))
+        if not codes:
+            return {}
+        employees = self.env['hr.employee'].search_read(
+            ['|', ('employee_code', 'in', codes), ('barcode', 'in', codes)],
+            ['employee_code', 'barcode'],
+        )
+        by_barcode = {}
+        by_code = {}
+        for employee in employees:
+            if employee['barcode']:
+                by_barcode.setdefault(employee['barcode'], employee['id'])
+            if employee['employee_code']:
+                by_code.setdefault(employee['employee_code'], employee['id'])
+        return {**by_barcode, **by_code}
+
+    def _build_leave_type_map(self):
+        """Return {status code: leave type id} for every importable status.
+
+        Leave types are read once and matched in memory with the same
+        case-insensitive containment an ``ilike`` search would apply, in the
+        model's default order.
+        """
+        leave_types = self.env['hr.leave.type'].search_read([], ['name'])
+
+        def match(needle):
+            needle = needle.lower()
+            return next((lt for lt in leave_types if needle in (lt['name'] or '').lower()), None)
+
+        type_mapping = dict(LEAVE_TYPE_MAPPING)
+        hd_type = match('Half Day')
+        type_mapping['HD'] = hd_type['name'] if hd_type else 'Casual Leave'  # Fallback
+
+        leave_type_map = {}
+        for status, leave_type_name in type_mapping.items():
+            leave_type = match('Unpaid' if 'Unpaid' in leave_type_name else leave_type_name)
+            leave_type_map[status] = leave_type and leave_type['id']
+        return leave_type_map
+
+    # ------------------------------------------------------------------
+    # Leave building
+    # ------------------------------------------------------------------
+
+    def _collect_leave_days(self, statuses, report_year, report_month, leave_type_map, stats):
+        """Return sorted [(date, status, leave_type_id, is_half_day)] for one employee."""
+        leave_days = []
+        for day_num, status in sorted(statuses.items()):
+            # Skip attendance statuses
+            if status in ATTENDANCE_STATUSES:
+                continue
+            if status not in leave_type_map:
+                _logger.debug("Unknown status '%s' - skipping", status)
                 continue
 
-            _logger.info(f"Found employee: {employee.name} (ID: {employee.id})")
+            try:
+                current_date = datetime(report_year, report_month, day_num).date()
+            except ValueError:
+                continue
 
-            # Collect all leave days for this employee first
-            leave_days = []  # List of (date, status, leave_type_id, is_half_day)
-            
-            if not day_columns:
-                _logger.warning(f"No day columns available to process for employee {employee.name}")
+            leave_type_id = leave_type_map[status]
+            if not leave_type_id:
+                _logger.warning("Leave Type for status '%s' not found in system", status)
+                stats['errors'] += 1
+                continue
+            leave_days.append((current_date, status, leave_type_id, status == 'HD'))
+        return leave_days
+
+    @api.model
+    def _consolidate_leave_days(self, leave_days):
+        """Group consecutive days with the same leave type into single leaves."""
+        groups = []
+        for leave_date, status, leave_type_id, is_half_day in leave_days:
+            current = groups[-1] if groups else None
+            if (current and leave_type_id == current['leave_type_id']
+                    and is_half_day == current['is_half_day']
+                    and leave_date - current['end_date'] == timedelta(days=1)):
+                current['end_date'] = leave_date
+                current['days'] += 1
             else:
-                _logger.info(f"Processing {len(day_columns)} day columns for {employee.name}")
-            
-            for day_num, col_idx in sorted(day_columns.items()):
-                if col_idx >= len(row):
+                groups.append({
+                    'start_date': leave_date,
+                    'end_date': leave_date,
+                    'leave_type_id': leave_type_id,
+                    'status': status,
+                    'is_half_day': is_half_day,
+                    'days': 1,
+                })
+        return groups
+
+    @api.model
+    def _prepare_leave_vals(self, employee_id, group):
+        start_date, end_date = group['start_date'], group['end_date']
+        if start_date == end_date:
+            name = f"Bulk Import: {group['status']} on {start_date}"
+        else:
+            name = f"Bulk Import: {group['status']} from {start_date} to {end_date}"
+
+        vals = {
+            'employee_id': employee_id,
+            'holiday_status_id': group['leave_type_id'],
+            'request_date_from': start_date,
+            'request_date_to': end_date,
+            'name': name,
+            'state': 'confirm',
+        }
+        if group['is_half_day']:
+            vals.update({
+                'request_unit_half': True,
+                'request_date_from_period': 'am',
+                'number_of_days': 0.5 * group['days'],
+            })
+        else:
+            vals['number_of_days'] = float(group['days'])
+        return vals
+
+    def _fetch_existing_leaves(self, employee_ids, date_from, date_to):
+        """Return {employee_id: [(date_from, date_to, leave_type_id)]} of active
+        leaves overlapping the period, with a single query."""
+        existing = {}
+        leaves = self.env['hr.leave'].search_read([
+            ('employee_id', 'in', employee_ids),
+            ('request_date_from', '<=', date_to),
+            ('request_date_to', '>=', date_from),
+            ('state', 'not in', ['refuse', 'cancel']),
+        ], ['employee_id', 'request_date_from', 'request_date_to', 'holiday_status_id'])
+        for leave in leaves:
+            existing.setdefault(leave['employee_id'][0], []).append((
+                leave['request_date_from'], leave['request_date_to'], leave['holiday_status_id'][0]))
+        return existing
+
+    def _import_batch(self, batch, stats, dry_run=False):
+        """Create the leaves of a batch of employees.
+
+        Exact duplicates are skipped, groups overlapping another active leave
+        are counted as errors (they would fail the overlap constraint), and the
+        rest is created and approved in one go. With ``dry_run`` the leaves are
+        only counted.
+        """
+        all_groups = [group for dummy, groups in batch for group in groups]
+        existing = self._fetch_existing_leaves(
+            [employee_id for employee_id, dummy in batch],
+            min(group['start_date'] for group in all_groups),
+            max(group['end_date'] for group in all_groups),
+        )
+
+        vals_list = []
+        for employee_id, groups in batch:
+            employee_leaves = existing.get(employee_id, [])
+            for group in groups:
+                key = (group['start_date'], group['end_date'], group['leave_type_id'])
+                if key in employee_leaves:
+                    stats['skipped'] += 1
                     continue
-
-                status = row[col_idx]
-                if not status:
+                if any(date_from <= group['end_date'] and date_to >= group['start_date']
+                       for date_from, date_to, dummy in employee_leaves):
+                    stats['errors'] += 1
                     continue
+                vals_list.append(self._prepare_leave_vals(employee_id, group))
 
-                status = str(status).strip().upper()
-                
-                _logger.info(f"  Day {day_num}: Raw status = '{status}' (column {col_idx})")
-
-                # Skip attendance statuses
-                if status in ['P', 'W', 'H', 'A', 'WO', 'PRESENT', 'WEEKOFF', 'HOLIDAY', 'ABSENT']:
-                    _logger.info(f"    Skipping attendance status: {status}")
-                    continue
-
-                # Parse date
+        if dry_run:
+            stats['created'] += len(vals_list)
+            return
+        if not vals_list:
+            return
+        try:
+            with self.env.cr.savepoint():
+                self._create_and_validate(vals_list)
+            stats['created'] += len(vals_list)
+        except Exception as e:
+            _logger.warning("Bulk leave creation failed (%s), retrying leave by leave", e)
+            for vals in vals_list:
                 try:
-                    current_date = datetime(report_year, report_month, day_num).date()
-                except ValueError as e:
-                    _logger.warning(f"Invalid date: {day_num}/{report_month}/{report_year} - {e}")
-                    continue
-
-                # Handle Half Day
-                is_half_day = False
-                leave_type_name = None
-
-                if status == 'HD':
-                    is_half_day = True
-                    hd_type = leave_type_obj.search([('name', 'ilike', 'Half Day')], limit=1)
-                    if hd_type:
-                        leave_type_name = hd_type.name
-                    else:
-                        leave_type_name = 'Casual Leave'  # Fallback
-                    _logger.info(f"    Half Day detected, using type: {leave_type_name}")
-                else:
-                    leave_type_name = type_mapping.get(status)
-
-                if not leave_type_name:
-                    _logger.warning(f"    Unknown status '{status}' - skipping")
-                    continue
-
-                # Find leave type
-                if 'Unpaid' in leave_type_name:
-                    leave_type = leave_type_obj.search([
-                        '|', ('name', 'ilike', 'Unpaid'), ('name', 'ilike', 'Unpaid Leave')
-                    ], limit=1)
-                else:
-                    leave_type = leave_type_obj.search([('name', 'ilike', leave_type_name)], limit=1)
-
-                if not leave_type:
-                    _logger.warning(f"    Leave Type '{leave_type_name}' not found in system")
-                    error_count += 1
-                    continue
-
-                _logger.info(f"    Found leave: {status} on {current_date} -> {leave_type.name}")
-                leave_days.append((current_date, status, leave_type.id, is_half_day))
-
-            # Group consecutive leaves of the same type
-            leaves_for_employee = 0  # Initialize to avoid UnboundLocalError
-            if leave_days:
-                _logger.info(f"\n--- Consolidating {len(leave_days)} leave days for {employee.name} ---")
-                leave_days.sort(key=lambda x: x[0])  # Sort by date
-                
-                consolidated_leaves = []
-                current_group = None
-                
-                for leave_date, status, leave_type_id, is_half_day in leave_days:
-                    if current_group is None:
-                        # Start new group
-                        current_group = {
-                            'start_date': leave_date,
-                            'end_date': leave_date,
-                            'leave_type_id': leave_type_id,
-                            'status': status,
-                            'is_half_day': is_half_day,
-                            'days': 1
-                        }
-                    elif (leave_type_id == current_group['leave_type_id'] and 
-                          is_half_day == current_group['is_half_day'] and
-                          (leave_date - current_group['end_date']).days == 1):
-                        # Extend current group (consecutive day with same type)
-                        current_group['end_date'] = leave_date
-                        current_group['days'] += 1
-                    else:
-                        # Save current group and start new one
-                        consolidated_leaves.append(current_group)
-                        current_group = {
-                            'start_date': leave_date,
-                            'end_date': leave_date,
-                            'leave_type_id': leave_type_id,
-                            'status': status,
-                            'is_half_day': is_half_day,
-                            'days': 1
-                        }
-                
-                # Don't forget the last group
-                if current_group:
-                    consolidated_leaves.append(current_group)
-                
-                _logger.info(f"Consolidated into {len(consolidated_leaves)} leave record(s)")
-                
-                # Create consolidated leave records
-                leaves_for_employee = 0
-                for leave_group in consolidated_leaves:
-                    start_date = leave_group['start_date']
-                    end_date = leave_group['end_date']
-                    leave_type_id = leave_group['leave_type_id']
-                    status = leave_group['status']
-                    is_half_day = leave_group['is_half_day']
-                    num_days = leave_group['days']
-                    
-                    # Check for duplicates
-                    existing = leave_obj.search([
-                        ('employee_id', '=', employee.id),
-                        ('request_date_from', '=', start_date),
-                        ('request_date_to', '=', end_date),
-                        ('holiday_status_id', '=', leave_type_id),
-                        ('state', 'not in', ['refuse', 'cancel']),
-                    ])
-
-                    if existing:
-                        _logger.info(f"  Duplicate found - skipping {status} from {start_date} to {end_date}")
-                        skipped_count += 1
-                        continue
-
-                    # Create leave record
-                    if start_date == end_date:
-                        name = f'Bulk Import: {status} on {start_date}'
-                    else:
-                        name = f'Bulk Import: {status} from {start_date} to {end_date}'
-                    
-                    vals = {
-                        'employee_id': employee.id,
-                        'holiday_status_id': leave_type_id,
-                        'request_date_from': start_date,
-                        'request_date_to': end_date,
-                        'name': name,
-                        'state': 'confirm',
-                    }
-
-                    if is_half_day:
-                        vals.update({
-                            'request_unit_half': True,
-                            'request_date_from_period': 'am',
-                            'number_of_days': 0.5 * num_days,
-                        })
-                    else:
-                        vals['number_of_days'] = float(num_days)
-
-                    try:
-                        new_leave = leave_obj.create(vals)
-                        new_leave.action_approve()  # Auto-approve
-                        if new_leave.state != 'validate':
-                            new_leave.action_validate()  # Final validation if needed
-                        
-                        created_count += 1
-                        leaves_for_employee += 1
-                        _logger.info(f"  ✓ Created: {status} from {start_date} to {end_date} ({num_days} days) - ID: {new_leave.id}")
-                    except Exception as e:
-                        _logger.error(f"  ✗ Failed to create leave: {str(e)}")
-                        error_count += 1
-
-            if leaves_for_employee > 0:
-                _logger.info(f"Total leaves created for {employee.name}: {leaves_for_employee}")
-
-        # Final summary
-        _logger.info("\n" + "=" * 80)
-        _logger.info("UPLOAD SUMMARY")
-        _logger.info("=" * 80)
-        _logger.info(f"Successfully created: {created_count} leaves")
-        _logger.info(f"Skipped (duplicates): {skipped_count}")
-        _logger.info(f"Errors: {error_count}")
-        _logger.info("=" * 80)
-
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': _("Upload Complete"),
-                'message': _(
-                    "Created: %s leaves\n"
-                    "Skipped: %s duplicates\n"
-                    # "Errors: %s\n\n"
-                    # "Check server logs for details."
-                ) % (created_count, skipped_count),
-                'type': 'success' if error_count == 0 else 'warning',
-                'sticky': True,
-            }
-        }
\ No newline at end of file
+                    with self.env.cr.savepoint():
+                        self._create_and_validate([vals])
+                    stats['created'] += 1
+                except Exception as e:
+                    _logger.error("Failed to create leave %s: %s", vals['name'], e)
+                    stats['errors'] += 1
+
+    def _create_and_validate(self, vals_list):
+        leaves = self.env['hr.leave'].with_context(mail_create_nolog=True).create(vals_list)
+        leaves.filtered(lambda leave: leave.state == 'confirm').action_approve()  # Auto-approve
+        to_validate = leaves.filtered(lambda leave: leave.state != 'validate')
+        if to_validate:
+            to_validate.action_validate()  # Final validation if needed
+        return leaves
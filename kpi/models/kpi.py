@@ -1,6 +1,14 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 
+# transition: (from state, to state, who may apply it)
+KPI_TRANSITIONS = {
+    'submit': ('draft', 'submitted', None),
+    'approve_employee': ('submitted', 'employee_approved', 'approver'),
+    'approve_hod': ('employee_approved', 'hod_approved', 'approver'),
+    'complete': ('hod_approved', 'completed', None),
+}
+
 class KPIIndexing(models.Model):
     _name = 'kpi.indexing'
     _description = 'KPI Indexing'
@@ -67,6 +75,9 @@ class KPI(models.Model):
         ('rejected', 'Rejected'),
     ], string='Status', default='draft', tracking=True)
     previous_state = fields.Char(string='Previous State', readonly=True, tracking=True)
+    approver_user_id = fields.Many2one(
+        'res.users', string='Pending Approver', compute='_compute_approver_user_id', store=True, index=True,
+        help='User expected to approve the KPI in its current state')
     can_approve_employee = fields.Boolean(compute='_compute_can_approve', string='Can Approve (Employee)')
     can_approve_hod = fields.Boolean(compute='_compute_can_approve', string='Can Approve (HOD)')
     employee_count = fields.Integer(string='Employee Count', compute='_compute_employee_count')
@@ -95,66 +106,93 @@ class KPI(models.Model):
             else:
                 record.name = "New KPI"
 
-    @api.depends('state', 'employee_id', 'department_hod')
+    @api.depends('state', 'employee_id.user_id', 'department_hod.user_id')
+    def _compute_approver_user_id(self):
+        for record in self:
+            if record.state == 'submitted':
+                record.approver_user_id = record.employee_id.user_id
+            elif record.state == 'employee_approved':
+                record.approver_user_id = record.department_hod.user_id
+            else:
+                record.approver_user_id = False
+
+    @api.depends('state', 'approver_user_id')
     def _compute_can_approve(self):
+        current_user = self.env.user
         for record in self:
-            current_user = self.env.user
-            record.can_approve_employee = (record.state == 'submitted' and record.employee_id.user_id == current_user)
-            record.can_approve_hod = (record.state == 'employee_approved' and record.department_hod.user_id == current_user)
+            is_approver = record.approver_user_id == current_user
+            record.can_approve_employee = is_approver and record.state == 'submitted'
+            record.can_approve_hod = is_approver and record.state == 'employee_approved'
 
     @api.depends('employee_id', 'department_hod', 'department_id')
     def _compute_employee_count(self):
+        # Only the HOD's own KPI shows the department headcount
+        hod_records = self.filtered(
+            lambda record: record.employee_id and record.department_id and record.employee_id == record.department_hod)
+        counts = {
+            department.id: count
+            for department, count in self.env['hr.employee']._read_group(
+                [('department_id', 'in', hod_records.department_id.ids)], ['department_id'], ['__count'])
+        } if hod_records else {}
         for record in self:
-            if record.employee_id and record.department_hod and record.employee_id == record.department_hod and record.department_id:
-                record.employee_count = self.env['hr.employee'].search_count([('department_id', '=', record.department_id.id)])
-            else:
-                record.employee_count = 0
-
-    def action_submit(self):
-        self.ensure_one()
-        if self.state != 'draft':
-            raise UserError("Can only submit from draft state.")
+            record.employee_count = counts.get(record.department_id.id, 0) if record in hod_records else 0
+
+    def _apply_transition(self, transition):
+        """Validate and apply a workflow transition to all KPIs of self at
+        once; nothing is written if any record does not qualify."""
+        from_state, to_state, actor = KPI_TRANSITIONS[transition]
+        wrong_state = self.filtered(lambda record: record.state != from_state)
+        if wrong_state:
+            raise UserError(_("These KPIs are not in the %(state)s state: %(names)s",
+                              state=dict(self._fields['state'].selection)[from_state],
+                              names=', '.join(wrong_state.mapped('name'))))
+        if actor == 'approver':
+            not_allowed = self.filtered(lambda record: record.approver_user_id != self.env.user)
+            if not_allowed:
+                raise UserError(_("You are not the approver of these KPIs: %s", ', '.join(not_allowed.mapped('name'))))
         self.write({
-            'previous_state': self.state,
-            'state': 'submitted'
+            'previous_state': from_state,
+            'state': to_state,
         })
-        self.activity_schedule(
-            'mail.mail_activity_data_todo',
-            summary='KPI Approval Required',
-            user_id=self.employee_id.user_id.id,
-            note='Please review and approve your KPI.'
-        )
+        return True
+
+    def _schedule_approval_activities(self):
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        date_deadline = activity_type._get_date_deadline()
+        self.env['mail.activity'].create([{
+            'res_model_id': res_model_id,
+            'res_id': record.id,
+            'activity_type_id': activity_type.id,
+            'automated': True,
+            'summary': 'KPI Approval Required',
+            'note': 'Please review and approve your KPI.',
+            'user_id': record.employee_id.user_id.id or self.env.uid,
+            'date_deadline': date_deadline,
+        } for record in self])
+
+    def action_submit(self):
+        self._apply_transition('submit')
+        self._schedule_approval_activities()
 
     def action_approve_employee(self):
-        self.ensure_one()
-        if self.state != 'submitted':
-            raise UserError("Can only approve from submitted state.")
-        if self.env.user != self.employee_id.user_id:
-            raise UserError("Only the employee can approve this KPI.")
-        self.write({
-            'previous_state': self.state,
-            'state': 'employee_approved'
-        })
+        self._apply_transition('approve_employee')
 
     def action_approve_hod(self):
-        self.ensure_one()
-        if self.state != 'employee_approved':
-            raise UserError("Can only approve from employee approved state.")
-        if self.env.user != self.department_hod.user_id:
-            raise UserError("Only the HOD can approve this KPI.")
-        self.write({
-            'previous_state': self.state,
-            'state': 'hod_approved'
-        })
+        self._apply_transition('approve_hod')
+
+    def action_approve(self):
+        """List action: approve the selected KPIs at the stage each one is in."""
+        by_employee = self.filtered(lambda record: record.state == 'submitted')
+        by_hod = self.filtered(lambda record: record.state == 'employee_approved')
+        other = self - by_employee - by_hod
+        if other:
+            raise UserError(_("These KPIs are not waiting for an approval: %s", ', '.join(other.mapped('name'))))
+        by_employee.action_approve_employee()
+        by_hod.action_approve_hod()
 
     def action_complete(self):
-        self.ensure_one()
-        if self.state != 'hod_approved':
-            raise UserError("Can only complete from HOD approved state.")
-        self.write({
-            'previous_state': self.state,
-            'state': 'completed'
-        })
+        self._apply_transition('complete')
 
     def action_reject(self):
         self.ensure_one()
@@ -173,7 +211,6 @@ class KPI(models.Model):
         })
 
     def action_admin_approve(self):
-        self.ensure_one()
         if not self.env.user.has_group('base.group_system'):
             raise UserError("Only administrators can perform this action.")
         self.write({
@@ -9,7 +9,7 @@
     'website': '',
     'sequence': -3,
     'category': 'Operations/Safety',
-    'depends': ['base', 'web', 'mail'],
+    'depends': ['base', 'web', 'mail', 'qr_image'],
     'data': [
         'security/ir.model.access.csv',
         'data/ir_sequence.xml',
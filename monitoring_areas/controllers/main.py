@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+
+from odoo.addons.qr_image.tools import qr_image_response
+
+
+class MonitoringAreasQRController(http.Controller):
+    @http.route('/monitoring_areas/qr/<int:area_id>/<string:version>', type='http', auth='user')
+    def monitoring_area_qr(self, area_id, version, **kwargs):
+        area = request.env['monitoring.areas'].browse(area_id).exists()
+        if not area:
+            return request.not_found()
+        area.check_access('read')
+        return qr_image_response(area.sudo().qr_value, version)
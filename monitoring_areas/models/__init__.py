@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
+from . import qr_code_mixin
 from . import monitoring_areas
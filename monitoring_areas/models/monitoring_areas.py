@@ -2,14 +2,8 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 import base64
-from io import BytesIO
-import random
-import string
 
-try:
-	import qrcode
-except Exception:
-	qrcode = None
+from odoo.addons.qr_image.tools import render_qr_png, qr_version
 
 
 class WorkPermitArea(models.Model):
@@ -37,8 +31,10 @@ class WorkPermitArea(models.Model):
 class MonitoringAreas(models.Model):
 	_name = 'monitoring.areas'
 	_description = 'Monitoring Areas'
-	_inherit = ['mail.thread', 'mail.activity.mixin']
+	_inherit = ['mail.thread', 'mail.activity.mixin', 'monitoring.qr.code.mixin']
 	_rec_name = 'area_id'
+	_qr_code_field = 'qr_value'
+	_qr_code_constraint = 'qr_value_unique'
 	_check_company_auto = True
 
 	name = fields.Char(string='Reference', required=True, copy=False, index=True, default='New')
@@ -61,25 +57,14 @@ class MonitoringAreas(models.Model):
 
 	# QR fields: stored unique code and generated image
 	qr_value = fields.Char(string='QR Code', readonly=True, copy=False, index=True)
-	qr_image = fields.Binary(string='QR Image', attachment=True, compute='_compute_qr_fields', store=False)
+	qr_image = fields.Binary(string='QR Image', compute='_compute_qr_fields', store=False)
+	qr_image_url = fields.Char(string='QR Image URL', compute='_compute_qr_image_url')
 
 	_sql_constraints = [
 		('qr_value_unique', 'unique(qr_value)', 'QR Code must be unique.'),
 		('area_unique', 'unique(area_id)', 'Only one monitoring record is allowed per Area.'),
 	]
 
-	@api.model
-	def _generate_unique_code(self, length: int = 8) -> str:
-		alphabet = string.ascii_uppercase + string.digits
-		# Try a few times to avoid rare collisions
-		for _ in range(10):
-			code = ''.join(random.choices(alphabet, k=length))
-			# We only ensure random code uniqueness statistically here; the final
-			# uniqueness will be validated against the full composed qr_value.
-			return code
-		# Fallback with timestamp-based suffix if improbable collisions keep occurring
-		return ''.join(random.choices(alphabet, k=length))
-
 	def _compose_qr_value(self, area, code: str, company=None) -> str:
 		"""Build the QR payload string including company and area information.
 
@@ -103,7 +88,6 @@ class MonitoringAreas(models.Model):
 			if self.search_count([('area_id', 'in', areas_in_batch)]) > 0:
 				raise ValidationError('A monitoring record already exists for one of the selected Areas.')
 
-		ResCompany = self.env['res.company']
 		WorkArea = self.env['work.permit.area']
 		for vals in vals_list:
 			if vals.get('area_id'):
@@ -114,49 +98,35 @@ class MonitoringAreas(models.Model):
 			# Assign sequence at create time (prevents double consumption)
 			if vals.get('name', 'New') == 'New':
 				vals['name'] = self.env['ir.sequence'].next_by_code('monitoring.areas') or '/'
-			# Build QR payload with company + area + random key
-			if not vals.get('qr_value'):
-				area = None
-				company = ResCompany.browse(vals['company_id']) if vals.get('company_id') else self.env.company
-				if vals.get('area_id'):
-					area = WorkArea.browse(vals['area_id'])
-				# generate until composed value is unique
-				for _ in range(10):
-					code = self._generate_unique_code()
-					candidate = self._compose_qr_value(area, code, company=company)
-					if not self.search_count([('qr_value', '=', candidate)]):
-						vals['qr_value'] = candidate
-						break
-				# As a last resort if loop didn't set it (extremely unlikely)
-				if not vals.get('qr_value'):
-					vals['qr_value'] = self._compose_qr_value(area, self._generate_unique_code(), company=company)
+		# The QR payload (company + area + random key) is allocated by the mixin
 		return super().create(vals_list)
 
+	def _get_qr_code_value(self, code, vals):
+		area = self.env['work.permit.area'].browse(vals['area_id']) if vals.get('area_id') else self.area_id
+		company = self.env['res.company'].browse(vals['company_id']) if vals.get('company_id') else self.company_id
+		return self._compose_qr_value(area, code, company=company or None)
+
 	def _make_qr_image(self, value: str):
-		if not value or qrcode is None:
-			return False
-		buf = BytesIO()
-		qr = qrcode.QRCode(version=1, box_size=4, border=2)
-		qr.add_data(value)
-		qr.make(fit=True)
-		img = qr.make_image(fill_color="black", back_color="white")
-		img.save(buf, 'PNG')
-		return base64.b64encode(buf.getvalue())
+		png = render_qr_png(value)
+		return base64.b64encode(png) if png else False
 
 	@api.depends('qr_value')
 	def _compute_qr_fields(self):
 		for rec in self:
 			rec.qr_image = self._make_qr_image(rec.qr_value)
 
+	@api.depends('qr_value')
+	def _compute_qr_image_url(self):
+		# Rendered on demand by /monitoring_areas/qr, the URL changes with the code
+		for rec in self:
+			rec.qr_image_url = f"/monitoring_areas/qr/{rec.id}/{qr_version(rec.qr_value)}" if rec.id and rec.qr_value else False
+
 	@api.onchange('area_id')
 	def _onchange_area_regenerate_qr(self):
 		for rec in self:
 			if rec.area_id:
 				rec.company_id = rec.area_id.company_id
-				new_code = rec._generate_unique_code()
-				new_value = rec._compose_qr_value(rec.area_id, new_code, company=rec.company_id)
-				rec.qr_value = new_value
-				rec.qr_image = rec._make_qr_image(new_value)
+				rec.qr_value = rec._get_qr_code_value(rec._allocate_qr_codes(1)[0], {})
 
 	def write(self, vals):
 		# Pre-validate area change to avoid SQL errors and provide friendly message
@@ -171,17 +141,8 @@ class MonitoringAreas(models.Model):
 
 		res = super().write(vals)
 		if 'area_id' in vals:
-			for rec in self:
-				# regenerate unique code and composed value on area change
-				for _ in range(10):
-					new_code = rec._generate_unique_code()
-					candidate = rec._compose_qr_value(rec.area_id, new_code, company=rec.company_id)
-					if not self.search_count([('qr_value', '=', candidate), ('id', '!=', rec.id)]):
-						super(MonitoringAreas, rec).write({'qr_value': candidate})
-						break
-				else:
-					# fallback write
-					super(MonitoringAreas, rec).write({'qr_value': rec._compose_qr_value(rec.area_id, rec._generate_unique_code(), company=rec.company_id)})
+			# New area, new payload
+			self._regenerate_qr_codes()
 		return res
 
 	@api.constrains('area_id', 'company_id')
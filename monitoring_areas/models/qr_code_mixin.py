@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import secrets
+import string
+
+from psycopg2 import errors as pg_errors
+
+from odoo import api, models
+from odoo.tools import mute_logger
+
+QR_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+# Inserts retried with fresh codes when the unique index reports a collision
+QR_CODE_ATTEMPTS = 5
+
+
+class MonitoringQrCodeMixin(models.AbstractModel):
+	"""Allocate random scan codes from a high-entropy space. Uniqueness is left
+	to the unique constraint on the code field: a colliding batch is retried
+	with fresh codes instead of probing every candidate beforehand."""
+	_name = 'monitoring.qr.code.mixin'
+	_description = 'QR Code Allocation'
+
+	# Field holding the code and the _sql_constraints entry keeping it unique
+	_qr_code_field = None
+	_qr_code_constraint = None
+	_qr_code_length = 8
+
+	@api.model
+	def _allocate_qr_codes(self, count):
+		"""Return count distinct random codes."""
+		codes = set()
+		while len(codes) < count:
+			codes.add(''.join(secrets.choice(QR_CODE_ALPHABET) for _ in range(self._qr_code_length)))
+		return list(codes)
+
+	def _get_qr_code_value(self, code, vals):
+		"""Value stored for code, from the create vals or the record itself."""
+		return code
+
+	def _is_qr_code_conflict(self, error):
+		return error.diag.constraint_name == f"{self._table}_{self._qr_code_constraint}"
+
+	@api.model_create_multi
+	def create(self, vals_list):
+		field_name = self._qr_code_field
+		to_allocate = [vals for vals in vals_list if not vals.get(field_name)]
+		if not to_allocate:
+			return super().create(vals_list)
+		for attempt in range(QR_CODE_ATTEMPTS):
+			for vals, code in zip(to_allocate, self._allocate_qr_codes(len(to_allocate))):
+				vals[field_name] = self._get_qr_code_value(code, vals)
+			try:
+				with mute_logger('odoo.sql_db'), self.env.cr.savepoint():
+					return super().create(vals_list)
+			except pg_errors.UniqueViolation as e:
+				if not self._is_qr_code_conflict(e) or attempt == QR_CODE_ATTEMPTS - 1:
+					raise
+
+	def _regenerate_qr_codes(self):
+		"""Give every record of self a new code in a single flush."""
+		if not self:
+			return
+		field_name = self._qr_code_field
+		for attempt in range(QR_CODE_ATTEMPTS):
+			codes = self._allocate_qr_codes(len(self))
+			try:
+				with mute_logger('odoo.sql_db'), self.env.cr.savepoint():
+					for rec, code in zip(self, codes):
+						rec[field_name] = rec._get_qr_code_value(code, {})
+					self.flush_recordset([field_name])
+				return
+			except pg_errors.UniqueViolation as e:
+				self.invalidate_recordset([field_name])
+				if not self._is_qr_code_conflict(e) or attempt == QR_CODE_ATTEMPTS - 1:
+					raise
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'QR Images',
+    'version': '18.0.1.0',
+    'summary': 'Shared QR code rendering and cacheable image responses',
+    'description': 'Technical module: renders QR codes on demand and serves them with immutable, versioned URLs.',
+    'author': 'Akshat Gupta',
+    'license': 'LGPL-3',
+    'website': '',
+    'category': 'Hidden/Tools',
+    'depends': ['base', 'web'],
+    'data': [],
+    'installable': True,
+    'application': False,
+}
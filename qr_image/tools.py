@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import functools
+import hashlib
+from io import BytesIO
+
+from odoo.http import request
+
+try:
+    import qrcode
+except Exception:
+    qrcode = None
+
+
+@functools.lru_cache(maxsize=512)
+def render_qr_png(value):
+    """Render value as a PNG QR code; identical values are rendered once per worker."""
+    if not value or qrcode is None:
+        return b''
+    buf = BytesIO()
+    qr = qrcode.QRCode(version=1, box_size=4, border=2)
+    qr.add_data(value)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    img.save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def qr_version(value):
+    """Short digest of the QR content, used as cache key in image URLs."""
+    return hashlib.sha1((value or '').encode()).hexdigest()[:16]
+
+
+def qr_image_response(value, version):
+    """PNG response for a QR value; the version in the URL makes it immutable."""
+    if not value or version != qr_version(value):
+        return request.not_found()
+    if request.httprequest.headers.get('If-None-Match') == f'"{version}"':
+        return request.make_response('', status=304)
+    png = render_qr_png(value)
+    if not png:
+        return request.not_found()
+    return request.make_response(png, headers=[
+        ('Content-Type', 'image/png'),
+        ('Content-Length', len(png)),
+        ('Cache-Control', 'private, max-age=31536000, immutable'),
+        ('ETag', f'"{version}"'),
+    ])
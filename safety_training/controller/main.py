@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 from odoo import http
 from odoo.http import request
+from odoo.exceptions import MissingError
 import json
 
+# Seconds a trainee's browser may reuse a video without revalidating it
+VIDEO_CACHE_MAX_AGE = 3600
+
 
 class SafetyTrainingController(http.Controller):
 
@@ -33,9 +37,10 @@ class SafetyTrainingController(http.Controller):
 
         # Prepare video URL
         video_url = attempt.video_id.video_url
-        if attempt.video_id.video_file:
-            # If video file is uploaded, create a route for it
-            video_url = '/web/content/safety.training.video/%s/video_file' % attempt.video_id.id
+        # bin_size reads the file size, not the video itself
+        if attempt.video_id.with_context(bin_size=True).video_file:
+            # Uploaded videos are streamed from the filestore with range support
+            video_url = '/safety_training/video/%s?token=%s' % (attempt.id, token or attempt.access_token)
 
         values = {
             'attempt': attempt,
@@ -46,6 +51,30 @@ class SafetyTrainingController(http.Controller):
 
         return request.render('safety_training.safety_training_video_player', values)
 
+    @http.route('/safety_training/video/<int:attempt_id>', type='http', auth='public', methods=['GET', 'HEAD'])
+    def stream_video(self, attempt_id, **kwargs):
+        """Stream the uploaded video of an attempt.
+
+        The attachment is sent from the filestore in chunks (or through
+        X-Sendfile when enabled) with Range, ETag and Last-Modified support,
+        so players can seek and revalidate without re-downloading the file.
+        """
+        token = kwargs.get('token')
+        attempt = request.env['safety.training.attempt'].sudo().browse(attempt_id)
+
+        if not attempt.exists():
+            return request.not_found()
+        if attempt.access_token != token and (not request.env.user or request.env.user.id != attempt.user_id.id):
+            return request.not_found()
+
+        try:
+            stream = request.env['ir.binary']._record_to_stream(attempt.video_id.sudo(), 'video_file')
+        except MissingError:
+            return request.not_found()
+        stream.max_age = VIDEO_CACHE_MAX_AGE
+        stream.public = False
+        return stream.get_response(as_attachment=False)
+
     @http.route('/safety_training/video_started', type='json', auth='public')
     def video_started(self, attempt_id, **kwargs):
         """Log that video playback started"""
@@ -126,17 +155,7 @@ class SafetyTrainingController(http.Controller):
             except Exception as e:
                 return {'success': False, 'error': str(e)}
 
-        questions = []
-        for q in attempt.selected_question_ids:
-            questions.append({
-                'id': q.id,
-                'question': q.question,
-                'option_a': q.option_a,
-                'option_b': q.option_b,
-                'option_c': q.option_c,
-                'option_d': q.option_d,
-                'category': q.category,
-            })
+        questions = attempt._get_question_payload()['questions']
 
         return {
             'success': True,
@@ -144,6 +163,29 @@ class SafetyTrainingController(http.Controller):
             'total': len(questions),
         }
 
+    @http.route('/safety_training/questions/<int:attempt_id>', type='http', auth='public', methods=['GET'])
+    def questions_snapshot(self, attempt_id, **kwargs):
+        """Selected questions of a started test as a cacheable JSON document"""
+        token = kwargs.get('token')
+        attempt = request.env['safety.training.attempt'].sudo().browse(attempt_id)
+
+        if not attempt.exists():
+            return request.not_found()
+        if attempt.access_token != token and (not request.env.user or request.env.user.id != attempt.user_id.id):
+            return request.not_found()
+        if not attempt.selected_question_ids:
+            return request.not_found()
+
+        payload = attempt._get_question_payload()
+        etag = '"%s"' % payload['version']
+        headers = [('ETag', etag), ('Cache-Control', 'private, max-age=300')]
+        if request.httprequest.if_none_match.contains(payload['version']):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_json_response({
+            'questions': payload['questions'],
+            'total': len(payload['questions']),
+        }, headers=headers)
+
     @http.route('/safety_training/submit_answers', type='json', auth='public')
     def submit_answers(self, attempt_id, answers, **kwargs):
         """Submit quiz answers and get results"""
@@ -166,24 +208,13 @@ class SafetyTrainingController(http.Controller):
             # Submit answers - the model will handle state transition
             result = attempt.action_submit_answers(answers)
 
-            # Prepare detailed answer review
-            answer_review = []
-            for answer in attempt.answer_ids:
-                answer_review.append({
-                    'question': answer.question_id.question,
-                    'selected_answer': answer.selected_answer,
-                    'correct_answer': answer.question_id.correct_answer,
-                    'is_correct': answer.is_correct,
-                    'explanation': answer.question_id.explanation or '',
-                })
-
             return {
                 'success': True,
                 'passed': result['passed'],
                 'score': result['score'],
                 'correct_answers': result['correct_answers'],
                 'total_questions': result['total_questions'],
-                'answers': answer_review,
+                'answers': result['answers'],
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, exceptions, _
+from odoo import models, fields, api, exceptions, tools, _
 from odoo.exceptions import UserError, ValidationError
+import hashlib
 import random
 import json
+import threading
 import uuid
 
+# Question fields sent to the trainee, never the answer key
+QUESTION_PAYLOAD_FIELDS = ['question', 'option_a', 'option_b', 'option_c', 'option_d', 'category']
+
+# {(dbname, video_id): (version, bank)}, shared by the worker threads
+_question_bank_cache = {}
+_question_bank_lock = threading.Lock()
+
 
 class SafetyTrainingVideo(models.Model):
     _name = 'safety.training.video'
@@ -33,13 +42,77 @@ class SafetyTrainingVideo(models.Model):
         default=lambda self: self.env.company
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'pass_type', 'active', 'company_id'} & set(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('pass_type', 'company_id')
+    def _get_active_video_id(self, pass_type, company_id):
+        """Training video of a pass type, the company's own before the shared
+        ones; cached in the registry and cleared when videos change."""
+        video = self.sudo().search([
+            ('pass_type', '=', pass_type),
+            ('active', '=', True),
+            ('company_id', 'in', [company_id, False]),
+        ], order='company_id, id', limit=1)
+        return video.id
+
+    def _get_question_bank_version(self):
+        """Video write date with the count and last write of its active
+        questions: any edit of the video or of a question changes it."""
+        self.ensure_one()
+        self.env.cr.execute("""
+            SELECT v.write_date, COUNT(q.id), MAX(q.write_date)
+              FROM safety_training_video v
+         LEFT JOIN safety_training_question q ON q.video_id = v.id AND q.active
+             WHERE v.id = %s
+          GROUP BY v.id
+        """, [self.id])
+        return hashlib.sha1(repr(self.env.cr.fetchone()).encode()).hexdigest()[:16]
+
+    def _get_question_bank(self):
+        """Return the snapshot of the active questions of the video as
+        ``{'version', 'ids', 'questions': {id: payload}}``, rebuilt only when
+        the video or one of its questions changed."""
+        self.ensure_one()
+        key = (self.env.cr.dbname, self.id)
+        version = self._get_question_bank_version()
+        with _question_bank_lock:
+            cached = _question_bank_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        rows = self.env['safety.training.question'].sudo().search_read(
+            [('video_id', '=', self.id), ('active', '=', True)], QUESTION_PAYLOAD_FIELDS, order='id')
+        bank = {
+            'version': version,
+            'ids': tuple(row['id'] for row in rows),
+            'questions': {row['id']: row for row in rows},
+        }
+        with _question_bank_lock:
+            _question_bank_cache[key] = (version, bank)
+        return bank
+
 
 class SafetyTrainingQuestion(models.Model):
     _name = 'safety.training.question'
     _description = 'Safety Training Question'
     _inherit = ['mail.thread', 'mail.activity.mixin']
 
-    video_id = fields.Many2one('safety.training.video', string='Video', required=True, ondelete='cascade')
+    video_id = fields.Many2one('safety.training.video', string='Video', required=True, ondelete='cascade', index=True)
     question = fields.Text(string='Question', required=True)
     option_a = fields.Char(string='Option A', required=True)
     option_b = fields.Char(string='Option B', required=True)
@@ -111,11 +184,22 @@ class SafetyTrainingAttempt(models.Model):
         default=lambda self: self.env.company
     )
 
+    def init(self):
+        super().init()
+        # Latest attempt of each gate pass; also serves gate_pass_id lookups,
+        # so the single column index is not kept
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS safety_training_attempt_gate_pass_create_date_index
+                ON safety_training_attempt (gate_pass_id, create_date DESC, id DESC);
+            DROP INDEX IF EXISTS safety_training_attempt__gate_pass_id_index;
+        """)
+
     @api.depends('answer_ids', 'answer_ids.is_correct', 'total_questions')
     def _compute_score(self):
         for rec in self:
             if rec.total_questions > 0:
-                correct = len(rec.answer_ids.filtered(lambda a: a.is_correct))
+                # Answers created by action_submit_answers are still in cache
+                correct = sum(1 for answer in rec.answer_ids if answer.is_correct)
                 rec.correct_answers = correct
                 rec.score = (correct / rec.total_questions) * 100
                 rec.passed = rec.score >= rec.video_id.pass_percentage
@@ -168,18 +252,38 @@ class SafetyTrainingAttempt(models.Model):
     def _generate_test_questions(self):
         """Generate random questions for the test"""
         self.ensure_one()
-        all_questions = self.video_id.question_ids.filtered(lambda q: q.active)
-        if len(all_questions) < self.video_id.total_questions_per_test:
+        question_ids = self.video_id._get_question_bank()['ids']
+        if len(question_ids) < self.video_id.total_questions_per_test:
             raise UserError(_('Not enough questions available. Need at least %s questions.' %
                               self.video_id.total_questions_per_test))
 
-        # Randomly select questions
-        selected = random.sample(all_questions.ids, self.video_id.total_questions_per_test)
+        # Randomly select questions from the cached id snapshot
+        selected = random.sample(question_ids, self.video_id.total_questions_per_test)
         self.write({
             'selected_question_ids': [(6, 0, selected)],
             'total_questions': len(selected),
         })
 
+    def _get_question_payload(self):
+        """Questions of the attempt as served to the trainee, with a version
+        changing whenever the selection or the question bank changes."""
+        self.ensure_one()
+        bank = self.video_id._get_question_bank()
+        selected_ids = self.selected_question_ids.ids
+        questions = bank['questions']
+        missing_ids = [qid for qid in selected_ids if qid not in questions]
+        if missing_ids:
+            # Question archived or moved since it was selected
+            questions = {**questions, **{
+                row['id']: row for row in self.env['safety.training.question'].sudo().with_context(active_test=False)
+                .search_read([('id', 'in', missing_ids)], QUESTION_PAYLOAD_FIELDS)
+            }}
+        version = hashlib.sha1(f"{bank['version']}:{selected_ids}".encode()).hexdigest()[:16]
+        return {
+            'version': f"{self.id}-{version}",
+            'questions': [questions[qid] for qid in selected_ids if qid in questions],
+        }
+
     def action_start_test(self):
         """Start the assessment test"""
         self.ensure_one()
@@ -216,18 +320,36 @@ class SafetyTrainingAttempt(models.Model):
         if self.answer_ids:
             self.answer_ids.unlink()
 
-        # Create answer records
-        Answer = self.env['safety.training.answer']
+        # Score against an answer key read once, insert all answers together
+        answer_key = {
+            row['id']: row for row in self.env['safety.training.question'].sudo().with_context(active_test=False).search_read(
+                [('id', 'in', [int(question_id) for question_id in answers_data])],
+                ['question', 'correct_answer', 'explanation'])
+        }
+        vals_list = []
+        review = []
         for question_id, selected_option in answers_data.items():
-            question = self.env['safety.training.question'].browse(int(question_id))
-            is_correct = question.correct_answer == selected_option
-
-            Answer.create({
+            key = answer_key.get(int(question_id))
+            if not key:
+                continue
+            is_correct = key['correct_answer'] == selected_option
+            vals_list.append({
                 'attempt_id': self.id,
-                'question_id': question.id,
+                'question_id': key['id'],
                 'selected_answer': selected_option,
                 'is_correct': is_correct,
             })
+            review.append({
+                'question': key['question'],
+                'selected_answer': selected_option,
+                'correct_answer': key['correct_answer'],
+                'is_correct': is_correct,
+                'explanation': key['explanation'] or '',
+            })
+        # Answers are plain records, skip the chatter bookkeeping of mail.thread
+        self.env['safety.training.answer'].with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_create_nosubscribe=True,
+        ).create(vals_list)
 
         # Complete test
         self.write({
@@ -240,6 +362,7 @@ class SafetyTrainingAttempt(models.Model):
             'score': self.score,
             'correct_answers': self.correct_answers,
             'total_questions': self.total_questions,
+            'answers': review,
         }
 
     def action_retry(self):
@@ -305,24 +428,39 @@ class HrGatePass(models.Model):
 
     @api.depends('training_attempt_ids', 'training_attempt_ids.state', 'training_attempt_ids.passed')
     def _compute_training_status(self):
+        # One grouped query for the whole recordset instead of loading attempts
+        pass_ids = [pass_id for pass_id in self._ids if isinstance(pass_id, int)]
+        passed_ids = {
+            gate_pass.id for gate_pass, in self.env['safety.training.attempt'].sudo()._read_group(
+                [('gate_pass_id', 'in', pass_ids), ('passed', '=', True)], ['gate_pass_id'])
+        }
         for rec in self:
-            passed_attempts = rec.training_attempt_ids.filtered(lambda a: a.passed)
-            rec.training_passed = bool(passed_attempts)
+            rec.training_passed = rec.id in passed_ids
             rec.training_completed = rec.training_passed
 
     def _compute_latest_attempt(self):
+        latest_by_pass = {}
+        pass_ids = [pass_id for pass_id in self._ids if isinstance(pass_id, int)]
+        if pass_ids:
+            self.env['safety.training.attempt'].flush_model(['gate_pass_id'])
+            self.env.cr.execute("""
+                SELECT DISTINCT ON (gate_pass_id) gate_pass_id, id
+                  FROM safety_training_attempt
+                 WHERE gate_pass_id = ANY(%s)
+              ORDER BY gate_pass_id, create_date DESC, id DESC
+            """, [pass_ids])
+            latest_by_pass = dict(self.env.cr.fetchall())
+        Attempt = self.env['safety.training.attempt']
         for rec in self:
-            rec.latest_training_attempt_id = rec.training_attempt_ids[:1] if rec.training_attempt_ids else False
+            rec.latest_training_attempt_id = Attempt.browse(latest_by_pass.get(rec.id))
 
     def action_start_training(self):
         """Start or continue safety training"""
         self.ensure_one()
 
         # Get video for this pass type
-        video = self.env['safety.training.video'].search([
-            ('pass_type', '=', self.pass_type),
-            ('active', '=', True)
-        ], limit=1)
+        Video = self.env['safety.training.video']
+        video = Video.browse(Video._get_active_video_id(self.pass_type, self.company_id.id or self.env.company.id))
 
         if not video:
             raise UserError(_('No training video configured for this pass type.'))